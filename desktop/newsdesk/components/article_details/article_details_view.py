@@ -226,8 +226,9 @@ class ArticleDetailsComponent(BaseComponent):
         self.image_label.setStyleSheet("background-color: #dfe6e9; border: 1px solid #bdc3c7; border-radius: 8px; color: #7f8c8d;")
         self.content_layout.addWidget(self.image_label)
         
-        if article.image_url:
-            self.load_image_async(article.image_url)
+        image_url = self._display_image_url(article)
+        if image_url:
+            self.load_image_async(image_url)
         else:
             self.image_label.setText("🖼️ No Image")
         
@@ -277,6 +278,13 @@ class ArticleDetailsComponent(BaseComponent):
         
         self.content_layout.addStretch()
 
+    @staticmethod
+    def _display_image_url(article: Article) -> str:
+        """ה-thumbnail הגדול מהשרת (JPEG מוקטן) אם יש, אחרת התמונה המקורית של האתר"""
+        if article.thumb_url and "/images/" in article.thumb_url:
+            return article.thumb_url.rsplit("/", 1)[0] + "/large"
+        return article.image_url
+
     def load_image_async(self, url: str):
         """טעינת תמונה באופן אסינכרוני"""
         if self.image_loader_thread and self.image_loader_thread.isRunning():
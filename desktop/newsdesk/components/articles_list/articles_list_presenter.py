@@ -1,4 +1,4 @@
-from PySide6.QtCore import QObject, QThread, Signal, Slot 
+from PySide6.QtCore import QObject, QThread, QTimer, Signal, Slot 
 from typing import TYPE_CHECKING, Optional, List, Dict, Any
 
 if TYPE_CHECKING:
@@ -6,6 +6,8 @@ if TYPE_CHECKING:
 
 from newsdesk.infra.http.news_service_http import HttpNewsService
 from newsdesk.infra.http.likes_service_http import HttpLikesService 
+from newsdesk.infra.http.news_api_client import NewsApiClient
+from newsdesk.infra.http.events_stream_http import EventStreamThread
 
 # WorkerThread 
 class WorkerThread(QThread):
@@ -19,11 +21,12 @@ class ArticlesListPresenter(QObject):
     """
     Presenter for ArticlesListComponent. Handles loading, searching, filtering, and like actions.
     """
-    def __init__(self, view: 'ArticlesListComponent', news_service: HttpNewsService, likes_service: HttpLikesService):
+    def __init__(self, view: 'ArticlesListComponent', news_service: HttpNewsService, likes_service: HttpLikesService, api_client: Optional[NewsApiClient] = None):
         super().__init__()
         self.view = view
         self.news_service = news_service
         self.likes_service = likes_service 
+        self.api_client = api_client  # for the live updates stream (SSE)
 
         # State
         self.current_page = 1; self.page_size = 20
@@ -34,6 +37,14 @@ class ArticlesListPresenter(QObject):
 
         # Threads
         self.active_threads: List[QThread] = [] 
+        self.event_stream: Optional[EventStreamThread] = None
+        self.stopping_streams: List[EventStreamThread] = []  # kept alive until their thread finishes
+
+        # Resubscribing is deferred and coalesced - a burst of pushed articles reopens the stream once
+        self._resubscribe_timer = QTimer(self)
+        self._resubscribe_timer.setSingleShot(True)
+        self._resubscribe_timer.setInterval(500)
+        self._resubscribe_timer.timeout.connect(self._subscribe_to_updates)
 
     def _start_worker(self, func, *args, finished_slot=None, error_slot=None, **kwargs):
         """Helper method to start and manage WorkerThreads"""
@@ -132,10 +143,12 @@ class ArticlesListPresenter(QObject):
         self.cached_likes = {int(k): v for k, v in stats_data.items()}
         self.view.display_articles(self.cached_articles, self.cached_likes)
         self.view.update_status(f"Showing {len(self.cached_articles)} articles.")
+        self._subscribe_to_updates()
 
     def _on_likes_load_error(self, error: str):
         print(f"Presenter Error: Failed to load like stats: {error}")
         self.cached_likes = {}
+        self._subscribe_to_updates()
         self.view.display_articles(self.cached_articles, {})
         self.view.show_error(f"Could not load like/dislike status: {error}")
         self.view.update_status(f"Showing {len(self.cached_articles)} articles (like status unavailable).")
@@ -200,9 +213,87 @@ class ArticlesListPresenter(QObject):
         if card: self.view.update_article_card_stats(article_id, self.cached_likes.get(article_id, {}))
         self.view.show_error(f"Error updating status: {error}")
 
+    # Live Updates (Server-Sent Events)
+    def _subscribe_to_updates(self) -> None:
+        """(Re)opens the push stream for the articles currently shown + new articles in the current category."""
+        if not self.api_client: return
+        self._stop_event_stream()
+        article_ids = [int(a["id"]) for a in self.cached_articles if str(a.get("id", "")).isdigit()]
+        params = {
+            "article_ids": ",".join(str(i) for i in article_ids),
+            "types": "ArticleCreated",
+            "categories": self.current_category or ""
+        }
+        self.event_stream = EventStreamThread(self.api_client, params)
+        self.event_stream.event_received.connect(self._on_stream_event)
+        self.event_stream.start()
+
+    def _stop_event_stream(self) -> None:
+        """Stops the current stream without blocking the GUI thread; the thread object lives until `finished`."""
+        self._resubscribe_timer.stop()
+        stream = self.event_stream
+        if not stream: return
+        self.event_stream = None
+        try: stream.event_received.disconnect(self._on_stream_event)
+        except (RuntimeError, TypeError): pass
+        self.stopping_streams.append(stream)
+        stream.finished.connect(lambda s=stream: self._on_stream_finished(s))
+        stream.finished.connect(stream.deleteLater)
+        stream.stop()
+        if stream.isFinished():  # already exited - `finished` will not fire again
+            self._on_stream_finished(stream); stream.deleteLater()
+
+    def _on_stream_finished(self, stream: EventStreamThread) -> None:
+        try: self.stopping_streams.remove(stream)
+        except ValueError: pass
+
+    @Slot(dict)
+    def _on_stream_event(self, event: Dict[str, Any]) -> None:
+        """Applies a pushed delta instead of reloading everything."""
+        event_type = event.get("event"); data = event.get("data", {})
+        article_id = data.get("aggregate_id"); event_data = data.get("event_data") or {}
+
+        if event_type == "ArticleStatsChanged" and article_id in self.cached_likes:
+            stats = dict(self.cached_likes[article_id]); stats.update(event_data)
+            self.cached_likes[article_id] = stats
+            self.view.update_article_card_stats(article_id, stats)
+
+        elif event_type == "ArticleCreated" and self.current_page == 1 and not self.current_search_query:
+            if any(str(a.get("id")) == str(article_id) for a in self.cached_articles): return
+            article = {
+                "id": article_id, "title": event_data.get("title", ""), "summary": event_data.get("summary", ""),
+                "source": event_data.get("source"), "category": event_data.get("category"),
+                "image_url": event_data.get("image_url") or "", "thumb_url": "",
+                "published_at": event_data.get("created_at")
+            }
+            self.cached_articles = [article] + self.cached_articles[:self.page_size - 1]
+            self.cached_likes[article_id] = {"likes_count": 0, "dislikes_count": 0, "user_liked": False, "user_disliked": False}
+            self.view.display_articles(self.cached_articles, self.cached_likes)
+            self.view.update_status(f"🆕 New article: {article['title'][:60]}")
+            self._resubscribe_timer.start()  # watch the new article too (after this slot returns)
+
+        elif event_type == "ArticleUpdated" and article_id in self.view.card_widgets:
+            updated = event_data.get("updated_fields", {})
+            for a in self.cached_articles:
+                if str(a.get("id")) == str(article_id): a.update(updated)
+            self.view.display_articles(self.cached_articles, self.cached_likes)
+
+        elif event_type == "ArticleDeleted" and article_id in self.view.card_widgets:
+            self.cached_articles = [a for a in self.cached_articles if str(a.get("id")) != str(article_id)]
+            self.cached_likes.pop(article_id, None)
+            self.view.display_articles(self.cached_articles, self.cached_likes)
+
+        elif event_type == "Resync":
+            print("Presenter (List): Event stream lagged, reloading...")
+            self.load_articles(self.current_page)
+
     # Cleanup
     def cleanup(self) -> None:
         """Cleans up all active threads."""
+        self._stop_event_stream()
+        # On exit the streams must finish before their QThread objects are destroyed
+        for stream in self.stopping_streams[:]:
+            stream.wait(2000)
         print(f"Cleaning up {len(self.active_threads)} threads in ArticlesListPresenter...")
         threads_to_stop = self.active_threads[:]
         self.active_threads.clear()
@@ -0,0 +1,79 @@
+import json
+from typing import Any, Dict, Optional
+
+from PySide6.QtCore import QThread, Signal
+
+from newsdesk.infra.http.news_api_client import NewsApiClient
+
+
+class EventStreamThread(QThread):
+    """
+    מאזין ל-/events/stream (Server-Sent Events) ומשדר כל אירוע כ-signal
+    מתחבר מחדש עם backoff אם החיבור נופל
+    """
+    event_received = Signal(dict)
+
+    MAX_BACKOFF_SECONDS = 30
+
+    def __init__(self, api: NewsApiClient, params: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        self._api = api
+        self._params = {k: v for k, v in (params or {}).items() if v}
+        self._response = None
+        self._stopped = False
+
+    def run(self) -> None:
+        backoff = 1
+        while not self._stopped:
+            try:
+                with self._api.stream("/events/stream", params=self._params) as response:
+                    response.raise_for_status()
+                    self._response = response
+                    backoff = 1
+                    self._read_events(response)
+            except Exception as e:
+                if not self._stopped:
+                    print(f"⚠️ Event stream disconnected: {e}")
+            finally:
+                self._response = None
+
+            # backoff במנות קטנות - stop() לא מחכה עד 30 שניות לסיום ה-thread
+            for _ in range(backoff * 10):
+                if self._stopped:
+                    break
+                self.msleep(100)
+            if self._stopped:
+                break
+            backoff = min(backoff * 2, self.MAX_BACKOFF_SECONDS)
+
+    def _read_events(self, response) -> None:
+        event_type: Optional[str] = None
+        data_lines = []
+        for line in response.iter_lines():
+            if self._stopped:
+                return
+            if not line:
+                # שורה ריקה מסיימת אירוע
+                if data_lines:
+                    try:
+                        payload = json.loads("\n".join(data_lines))
+                    except ValueError:
+                        payload = {}
+                    self.event_received.emit({"event": event_type or "message", "data": payload})
+                event_type, data_lines = None, []
+            elif line.startswith(":"):
+                continue  # heartbeat
+            elif line.startswith("event:"):
+                event_type = line[6:].strip()
+            elif line.startswith("data:"):
+                data_lines.append(line[5:].strip())
+
+    def stop(self) -> None:
+        """עצירה - סגירת התגובה משחררת את ה-thread מה-read החוסם"""
+        self._stopped = True
+        response = self._response
+        if response is not None:
+            try:
+                response.close()
+            except Exception:
+                pass
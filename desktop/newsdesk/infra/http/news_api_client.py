@@ -77,6 +77,18 @@ class NewsApiClient:
             print(f"❌ Error on DELETE {path}: {e}")
             raise
     
+    def stream(self, path: str, params: Optional[Dict[str, Any]] = None):
+        """
+        GET בסטרימינג (Server-Sent Events) - context manager שמחזיר httpx.Response
+        בלי read timeout קצר: השרת שולח heartbeat כל 15 שניות
+        """
+        return self._client.stream(
+            "GET", path,
+            params=params,
+            headers=self._get_headers(),
+            timeout=httpx.Timeout(30.0, read=60.0)
+        )
+    
     def close(self) -> None:
         """סגירת החיבור"""
         self._client.close()
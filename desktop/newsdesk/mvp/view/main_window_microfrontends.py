@@ -197,7 +197,7 @@ class MainWindowMicrofrontends(QMainWindow):
         if isinstance(current_component, ArticlesListComponent):
             if not current_component.presenter:
                 print("Main window: Connecting ArticlesListPresenter...")
-                presenter = ArticlesListPresenter(current_component, self.news_service, self.likes_service) 
+                presenter = ArticlesListPresenter(current_component, self.news_service, self.likes_service, self.api_client) 
                 current_component.presenter = presenter
                 current_component.article_clicked.connect(self.on_article_clicked)
                 current_component.like_toggled.connect(presenter.toggle_like)
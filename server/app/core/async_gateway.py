@@ -0,0 +1,423 @@
+import asyncio
+import importlib.util
+import logging
+import random
+import time
+import weakref
+from typing import Optional, Dict, Any, Set, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import get_settings
+from app.core.disk_cache import TieredCache
+from app.core.gateway import BaseGateway, CachePlan
+from app.core.rate_limiter import RateLimitExceeded
+from app.core.single_flight import AsyncSingleFlight
+from app.replay.harness import make_async_transport
+
+logger = logging.getLogger(__name__)
+
+
+class _LoopState:
+    """מה שקשור ל-event loop אחד: ה-client וה-semaphores לכל שירות ולכל host"""
+
+    __slots__ = ("client", "service_semaphores", "host_semaphores")
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.service_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+class AsyncAPIGateway(BaseGateway):
+    """
+    Gateway אסינכרוני - אותו API כמו APIGateway (request/get/post/clear_cache...)
+    אבל על httpx.AsyncClient משותף: pool של חיבורים עם keep-alive, HTTP/2 כשאפשר,
+    backoff עם jitter דרך asyncio.sleep (לא תופס thread בזמן ההמתנה),
+    ו-semaphore לכל שירות ולכל host שמגבילים כמה קריאות רצות במקביל.
+
+    ה-client וה-semaphores קשורים ל-event loop, ולכן נפרדים לכל loop (למשל סקריפט שקורא
+    ל-asyncio.run כמה פעמים); מי שמריץ loop קצר סוגר את ה-client שלו ב-aclose לפני הסוף.
+    """
+
+    def __init__(self):
+        super().__init__()
+        settings = get_settings()
+        self.http2 = settings.GATEWAY_HTTP2 and importlib.util.find_spec("h2") is not None
+        if settings.GATEWAY_HTTP2 and not self.http2:
+            logger.warning("HTTP/2 requested but 'h2' is not installed - falling back to HTTP/1.1")
+        self.limits = httpx.Limits(
+            max_connections=settings.GATEWAY_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.GATEWAY_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.GATEWAY_KEEPALIVE_EXPIRY_SECONDS
+        )
+        self.max_connections_per_host = settings.GATEWAY_MAX_CONNECTIONS_PER_HOST
+        self.default_service_concurrency = settings.GATEWAY_SERVICE_CONCURRENCY
+        self.backoff_base = settings.GATEWAY_BACKOFF_BASE_SECONDS
+        self.backoff_max = settings.GATEWAY_BACKOFF_MAX_SECONDS
+        self.service_concurrency: Dict[str, int] = {}
+        self.single_flight = AsyncSingleFlight()
+        self.hedge_default_delay = settings.GATEWAY_HEDGE_DEFAULT_DELAY_SECONDS
+        self.hedge_min_delay = settings.GATEWAY_HEDGE_MIN_DELAY_SECONDS
+        self.hedge_min_samples = settings.GATEWAY_HEDGE_MIN_SAMPLES
+        self.hedges: Dict[str, Dict[str, int]] = {}
+        self._refreshing: Set[Tuple[str, str]] = set()
+        self._refresh_tasks: Set[asyncio.Task] = set()
+
+        # client + semaphores לכל event loop: loop אחד לא מחליף (או סוגר) את ה-client של loop אחר שעדיין רץ
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+
+    # ============================================
+    # Client & concurrency
+    # ============================================
+
+    def _state(self) -> "_LoopState":
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None or state.client.is_closed:
+            client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                transport=make_async_transport(self.http2, self.limits)  # record / replay
+            )
+            state = self._loops[loop] = _LoopState(client)
+        return state
+
+    def _get_client(self) -> httpx.AsyncClient:
+        return self._state().client
+
+    def set_service_concurrency(self, service_name: str, max_concurrent: int):
+        """כמה קריאות לשירות יכולות לרוץ במקביל (ברירת מחדל: GATEWAY_SERVICE_CONCURRENCY)"""
+        self.service_concurrency[service_name] = max_concurrent
+        for state in list(self._loops.values()):
+            state.service_semaphores.pop(service_name, None)
+
+    def _service_semaphore(self, service_name: str) -> asyncio.Semaphore:
+        semaphores = self._state().service_semaphores
+        semaphore = semaphores.get(service_name)
+        if semaphore is None:
+            limit = self.service_concurrency.get(service_name, self.default_service_concurrency)
+            semaphore = semaphores[service_name] = asyncio.Semaphore(limit)
+        return semaphore
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        semaphores = self._state().host_semaphores
+        semaphore = semaphores.get(host)
+        if semaphore is None:
+            semaphore = semaphores[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return semaphore
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff עם full jitter - מונע מכל הקריאות שנכשלו לחזור יחד"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def aclose(self):
+        """
+        סגירת ה-pool של ה-loop הנוכחי (ב-shutdown של האפליקציה, או לפני סוף asyncio.run) -
+        loop שנגמר בלי aclose כבר לא יכול לסגור את ה-client שלו
+        """
+        state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state is not None and not state.client.is_closed:
+            await state.client.aclose()
+
+    # ============================================
+    # Cache - L2 על דיסק (DiskCache) לא רץ על ה-event loop
+    # ============================================
+
+    async def _lookup_cache_async(
+        self,
+        method: str,
+        url: str,
+        service_name: str,
+        params: Optional[Dict],
+        json: Optional[Dict],
+        cache_ttl: Optional[int],
+        idempotent: bool,
+        max_stale: Optional[int],
+        stale_if_error: Optional[int]
+    ) -> CachePlan:
+        plan = self._cache_plan(method, url, service_name, params, json, cache_ttl, idempotent, max_stale, stale_if_error)
+        if plan.key and plan.ttl:
+            if isinstance(self.cache, TieredCache):
+                found = await self.cache.alookup(plan.key, namespace=service_name)
+            else:
+                found = self.cache.lookup(plan.key, namespace=service_name)
+            self._apply_lookup(plan, service_name, found)
+        return plan
+
+    async def _store_in_cache_async(self, plan: CachePlan, service_name: str, result: Any, size: int):
+        if not isinstance(self.cache, TieredCache):
+            self._store_in_cache(plan, service_name, result, size)
+        elif plan.key and plan.ttl:
+            await self.cache.aset(
+                plan.key, result, ttl=plan.ttl, namespace=service_name, size=size, max_stale=plan.retention
+            )
+
+    # ============================================
+    # Requests
+    # ============================================
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        service_name: str,
+        headers: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        json: Optional[Dict] = None,
+        timeout: int = 30,
+        max_retries: int = 3,
+        cache_ttl: Optional[int] = None,
+        rate_limit: int = 100,
+        idempotent: bool = False,
+        wait_for_rate_limit: bool = False,
+        rate_limit_timeout: Optional[float] = None,
+        max_stale: Optional[int] = None,
+        stale_if_error: Optional[int] = None,
+        hedge: bool = False
+    ) -> Dict[str, Any]:
+        """
+        ביצוע request - הפרמטרים זהים ל-APIGateway.request, ובנוסף:
+            hedge: לקריאות idempotent - שליחת עותק אם הראשונה לא חזרה תוך p95 של השירות
+        """
+        plan = await self._lookup_cache_async(
+            method, url, service_name, params, json, cache_ttl, idempotent, max_stale, stale_if_error
+        )
+        if plan.fresh:
+            return plan.value
+
+        def send():
+            return self._send(
+                method, url, service_name, headers, params, json, timeout, max_retries,
+                rate_limit, wait_for_rate_limit, rate_limit_timeout, plan, hedge
+            )
+
+        if plan.key is None:
+            return await send()
+
+        # קריאות זהות שרצות במקביל חולקות קריאה אחת ל-upstream
+        def flight():
+            return self.single_flight.do((service_name, plan.key), send, namespace=service_name)
+
+        if plan.revalidate:
+            self._refresh_in_background(service_name, plan.key, flight)
+            return plan.value
+        if plan.value is None:
+            return await flight()
+        try:
+            return await flight()
+        except Exception as e:
+            logger.warning(f"Serving stale response for {service_name} after upstream error: {e}")
+            self._revalidation_stat(service_name, "served_stale_on_error")
+            return plan.value
+
+    def _refresh_in_background(self, service_name: str, request_key: str, flight):
+        """רענון אחד בלבד ברקע לכל key (task על ה-loop הנוכחי); שגיאה משאירה את הערך הישן"""
+        refresh_key = (service_name, request_key)
+        with self._revalidation_lock:
+            if refresh_key in self._refreshing:
+                return
+            self._refreshing.add(refresh_key)
+        self._revalidation_stat(service_name, "background_refreshes")
+
+        async def run():
+            try:
+                await flight()
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {service_name}: {e}")
+                self._revalidation_stat(service_name, "refresh_errors")
+            finally:
+                with self._revalidation_lock:
+                    self._refreshing.discard(refresh_key)
+
+        # שומרים reference - אחרת ה-task יכול להיאסף באמצע
+        task = asyncio.ensure_future(run())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        service_name: str,
+        headers: Optional[Dict],
+        params: Optional[Dict],
+        json: Optional[Dict],
+        timeout: int,
+        max_retries: int,
+        rate_limit: int,
+        wait_for_rate_limit: bool,
+        rate_limit_timeout: Optional[float],
+        plan: CachePlan,
+        hedge: bool = False
+    ) -> Dict[str, Any]:
+        """הקריאה בפועל: circuit breaker, rate limit, retries (עם hedging) ושמירה ב-cache"""
+        # breaker פתוח - נכשלים מיד, בלי להמתין ל-timeouts של upstream חולה
+        breaker = self._get_circuit_breaker(service_name)
+        self._check_circuit(breaker)
+
+        # בדיקת Rate Limit (רק לקריאות שיוצאות בפועל) - ההמתנה לטוקן לא תופסת thread
+        try:
+            await self._get_rate_limiter(service_name, rate_limit, 60).acquire_async(
+                block=wait_for_rate_limit, timeout=rate_limit_timeout
+            )
+        except RateLimitExceeded:
+            logger.warning(f"Rate limit exceeded for {service_name}")
+            self.metrics.record_rate_limited(service_name)
+            raise
+
+        client = self._get_client()
+        # hedging רק לקריאות idempotent - שליחה כפולה שלהן לא משנה כלום ב-upstream
+        hedge = hedge and plan.key is not None
+
+        def attempt_once():
+            return self._attempt(client, breaker, method, url, service_name, headers, params, json, timeout)
+
+        last_exception = None
+        for attempt in range(max_retries):
+            try:
+                logger.info(f"Requesting {service_name}: {method} {url} (attempt {attempt + 1}/{max_retries})")
+                if attempt:
+                    self.metrics.record_retry(service_name)
+
+                if hedge:
+                    response = await self._hedged(service_name, attempt_once)
+                else:
+                    response = await attempt_once()
+
+                response.raise_for_status()
+                result = response.json() if response.content else {}
+
+                await self._store_in_cache_async(plan, service_name, result, len(response.content))
+
+                logger.info(f"Request successful for {service_name}")
+                return result
+
+            except httpx.TimeoutException as e:
+                last_exception = e
+                logger.warning(f"Timeout on attempt {attempt + 1} for {service_name}")
+
+            except httpx.HTTPStatusError as e:
+                logger.error(f"HTTP Error for {service_name}: {e}")
+                raise Exception(f"API Error: {e.response.status_code} - {e.response.text}")
+
+            except httpx.TransportError as e:
+                last_exception = e
+                logger.error(f"Request failed for {service_name}: {e}")
+
+            if attempt < max_retries - 1:
+                await asyncio.sleep(self._backoff_delay(attempt))
+
+        raise Exception(f"Failed to request {service_name} after {max_retries} attempts: {last_exception}")
+
+    async def _attempt(
+        self,
+        client: httpx.AsyncClient,
+        breaker: CircuitBreaker,
+        method: str,
+        url: str,
+        service_name: str,
+        headers: Optional[Dict],
+        params: Optional[Dict],
+        json: Optional[Dict],
+        timeout: int
+    ) -> httpx.Response:
+        """ניסיון בודד - מעדכן את ה-breaker ואת זמני התגובה של השירות"""
+        # אם ה-breaker נפתח באמצע - לא ממשיכים לנסות
+        self._check_circuit(breaker, probe=True)
+        started = time.monotonic()
+        try:
+            async with self._service_semaphore(service_name), self._host_semaphore(url):
+                response = await client.request(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    params=params,
+                    json=json,
+                    timeout=timeout
+                )
+        except httpx.TransportError as e:
+            breaker.record_failure()
+            if isinstance(e, httpx.TimeoutException):
+                self.metrics.record_timeout(service_name)
+            else:
+                self.metrics.record_error(service_name)
+            raise
+        except BaseException:
+            breaker.record_cancelled()
+            raise
+
+        self.metrics.record_response(service_name, response.status_code, time.monotonic() - started)
+        if self._is_upstream_failure(response.status_code):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+            self._latency_window(service_name).add(time.monotonic() - started)
+        return response
+
+    def _hedge_delay(self, service_name: str) -> float:
+        """אחרי כמה זמן שולחים עותק: p95 של השירות (או ברירת מחדל עד שיש מספיק דגימות)"""
+        window = self._latency_window(service_name)
+        if len(window) < self.hedge_min_samples or window.p95 is None:
+            return self.hedge_default_delay
+        return max(self.hedge_min_delay, window.p95)
+
+    async def _hedged(self, service_name: str, attempt_once) -> httpx.Response:
+        """
+        Hedged request: אם הניסיון הראשון לא חזר תוך p95 - שולחים עותק,
+        ולוקחים את התשובה התקינה הראשונה. השני מבוטל.
+        """
+        primary = asyncio.ensure_future(attempt_once())
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay(service_name))
+            if done:
+                return primary.result()
+
+            backup = asyncio.ensure_future(attempt_once())
+            tasks.append(backup)
+            self._hedge_stats(service_name)["sent"] += 1
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and not self._is_upstream_failure(task.result().status_code):
+                        if task is backup:
+                            self._hedge_stats(service_name)["won"] += 1
+                        return task.result()
+            # שניהם נכשלו - מחזירים את תוצאת הראשון (שגיאה או תשובת 5xx)
+            return primary.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def _hedge_stats(self, service_name: str) -> Dict[str, int]:
+        return self.hedges.setdefault(service_name, {"sent": 0, "won": 0})
+
+    def get_hedge_stats(self) -> Dict[str, Dict[str, int]]:
+        """כמה עותקים נשלחו לכל שירות, ובכמה מהם העותק חזר ראשון"""
+        return {name: dict(stats) for name, stats in self.hedges.items()}
+
+    async def get(self, url: str, service_name: str, **kwargs) -> Dict[str, Any]:
+        """GET request"""
+        return await self.request("GET", url, service_name, **kwargs)
+
+    async def post(self, url: str, service_name: str, **kwargs) -> Dict[str, Any]:
+        """POST request"""
+        return await self.request("POST", url, service_name, **kwargs)
+
+
+# Singleton instance
+_async_gateway_instance: Optional[AsyncAPIGateway] = None
+
+def get_async_gateway() -> AsyncAPIGateway:
+    """קבלת instance של ה-Gateway האסינכרוני"""
+    global _async_gateway_instance
+    if _async_gateway_instance is None:
+        _async_gateway_instance = AsyncAPIGateway()
+    return _async_gateway_instance
@@ -84,6 +84,21 @@ async def get_current_user(
     
     return user
 
+def get_token_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    """
+    אימות הטוקן בלבד, בלי פנייה ל-DB
+    לחיבורים ארוכים (SSE) - לא מחזיקים DB session לאורך כל החיבור
+    """
+    payload = decode_access_token(token)
+    user_id = payload.get("user_id") if payload else None
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user_id
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """וידוא שהמשתמש פעיל"""
     if not current_user.is_active:
@@ -0,0 +1,220 @@
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "stale_until", "size", "namespace")
+
+    def __init__(self, value: Any, expires_at: float, stale_until: float, size: int, namespace: str):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.size = size
+        self.namespace = namespace
+
+
+def estimate_size(value: Any) -> int:
+    """הערכת גודל בבתים - לפי ה-JSON של הערך (רוב הערכים הם תשובות API)"""
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
+
+class TTLCache:
+    """
+    Cache חסום ו-thread-safe: LRU + TTL + מגבלת גודל בבתים
+
+    - max_entries / max_bytes: כשעוברים את אחד מהם נזרקים הפריטים הכי פחות בשימוש
+    - namespaces: לכל שירות namespace משלו; invalidate_namespace הוא O(1) -
+      מעלים את מספר הדור של ה-namespace, והפריטים הישנים כבר לא נגישים
+      ונזרקים בהדרגה דרך ה-LRU
+    - max_stale: כמה זמן פריט נשמר אחרי שפג תוקפו - lookup מחזיר אותו כ-stale
+      (ל-stale-while-revalidate / stale-if-error); get רגיל מחזיר רק פריטים טריים
+    - פריטים שעבר גם זמן ה-stale שלהם נזרקים כשנתקלים בהם או כשהם בראש ה-LRU (set)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl: float = 300,
+        name: str = "cache"
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, int, Hashable], _Entry]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._bytes = 0
+
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._namespace_stats: Dict[str, Dict[str, int]] = {}
+
+    def _key(self, namespace: str, key: Hashable) -> Tuple[str, int, Hashable]:
+        return (namespace, self._generations.get(namespace, 0), key)
+
+    def _remove(self, full_key: Tuple[str, int, Hashable]) -> None:
+        entry = self._entries.pop(full_key)
+        self._bytes -= entry.size
+
+    def _count(self, namespace: str, field: str) -> None:
+        stats = self._namespace_stats.get(namespace)
+        if stats is None:
+            stats = self._namespace_stats[namespace] = {"hits": 0, "stale_hits": 0, "misses": 0}
+        stats[field] += 1
+
+    # ============================================
+    # Public API
+    # ============================================
+
+    def get(self, key: Hashable, default: Any = None, namespace: str = "default") -> Any:
+        """קבלת ערך טרי (default אם אין / פג תוקף). פגיעה מזיזה את הפריט לסוף ה-LRU"""
+        value, stale_for = self.lookup(key, namespace)
+        return default if value is None or stale_for else value
+
+    def lookup(self, key: Hashable, namespace: str = "default") -> Tuple[Any, float]:
+        """
+        (ערך, כמה שניות הוא stale) - 0 לערך טרי; (None, 0) אם אין
+        ערך שפג תוקפו מוחזר כל עוד הוא בתוך ה-max_stale שלו
+        """
+        now = time.time()
+        with self._lock:
+            full_key = self._key(namespace, key)
+            entry = self._entries.get(full_key)
+            if entry is not None and entry.stale_until <= now:
+                self._remove(full_key)
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                self._count(namespace, "misses")
+                return None, 0.0
+            self._entries.move_to_end(full_key)
+            if entry.expires_at <= now:
+                self._stale_hits += 1
+                self._count(namespace, "stale_hits")
+                return entry.value, max(now - entry.expires_at, 1e-6)
+            self._hits += 1
+            self._count(namespace, "hits")
+            return entry.value, 0.0
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        namespace: str = "default",
+        size: Optional[int] = None,
+        max_stale: float = 0
+    ) -> None:
+        """
+        שמירת ערך. size - גודל בבתים אם ידוע מראש (אחרת מוערך)
+        ttl יכול להיות שלילי (ערך שכבר stale, למשל כשמעתיקים מ-L2)
+        """
+        size = size if size is not None else estimate_size(value)
+        if size > self.max_bytes:
+            return  # ערך גדול מכל ה-cache - לא שומרים
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.default_ttl)
+
+        with self._lock:
+            full_key = self._key(namespace, key)
+            if full_key in self._entries:
+                self._remove(full_key)
+            self._entries[full_key] = _Entry(value, expires_at, expires_at + max_stale, size, namespace)
+            self._bytes += size
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        # קודם פריטים שפג תוקפם בראש ה-LRU, אחר כך LRU עד שחוזרים לגבולות
+        while self._entries:
+            full_key, entry = next(iter(self._entries.items()))
+            over_limit = len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            stale_generation = full_key[1] != self._generations.get(full_key[0], 0)
+            if entry.stale_until <= now:
+                self._expirations += 1
+            elif over_limit or stale_generation:
+                self._evictions += 1
+            else:
+                break
+            self._remove(full_key)
+
+    def invalidate(self, key: Hashable, namespace: str = "default") -> bool:
+        with self._lock:
+            full_key = self._key(namespace, key)
+            if full_key in self._entries:
+                self._remove(full_key)
+                return True
+            return False
+
+    def invalidate_namespace(self, namespace: str) -> None:
+        """O(1) - הפריטים של הדור הקודם כבר לא נגישים"""
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def purge_expired(self) -> int:
+        """סריקה מלאה (O(n)) - לתחזוקה תקופתית; מחזיר כמה פריטים נזרקו"""
+        now = time.time()
+        with self._lock:
+            dead = [
+                k for k, e in self._entries.items()
+                if e.stale_until <= now or k[1] != self._generations.get(k[0], 0)
+            ]
+            for full_key in dead:
+                self._remove(full_key)
+            self._expirations += len(dead)
+            return len(dead)
+
+    def contains(self, key: Hashable, namespace: str = "default") -> bool:
+        """האם יש ערך בתוקף - בלי לעדכן LRU או סטטיסטיקה"""
+        with self._lock:
+            entry = self._entries.get(self._key(namespace, key))
+            return entry is not None and entry.expires_at > time.time()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.contains(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._stale_hits + self._misses
+            namespaces = {}
+            for namespace, counts in self._namespace_stats.items():
+                lookups = counts["hits"] + counts["stale_hits"] + counts["misses"]
+                namespaces[namespace] = {
+                    **counts,
+                    "hit_ratio": round(counts["hits"] / lookups, 3) if lookups else 0.0
+                }
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / total, 3) if total else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "namespaces": namespaces
+            }
@@ -0,0 +1,202 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# ערך מספרי לכל מצב - נוח ל-dashboards (0 תקין, 1 בבדיקה, 2 פתוח)
+STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """ה-breaker של השירות פתוח - הקריאה נדחתה בלי לצאת ל-upstream"""
+
+    def __init__(self, service_name: str, retry_after: float):
+        self.service_name = service_name
+        self.retry_after = retry_after
+        super().__init__(f"Circuit open for {service_name} (retry after {retry_after:.1f}s)")
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker לשירות אחד
+
+    closed    - הכל עובר; אם שיעור הכשלונות בחלון (window_seconds) עובר את
+                failure_rate_threshold (ולפחות minimum_calls קריאות) - עוברים ל-open
+    open      - כל הקריאות נדחות מיד (CircuitOpenError) למשך open_seconds
+    half_open - עוברות עד half_open_max_calls קריאות ניסיון; הצלחה סוגרת, כשלון פותח מחדש
+
+    החלון מחולק ל-buckets קבועים, כך שכל עדכון ובדיקה הם O(1)
+    """
+
+    BUCKETS = 10
+
+    def __init__(
+        self,
+        service_name: str,
+        failure_rate_threshold: float = 0.5,
+        window_seconds: float = 30,
+        minimum_calls: int = 10,
+        open_seconds: float = 30,
+        half_open_max_calls: int = 1
+    ):
+        self.service_name = service_name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_seconds = window_seconds
+        self.minimum_calls = minimum_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._bucket_seconds = window_seconds / self.BUCKETS
+        self._reset_window()
+
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+
+        self.opened_count = 0
+        self.short_circuited = 0
+
+    # ============================================
+    # Rolling window
+    # ============================================
+
+    def _bucket(self, now: float) -> List[int]:
+        epoch = int(now // self._bucket_seconds)
+        index = epoch % self.BUCKETS
+        if self._bucket_epochs[index] != epoch:
+            # bucket ממחזור קודם - יצא מהחלון
+            self._buckets[index] = [0, 0]
+            self._bucket_epochs[index] = epoch
+        return self._buckets[index]
+
+    def _counts(self, now: float) -> Tuple[int, int]:
+        """(successes, failures) בחלון - סכום של BUCKETS תאים, כלומר O(1)"""
+        oldest = int(now // self._bucket_seconds) - self.BUCKETS
+        successes = failures = 0
+        for epoch, (ok, failed) in zip(self._bucket_epochs, self._buckets):
+            if epoch > oldest:
+                successes += ok
+                failures += failed
+        return successes, failures
+
+    def _reset_window(self) -> None:
+        self._buckets = [[0, 0] for _ in range(self.BUCKETS)]
+        self._bucket_epochs = [-1] * self.BUCKETS
+
+    # ============================================
+    # State machine
+    # ============================================
+
+    def _transition(self, state: str, now: float) -> None:
+        self.state = state
+        if state == OPEN:
+            self._opened_at = now
+            self.opened_count += 1
+        self._half_open_in_flight = 0
+        if state == CLOSED:
+            self._reset_window()
+
+    def check(self) -> None:
+        """בדיקה זולה בלי לשנות מצב - זורק CircuitOpenError אם ה-breaker פתוח"""
+        if self.state == OPEN:
+            remaining = self._opened_at + self.open_seconds - time.monotonic()
+            if remaining > 0:
+                with self._lock:
+                    self.short_circuited += 1
+                raise CircuitOpenError(self.service_name, remaining)
+
+    def before_call(self) -> None:
+        """לקרוא לפני כל ניסיון - זורק CircuitOpenError אם אסור לצאת ל-upstream"""
+        now = time.monotonic()
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self._opened_at + self.open_seconds - now
+                if remaining > 0:
+                    self.short_circuited += 1
+                    raise CircuitOpenError(self.service_name, remaining)
+                self._transition(HALF_OPEN, now)
+            if self.state == HALF_OPEN:
+                if self._half_open_in_flight >= self.half_open_max_calls:
+                    self.short_circuited += 1
+                    raise CircuitOpenError(self.service_name, self.open_seconds)
+                self._half_open_in_flight += 1
+
+    def record_success(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(CLOSED, now)
+                return
+            self._bucket(now)[0] += 1
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(OPEN, now)
+                return
+            if self.state == OPEN:
+                return
+            self._bucket(now)[1] += 1
+            successes, failures = self._counts(now)
+            total = successes + failures
+            if total >= self.minimum_calls and failures / total >= self.failure_rate_threshold:
+                self._transition(OPEN, now)
+
+    def record_cancelled(self) -> None:
+        """ניסיון שבוטל באמצע (למשל hedge שהפסיד) - משחרר את מקום הניסיון ב-half_open"""
+        with self._lock:
+            if self.state == HALF_OPEN and self._half_open_in_flight:
+                self._half_open_in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            successes, failures = self._counts(time.monotonic())
+            total = successes + failures
+            return {
+                "state": self.state,
+                "state_code": STATE_CODES[self.state],
+                "window_calls": total,
+                "window_failures": failures,
+                "failure_rate": round(failures / total, 3) if total else 0.0,
+                "opened_count": self.opened_count,
+                "short_circuited": self.short_circuited
+            }
+
+
+class LatencyWindow:
+    """
+    זמני תגובה אחרונים של שירות (ring buffer) - בסיס ל-p95 של hedged requests
+    האחוזונים מחושבים מחדש רק כל recompute_every דגימות
+    """
+
+    def __init__(self, size: int = 200, recompute_every: int = 20):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._recompute_every = recompute_every
+        self._since_recompute = 0
+        self._p95: Optional[float] = None
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self._since_recompute += 1
+            if self._p95 is None or self._since_recompute >= self._recompute_every:
+                self._p95 = self._percentile(0.95)
+                self._since_recompute = 0
+
+    def _percentile(self, q: float) -> float:
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self._p95
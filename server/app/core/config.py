@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 from pydantic import Field, ConfigDict
 
@@ -19,6 +19,90 @@ class Settings(BaseSettings):
     # Database
     DB_URL: str = Field(default="sqlite:///./news.db")
     RUN_CREATE_ALL: bool = False
+
+    # Event Store
+    EVENT_STORE_BACKEND: str = Field(default="sql", description="sql | file")
+    EVENT_STORE_DIR: str = Field(default="./data/events", description="תיקיית ה-segments של ה-file backend")
+    EVENT_STORE_SEGMENT_BYTES: int = 64 * 1024 * 1024  # 64MB
+    EVENT_STORE_FSYNC_MODE: str = Field(default="group", description="group | interval | none")
+    EVENT_STORE_FSYNC_INTERVAL_MS: int = 10
+
+    # API Gateway Cache
+    GATEWAY_CACHE_MAX_ENTRIES: int = 5000
+    GATEWAY_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 64MB
+    GATEWAY_DISK_CACHE_ENABLED: bool = False
+    GATEWAY_DISK_CACHE_PATH: str = Field(default="./data/gateway_cache.db", description="SQLite (WAL) משותף לכל ה-workers")
+    GATEWAY_DISK_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # 512MB
+    GATEWAY_DISK_CACHE_COMPACT_INTERVAL_SECONDS: float = 300.0
+    GATEWAY_REFRESH_WORKERS: int = Field(default=4, description="threads לרענון ברקע (stale-while-revalidate) ב-Gateway הסינכרוני")
+    GATEWAY_RATE_LIMIT_STRATEGY: str = Field(default="token_bucket", description="token_bucket | sliding_window")
+
+    # Async API Gateway (httpx pool)
+    GATEWAY_HTTP2: bool = True
+    GATEWAY_MAX_CONNECTIONS: int = 100
+    GATEWAY_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    GATEWAY_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    GATEWAY_MAX_CONNECTIONS_PER_HOST: int = 10
+    GATEWAY_SERVICE_CONCURRENCY: int = 8
+    GATEWAY_BACKOFF_BASE_SECONDS: float = 0.5
+    GATEWAY_BACKOFF_MAX_SECONDS: float = 8.0
+    GATEWAY_HEDGE_DEFAULT_DELAY_SECONDS: float = 2.0  # עד שיש מספיק דגימות ל-p95
+    GATEWAY_HEDGE_MIN_DELAY_SECONDS: float = 0.05
+    GATEWAY_HEDGE_MIN_SAMPLES: int = 20
+
+    # Circuit Breaker (לכל שירות חיצוני)
+    CIRCUIT_BREAKER_FAILURE_RATE: float = 0.5
+    CIRCUIT_BREAKER_WINDOW_SECONDS: float = 30.0
+    CIRCUIT_BREAKER_MIN_CALLS: int = 10
+    CIRCUIT_BREAKER_OPEN_SECONDS: float = 30.0
+    CIRCUIT_BREAKER_HALF_OPEN_CALLS: int = 1
+
+    # Record / replay של קריאות ל-APIs חיצוניים (בדיקות עומס בלי רשת)
+    API_CASSETTE_MODE: str = Field(default="off", description="off | record | replay")
+    API_CASSETTE_DIR: str = Field(default="./data/cassettes", description="קובץ JSONL לכל שירות")
+    API_REPLAY_PROFILE_PATH: str = Field(default="", description="JSON: latency ושיעור שגיאות לכל שירות")
+    API_REPLAY_SEED: int = 0
+    
+    # Ingestion
+    INGEST_BULK_CHUNK_SIZE: int = Field(default=500, description="שורות לכל INSERT/commit בייבוא (עד 2000 - מגבלת הפרמטרים של SQL Server)")
+    INGEST_BLOOM_CAPACITY: int = Field(default=1_000_000, description="כמה URLs ה-Bloom filter של הייבוא מחזיק לפני שנבנה מחדש")
+    INGEST_BLOOM_ERROR_RATE: float = 0.01
+    INGEST_NEAR_DUP_MODE: str = Field(default="skip", description="skip | cluster | off - מה לעשות עם עותק של ידיעה שכבר יש (URL אחר)")
+    INGEST_NEAR_DUP_THRESHOLD: float = Field(default=0.7, description="דמיון (Jaccard משוער) שממנו מאמר נחשב עותק")
+    INGEST_NEAR_DUP_WINDOW: int = Field(default=20000, description="כמה מאמרים אחרונים נשמרים באינדקס ה-LSH")
+    INGEST_FEEDS_PATH: str = Field(default="./data/ingestion/feeds.json", description="JSON של ה-feeds ל-daemon (אם אין - כל הקטגוריות הפופולריות)")
+    INGEST_DEFAULT_INTERVAL_MINUTES: int = 15
+    INGEST_JITTER_FRACTION: float = Field(default=0.1, description="סטייה אקראית של ± מה-interval בין הרצות של feed")
+    INGEST_RUN_TIMEOUT_SECONDS: float = Field(default=1800, description="זמן מקסימלי להרצה אחת של ה-pipeline (0 - ללא הגבלה)")
+    INGEST_STATE_DIR: str = Field(default="./data/ingestion", description="checkpoint + lock של ה-daemon")
+    INGEST_THUMBNAILS: bool = Field(default=True, description="ליצור thumbnails (ImageService) למאמרים בזמן הייבוא")
+    
+    # Scraping (טקסט מלא של מאמרים)
+    SCRAPER_CONCURRENCY: int = 32
+    SCRAPER_PER_DOMAIN_CONCURRENCY: int = 2
+    SCRAPER_CRAWL_DELAY_SECONDS: float = Field(default=1.0, description="מרווח מינימלי בין בקשות לאותו דומיין (robots.txt יכול להגדיל)")
+    SCRAPER_TIMEOUT_SECONDS: float = Field(default=20.0, description="זמן כולל להורדת דף אחד")
+    SCRAPER_MAX_BYTES: int = 3 * 1024 * 1024  # דף גדול יותר נזרק
+    SCRAPER_PARSE_WORKERS: int = Field(default=0, description="תהליכים לפירוש HTML (0 = מספר ה-CPUs)")
+    SCRAPER_CACHE_PATH: str = Field(default="./data/scrape_cache.db", description="SQLite - טקסט + ETag/Last-Modified לכל URL")
+    SCRAPER_CACHE_TTL_SECONDS: int = 6 * 3600
+    SCRAPER_CACHE_REVALIDATE_SECONDS: int = 7 * 24 * 3600  # אחרי ה-TTL: בקשה מותנית (304) עד כמה זמן
+    SCRAPER_USER_AGENT: str = "NewsDeskBot/1.0"
+    
+    # Images (thumbnails בצד השרת)
+    IMAGE_CACHE_DIR: str = Field(default="./data/images", description="thumbnails לפי hash של התמונה המקורית")
+    IMAGE_PUBLIC_BASE_URL: str = Field(default="http://127.0.0.1:8000", description="הכתובת שממנה לקוחות מגיעים ל-/images (ל-thumb_url)")
+    IMAGE_THUMB_SIZE: str = Field(default="medium", description="הגודל ש-thumb_url מצביע עליו")
+    IMAGE_QUALITY: int = 80  # JPEG
+    IMAGE_CONCURRENCY: int = 16
+    IMAGE_TIMEOUT_SECONDS: float = 15.0
+    IMAGE_MAX_BYTES: int = 10 * 1024 * 1024  # תמונה מקורית גדולה יותר לא נטענת
+    IMAGE_WORKERS: int = Field(default=0, description="תהליכים ל-resize (0 = מספר ה-CPUs)")
+    
+    # Classification (קטגוריות של מאמרים)
+    CLASSIFIER_BACKEND: str = Field(default="hybrid", description="remote | local | hybrid - מודל מקומי, ורק confidence נמוך עובר למודל המרוחק")
+    CLASSIFIER_MODEL_PATH: str = Field(default="./data/models/category_classifier.json.gz", description="המודל המקומי (scripts/train_classifier.py)")
+    CLASSIFIER_LOCAL_MIN_CONFIDENCE: float = Field(default=0.8, description="hybrid: מתחת לזה - סיווג במודל המרוחק")
     
     # JWT Settings
     SECRET_KEY: str = Field(
@@ -36,6 +120,19 @@ class Settings(BaseSettings):
 
     GUARDIAN_API_KEY: str = Field(default="", description="Guardian API Key")
 
+    # Weather (OpenWeatherMap)
+    WEATHER_CURRENT_TTL_SECONDS: int = 600
+    WEATHER_FORECAST_TTL_SECONDS: int = 1800
+    WEATHER_CITY_TTLS: Dict[str, int] = Field(default_factory=dict, description='TTL למזג אוויר נוכחי לפי עיר, JSON: {"eilat": 1800}')
+    WEATHER_CACHE_MAX_CITIES: int = 500
+    WEATHER_MAX_STALE_SECONDS: int = Field(default=600, description="stale-while-revalidate - ערך שפג לפני פחות מזה מוחזר מיד ומתרענן ברקע")
+    WEATHER_STALE_IF_ERROR_SECONDS: int = Field(default=6 * 3600, description="ערך ישן עד גיל זה מוחזר כש-OpenWeatherMap נכשל")
+    WEATHER_POPULARITY_HALF_LIFE_SECONDS: float = 3600.0
+    WEATHER_PREFETCH_ENABLED: bool = True
+    WEATHER_PREFETCH_TOP_N: int = 10
+    WEATHER_PREFETCH_CALLS_PER_MINUTE: int = Field(default=20, description="מתוך המכסה של OpenWeatherMap (60 בדקה ב-free)")
+    WEATHER_PREFETCH_REFRESH_AT: float = Field(default=0.8, description="חלק מה-TTL שאחריו מרעננים")
+
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
     return Settings()
\ No newline at end of file
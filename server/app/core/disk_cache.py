@@ -0,0 +1,291 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from app.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cache_entries (
+        namespace  TEXT NOT NULL,
+        key        TEXT NOT NULL,
+        value      BLOB NOT NULL,
+        size       INTEGER NOT NULL,
+        expires_at REAL NOT NULL,
+        stale_until REAL NOT NULL,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (namespace, key)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS ix_cache_entries_stale ON cache_entries (stale_until);
+    CREATE INDEX IF NOT EXISTS ix_cache_entries_created ON cache_entries (created_at);
+"""
+
+
+class DiskCache:
+    """
+    Cache מתמיד על SQLite במצב WAL - משותף לכל ה-workers (תהליכים) ושורד restart
+
+    - WAL: הרבה קוראים במקביל לכותב אחד; busy_timeout מטפל בתחרות בין תהליכים
+    - connection לכל thread (sqlite3 לא מרשה לשתף connection בין threads)
+    - ערכים נשמרים כ-JSON (תשובות API); ערך שלא ניתן לסריאליזציה פשוט לא נשמר
+    - כמו TTLCache, פריט נשמר max_stale שניות אחרי שפג תוקפו (stale-while-revalidate)
+    - compaction: מחיקת פריטים שעבר גם זמן ה-stale שלהם, ואם עדיין מעל max_bytes - הישנים ביותר.
+      רץ לכל היותר פעם ב-compact_interval שניות, מתוך set
+    - שגיאות (למשל database is locked אחרי busy_timeout) נרשמות ללוג ולא נזרקות:
+      cache הוא best-effort ואסור לו להפיל קריאה
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        compact_interval: float = 300,
+        busy_timeout_ms: int = 5000
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.compact_interval = compact_interval
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._compact_lock = threading.Lock()
+        self._last_compact = time.time()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._migrate()
+        self._conn().executescript(_SCHEMA)
+
+    def _migrate(self) -> None:
+        """קבצים שנוצרו לפני עמודת stale_until"""
+        conn = self._conn()
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(cache_entries)")]
+        if columns and "stale_until" not in columns:
+            conn.execute("ALTER TABLE cache_entries ADD COLUMN stale_until REAL NOT NULL DEFAULT 0")
+            conn.execute("UPDATE cache_entries SET stale_until = expires_at")
+            conn.execute("DROP INDEX IF EXISTS ix_cache_entries_expires")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # ב-WAL: עמיד לקריסת תהליך, מספיק ל-cache
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._local.conn = conn
+        return conn
+
+    # ============================================
+    # Public API
+    # ============================================
+
+    def get_entry(self, key: Hashable, namespace: str = "default") -> Optional[Tuple[Any, float, float]]:
+        """(ערך, expires_at, stale_until) או None אם אין / עבר גם זמן ה-stale"""
+        now = time.time()
+        try:
+            row = self._conn().execute(
+                "SELECT value, expires_at, stale_until FROM cache_entries "
+                "WHERE namespace = ? AND key = ? AND stale_until > ?",
+                (namespace, str(key), now)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Disk cache read failed: {e}")
+            return None
+        if row is None:
+            self.misses += 1
+            return None
+        if row[1] > now:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return json.loads(row[0]), row[1], row[2]
+
+    def get(self, key: Hashable, default: Any = None, namespace: str = "default") -> Any:
+        """ערך טרי בלבד"""
+        entry = self.get_entry(key, namespace)
+        return default if entry is None or entry[1] <= time.time() else entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: float, namespace: str = "default", max_stale: float = 0) -> None:
+        try:
+            blob = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        except (TypeError, ValueError):
+            return
+        now = time.time()
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(namespace, key, value, size, expires_at, stale_until, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (namespace, str(key), blob, len(blob), now + ttl, now + ttl + max_stale, now)
+            )
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Disk cache write failed: {e}")
+            return
+        if now - self._last_compact >= self.compact_interval:
+            self.compact()
+
+    def invalidate(self, key: Hashable, namespace: str = "default") -> None:
+        self._execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, str(key)))
+
+    def invalidate_namespace(self, namespace: str) -> None:
+        self._execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+
+    def clear(self) -> None:
+        self._execute("DELETE FROM cache_entries", ())
+
+    def compact(self) -> int:
+        """מחיקת פריטים שפג תוקפם + הישנים ביותר מעל max_bytes. מחזיר כמה נמחקו"""
+        if not self._compact_lock.acquire(blocking=False):
+            return 0  # compaction כבר רץ ב-thread אחר
+        try:
+            self._last_compact = time.time()
+            conn = self._conn()
+            removed = conn.execute(
+                "DELETE FROM cache_entries WHERE stale_until <= ?", (time.time(),)
+            ).rowcount
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+            if total > self.max_bytes:
+                # מוחקים מהישן לחדש עד שחוזרים ל-90% מהמכסה
+                excess = total - int(self.max_bytes * 0.9)
+                removed += conn.execute(
+                    """
+                    DELETE FROM cache_entries WHERE (namespace, key) IN (
+                        SELECT namespace, key FROM (
+                            SELECT namespace, key,
+                                   SUM(size) OVER (ORDER BY created_at ROWS UNBOUNDED PRECEDING) - size AS before
+                            FROM cache_entries
+                        ) WHERE before < ?
+                    )
+                    """,
+                    (excess,)
+                ).rowcount
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            if removed:
+                logger.info(f"Disk cache compaction removed {removed} entries")
+            return removed
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Disk cache compaction failed: {e}")
+            return 0
+        finally:
+            self._compact_lock.release()
+
+    def _execute(self, sql: str, params: tuple) -> None:
+        try:
+            self._conn().execute(sql, params)
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Disk cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            entries, size = self._conn().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+            ).fetchone()
+        except sqlite3.Error:
+            entries, size = None, None
+        total = self.hits + self.stale_hits + self.misses
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "errors": self.errors
+        }
+
+
+class TieredCache:
+    """
+    L1 בזיכרון (TTLCache) לפני L2 על דיסק (DiskCache) - אותו ממשק כמו TTLCache
+    פגיעה ב-L2 מעלה את הערך ל-L1 עם ה-TTL (וה-stale) שנותרו לו
+    alookup / aset - לקוד אסינכרוני: L1 ישירות, L2 (SQLite סינכרוני, busy_timeout, compaction) ב-thread
+    """
+
+    def __init__(self, l1: TTLCache, l2: DiskCache):
+        self.l1 = l1
+        self.l2 = l2
+
+    def get(self, key: Hashable, default: Any = None, namespace: str = "default") -> Any:
+        value, stale_for = self.lookup(key, namespace)
+        return default if value is None or stale_for else value
+
+    def lookup(self, key: Hashable, namespace: str = "default") -> Tuple[Any, float]:
+        value, stale_for = self.l1.lookup(key, namespace)
+        if value is not None and not stale_for:
+            return value, stale_for
+        # גם ב-stale של L1 בודקים את L2 - worker אחר אולי כבר רענן את הערך
+        return self._promote(key, namespace, value, stale_for, self.l2.get_entry(key, namespace))
+
+    async def alookup(self, key: Hashable, namespace: str = "default") -> Tuple[Any, float]:
+        value, stale_for = self.l1.lookup(key, namespace)
+        if value is not None and not stale_for:
+            return value, stale_for
+        entry = await asyncio.to_thread(self.l2.get_entry, key, namespace)
+        return self._promote(key, namespace, value, stale_for, entry)
+
+    def _promote(
+        self, key: Hashable, namespace: str, value: Any, stale_for: float, entry: Optional[Tuple[Any, float, float]]
+    ) -> Tuple[Any, float]:
+        if entry is None:
+            return value, stale_for
+        value, expires_at, stale_until = entry
+        now = time.time()
+        self.l1.set(key, value, ttl=expires_at - now, namespace=namespace, max_stale=stale_until - expires_at)
+        return value, max(now - expires_at, 1e-6) if expires_at <= now else 0.0
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        namespace: str = "default",
+        size: Optional[int] = None,
+        max_stale: float = 0
+    ) -> None:
+        ttl = ttl if ttl is not None else self.l1.default_ttl
+        self.l1.set(key, value, ttl=ttl, namespace=namespace, size=size, max_stale=max_stale)
+        self.l2.set(key, value, ttl=ttl, namespace=namespace, max_stale=max_stale)
+
+    async def aset(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        namespace: str = "default",
+        size: Optional[int] = None,
+        max_stale: float = 0
+    ) -> None:
+        ttl = ttl if ttl is not None else self.l1.default_ttl
+        self.l1.set(key, value, ttl=ttl, namespace=namespace, size=size, max_stale=max_stale)
+        await asyncio.to_thread(self.l2.set, key, value, ttl=ttl, namespace=namespace, max_stale=max_stale)
+
+    def invalidate(self, key: Hashable, namespace: str = "default") -> None:
+        self.l1.invalidate(key, namespace)
+        self.l2.invalidate(key, namespace)
+
+    def invalidate_namespace(self, namespace: str) -> None:
+        self.l1.invalidate_namespace(namespace)
+        self.l2.invalidate_namespace(namespace)
+
+    def clear(self) -> None:
+        self.l1.clear()
+        self.l2.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.l1.stats(), "l2": self.l2.stats()}
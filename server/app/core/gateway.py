@@ -1,61 +1,346 @@
 import requests
 import time
-from typing import Optional, Dict, Any
+import hashlib
+import json as json_lib
+from typing import Optional, Dict, Any, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from datetime import datetime, timedelta
 import logging
+import threading
+
+from app.core.cache import TTLCache
+from app.core.disk_cache import DiskCache, TieredCache
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError, LatencyWindow
+from app.core.config import get_settings
+from app.core.metrics import get_gateway_metrics
+from app.core.rate_limiter import RateLimiter, RateLimitExceeded
+from app.core.single_flight import SingleFlight
+from app.replay.harness import install_session_adapters
 
 logger = logging.getLogger(__name__)
 
-class APIGateway:
+_disk_cache: Optional[DiskCache] = None
+_disk_cache_lock = threading.Lock()
+
+
+def _get_disk_cache(settings) -> DiskCache:
+    """DiskCache אחד לתהליך - ה-Gateway הסינכרוני והאסינכרוני חולקים אותו"""
+    global _disk_cache
+    if _disk_cache is None:
+        with _disk_cache_lock:
+            if _disk_cache is None:
+                _disk_cache = DiskCache(
+                    settings.GATEWAY_DISK_CACHE_PATH,
+                    max_bytes=settings.GATEWAY_DISK_CACHE_MAX_BYTES,
+                    compact_interval=settings.GATEWAY_DISK_CACHE_COMPACT_INTERVAL_SECONDS
+                )
+    return _disk_cache
+
+
+class CachePlan:
     """
-    Gateway לניהול קריאות API חיצוניות
+    תוצאת בדיקת ה-cache לקריאה אחת, והמדיניות שלה
+        fresh      - יש ערך בתוקף: מחזירים אותו
+        revalidate - פג תוקף לפני פחות מ-max_stale: מחזירים מיד ומרעננים ברקע
+        value      - אם אינו fresh/revalidate: ערך ישן (עד stale_if_error) לשעת כשלון
+    """
+    __slots__ = ("key", "ttl", "max_stale", "stale_if_error", "value", "stale_for")
+    
+    def __init__(self, key: Optional[str], ttl: Optional[int], max_stale: int = 0, stale_if_error: int = 0):
+        self.key = key
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.stale_if_error = stale_if_error
+        self.value: Any = None
+        self.stale_for = 0.0
+    
+    @property
+    def retention(self) -> int:
+        return max(self.max_stale, self.stale_if_error)
+    
+    @property
+    def fresh(self) -> bool:
+        return self.value is not None and not self.stale_for
+    
+    @property
+    def revalidate(self) -> bool:
+        return self.value is not None and 0 < self.stale_for <= self.max_stale
+
+
+class BaseGateway:
+    """
+    החלק המשותף ל-Gateway הסינכרוני והאסינכרוני: cache, rate limiting, circuit breakers
+    ו-TTL לשירות
     """
     
     def __init__(self):
-        self.session = requests.Session()
-        self.request_count = {}
-        self.cache = {}
-        
-    def _check_rate_limit(self, service_name: str, max_requests: int = 100, window_seconds: int = 60) -> bool:
-        """בדיקת Rate Limiting"""
-        current_time = time.time()
+        settings = get_settings()
+        self.rate_limit_strategy = settings.GATEWAY_RATE_LIMIT_STRATEGY
+        self.rate_limiters: Dict[str, RateLimiter] = {}
+        self._rate_limiters_lock = threading.Lock()
+        # namespace לכל שירות - clear_cache(service) הוא O(1)
+        self.cache = TTLCache(
+            max_entries=settings.GATEWAY_CACHE_MAX_ENTRIES,
+            max_bytes=settings.GATEWAY_CACHE_MAX_BYTES,
+            name="gateway"
+        )
+        if settings.GATEWAY_DISK_CACHE_ENABLED:
+            # L2 על דיסק, משותף לכל ה-workers ושורד restart; הזיכרון נשאר L1
+            self.cache = TieredCache(self.cache, _get_disk_cache(settings))
+        self.service_cache_ttls: Dict[str, int] = {}
+        self.service_stale_policies: Dict[str, Tuple[int, int]] = {}
+        self.revalidation_stats: Dict[str, Dict[str, int]] = {}
+        self._revalidation_lock = threading.Lock()
+        self.circuit_breaker_defaults = {
+            "failure_rate_threshold": settings.CIRCUIT_BREAKER_FAILURE_RATE,
+            "window_seconds": settings.CIRCUIT_BREAKER_WINDOW_SECONDS,
+            "minimum_calls": settings.CIRCUIT_BREAKER_MIN_CALLS,
+            "open_seconds": settings.CIRCUIT_BREAKER_OPEN_SECONDS,
+            "half_open_max_calls": settings.CIRCUIT_BREAKER_HALF_OPEN_CALLS
+        }
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self.latencies: Dict[str, LatencyWindow] = {}
+        self._breakers_lock = threading.Lock()
+        self.metrics = get_gateway_metrics()
         
-        if service_name not in self.request_count:
-            self.request_count[service_name] = []
-        
-        # נקה requests ישנים
-        self.request_count[service_name] = [
-            req_time for req_time in self.request_count[service_name]
-            if current_time - req_time < window_seconds
-        ]
-        
-        # בדוק אם עברנו את הלימיט
-        if len(self.request_count[service_name]) >= max_requests:
+    def set_rate_limit(self, service_name: str, max_requests: int, window_seconds: int = 60):
+        """מגבלת הקריאות של שירות - מוגדרת פעם אחת, ומחליפה את ה-RateLimiter הקיים (והמונים שלו)"""
+        with self._rate_limiters_lock:
+            self.rate_limiters[service_name] = RateLimiter(
+                service_name, max_requests, window_seconds, self.rate_limit_strategy
+            )
+    
+    def _get_rate_limiter(self, service_name: str, max_requests: int = 100, window_seconds: int = 60) -> RateLimiter:
+        """
+        RateLimiter לשירות. max_requests / window_seconds משמשים רק אם עוד אין לשירות limiter
+        (לא הוגדר ב-set_rate_limit) - קריאה עם מגבלה אחרת לא בונה אותו מחדש ולא מאפסת את הדלי המשותף
+        """
+        limiter = self.rate_limiters.get(service_name)
+        if limiter is None:
+            with self._rate_limiters_lock:
+                limiter = self.rate_limiters.get(service_name)
+                if limiter is None:
+                    limiter = RateLimiter(service_name, max_requests, window_seconds, self.rate_limit_strategy)
+                    self.rate_limiters[service_name] = limiter
+        return limiter
+    
+    def _check_rate_limit(
+        self,
+        service_name: str,
+        max_requests: int = 100,
+        window_seconds: int = 60,
+        wait: bool = False,
+        wait_timeout: Optional[float] = None
+    ):
+        """בדיקת Rate Limiting - זורק RateLimitExceeded בחריגה (או ממתין אם wait=True)"""
+        try:
+            self._get_rate_limiter(service_name, max_requests, window_seconds).acquire(
+                block=wait, timeout=wait_timeout
+            )
+        except RateLimitExceeded:
             logger.warning(f"Rate limit exceeded for {service_name}")
-            return False
-        
-        # הוסף את הrequest הנוכחי
-        self.request_count[service_name].append(current_time)
-        return True
-    
-    def _get_cache_key(self, url: str, params: Optional[Dict] = None) -> str:
-        """יצירת cache key"""
-        param_str = str(sorted(params.items())) if params else ""
-        return f"{url}:{param_str}"
-    
-    def _get_from_cache(self, cache_key: str, ttl_seconds: int = 300) -> Optional[Any]:
-        """קבלת תוצאה מה-cache"""
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < ttl_seconds:
-                logger.info(f"Cache hit for {cache_key}")
-                return cached_data
-        return None
-    
-    def _set_cache(self, cache_key: str, data: Any):
-        """שמירה ב-cache"""
-        self.cache[cache_key] = (data, time.time())
+            self.metrics.record_rate_limited(service_name)
+            raise
+    
+    def _check_circuit(self, breaker: CircuitBreaker, probe: bool = False):
+        """check (או before_call לפני ניסיון) של ה-breaker - דחייה נרשמת במדדים"""
+        try:
+            if probe:
+                breaker.before_call()
+            else:
+                breaker.check()
+        except CircuitOpenError:
+            self.metrics.record_short_circuit(breaker.service_name)
+            raise
+    
+    def get_metrics(self, service_name: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """מדדי הקריאות היוצאות לכל שירות (latency, status codes, retries, cache...)"""
+        return self.metrics.snapshot(service_name)
+    
+    def get_rate_limit_stats(self) -> Dict[str, Dict[str, Any]]:
+        """מצב ה-rate limiter של כל שירות"""
+        return {name: limiter.stats() for name, limiter in list(self.rate_limiters.items())}
+    
+    def _get_circuit_breaker(self, service_name: str) -> CircuitBreaker:
+        breaker = self.circuit_breakers.get(service_name)
+        if breaker is None:
+            with self._breakers_lock:
+                breaker = self.circuit_breakers.get(service_name)
+                if breaker is None:
+                    breaker = CircuitBreaker(service_name, **self.circuit_breaker_defaults)
+                    self.circuit_breakers[service_name] = breaker
+        return breaker
+    
+    def configure_circuit_breaker(self, service_name: str, **kwargs):
+        """הגדרות breaker לשירות (failure_rate_threshold, window_seconds, open_seconds...)"""
+        with self._breakers_lock:
+            self.circuit_breakers[service_name] = CircuitBreaker(
+                service_name, **{**self.circuit_breaker_defaults, **kwargs}
+            )
+    
+    def _latency_window(self, service_name: str) -> LatencyWindow:
+        window = self.latencies.get(service_name)
+        if window is None:
+            window = self.latencies.setdefault(service_name, LatencyWindow())
+        return window
+    
+    @staticmethod
+    def _is_upstream_failure(status_code: int) -> bool:
+        """5xx ו-429 נחשבים כשל של ה-upstream; 4xx אחר הוא בעיה בבקשה עצמה"""
+        return status_code >= 500 or status_code == 429
+    
+    def get_circuit_breaker_stats(self) -> Dict[str, Dict[str, Any]]:
+        """מצב ה-breaker של כל שירות + p95 של זמני התגובה האחרונים"""
+        result = {}
+        for name, breaker in list(self.circuit_breakers.items()):
+            p95 = self._latency_window(name).p95
+            result[name] = {**breaker.stats(), "p95_ms": round(p95 * 1000, 1) if p95 is not None else None}
+        return result
+    
+    def _get_cache_key(
+        self,
+        service_name: str,
+        method: str,
+        url: str,
+        params: Optional[Dict] = None,
+        json: Optional[Any] = None
+    ) -> str:
+        """
+        cache key לפי תוכן: hash של method + URL + params + JSON body בצורה קנונית
+        (מפתחות ממוינים) - כך ששני body זהים נותנים אותו key בלי קשר לסדר המפתחות
+        השירות עצמו הוא ה-namespace ב-cache ולכן לא חלק מה-key
+        """
+        canonical = json_lib.dumps(
+            {"method": method.upper(), "url": url, "params": params or {}, "body": json},
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    
+    def set_service_cache_ttl(
+        self,
+        service_name: str,
+        ttl_seconds: int,
+        max_stale: int = 0,
+        stale_if_error: int = 0
+    ):
+        """
+        מדיניות cache ברירת מחדל לשירות (כשהקריאה לא מעבירה ערכים משלה)
+            max_stale: stale-while-revalidate - כמה זמן אחרי ה-TTL מחזירים את הערך הישן
+                       מיד ומרעננים ברקע
+            stale_if_error: עד כמה ישן מותר להחזיר ערך כשה-upstream נכשל
+        """
+        self.service_cache_ttls[service_name] = ttl_seconds
+        self.service_stale_policies[service_name] = (max_stale, stale_if_error)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """סטטיסטיקת cache: hit/stale/miss לכל שירות + גודל, evictions, expirations ורענונים"""
+        return {
+            **self.cache.stats(),
+            "revalidation": {name: dict(stats) for name, stats in list(self.revalidation_stats.items())}
+        }
+    
+    def _revalidation_stat(self, service_name: str, field: str):
+        with self._revalidation_lock:
+            stats = self.revalidation_stats.setdefault(
+                service_name, {"background_refreshes": 0, "refresh_errors": 0, "served_stale_on_error": 0}
+            )
+            stats[field] += 1
+    
+    def _lookup_cache(
+        self,
+        method: str,
+        url: str,
+        service_name: str,
+        params: Optional[Dict],
+        json: Optional[Any],
+        cache_ttl: Optional[int],
+        idempotent: bool,
+        max_stale: Optional[int] = None,
+        stale_if_error: Optional[int] = None
+    ) -> CachePlan:
+        """
+        בדיקת Cache (GET, או POST שסומן כ-idempotent)
+        ל-CachePlan של קריאה שאינה idempotent אין key: אותה אסור לשמור ב-cache
+        או לאחד עם קריאות זהות
+        """
+        plan = self._cache_plan(method, url, service_name, params, json, cache_ttl, idempotent, max_stale, stale_if_error)
+        if plan.key and plan.ttl:
+            self._apply_lookup(plan, service_name, self.cache.lookup(plan.key, namespace=service_name))
+        return plan
+    
+    def _cache_plan(
+        self,
+        method: str,
+        url: str,
+        service_name: str,
+        params: Optional[Dict],
+        json: Optional[Any],
+        cache_ttl: Optional[int],
+        idempotent: bool,
+        max_stale: Optional[int],
+        stale_if_error: Optional[int]
+    ) -> CachePlan:
+        """ה-key והמדיניות של הקריאה, בלי לגשת ל-cache"""
+        if method.upper() != "GET" and not idempotent:
+            return CachePlan(None, cache_ttl)
+        if cache_ttl is None:
+            cache_ttl = self.service_cache_ttls.get(service_name)
+        default_max_stale, default_stale_if_error = self.service_stale_policies.get(service_name, (0, 0))
+        return CachePlan(
+            self._get_cache_key(service_name, method, url, params, json),
+            cache_ttl,
+            default_max_stale if max_stale is None else max_stale,
+            default_stale_if_error if stale_if_error is None else stale_if_error
+        )
+    
+    def _apply_lookup(self, plan: CachePlan, service_name: str, found: Tuple[Any, float]):
+        plan.value, plan.stale_for = found
+        if plan.value is not None and plan.stale_for > plan.retention:
+            # נשמר עם מדיניות stale רחבה יותר מזו של הקריאה הנוכחית
+            plan.value, plan.stale_for = None, 0.0
+        if plan.fresh:
+            logger.info(f"Cache hit for {service_name}:{plan.key}")
+            self.metrics.record_cache(service_name, "hit")
+        else:
+            self.metrics.record_cache(service_name, "stale" if plan.value is not None else "miss")
+    
+    def _store_in_cache(self, plan: CachePlan, service_name: str, result: Any, size: int):
+        if plan.key and plan.ttl:
+            self.cache.set(
+                plan.key, result, ttl=plan.ttl, namespace=service_name, size=size, max_stale=plan.retention
+            )
+    
+    def get_coalescing_stats(self) -> Dict[str, Dict[str, int]]:
+        """single-flight: כמה קריאות יצאו בפועל וכמה קריאות זהות אוחדו אליהן, לכל שירות"""
+        return self.single_flight.stats()
+    
+    def clear_cache(self, service_name: Optional[str] = None):
+        """ניקוי cache"""
+        if service_name:
+            self.cache.invalidate_namespace(service_name)
+        else:
+            self.cache.clear()
+        logger.info(f"Cache cleared for {service_name or 'all services'}")
+
+
+class APIGateway(BaseGateway):
+    """
+    Gateway לניהול קריאות API חיצוניות
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.session = requests.Session()
+        install_session_adapters(self.session)  # record / replay (API_CASSETTE_MODE)
+        self.single_flight = SingleFlight()
+        self._refreshing: Set[Tuple[str, str]] = set()
+        self._refresh_executor = ThreadPoolExecutor(
+            max_workers=get_settings().GATEWAY_REFRESH_WORKERS, thread_name_prefix="gateway-refresh"
+        )
     
     def request(
         self,
@@ -68,7 +353,12 @@ class APIGateway:
         timeout: int = 30,
         max_retries: int = 3,
         cache_ttl: Optional[int] = None,
-        rate_limit: int = 100
+        rate_limit: int = 100,
+        idempotent: bool = False,
+        wait_for_rate_limit: bool = False,
+        rate_limit_timeout: Optional[float] = None,
+        max_stale: Optional[int] = None,
+        stale_if_error: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         ביצוע request עם כל התכונות של Gateway
@@ -82,27 +372,107 @@ class APIGateway:
             json: JSON body
             timeout: Timeout in seconds
             max_retries: מספר ניסיונות חוזרים
-            cache_ttl: זמן שמירה ב-cache (רק ל-GET)
-            rate_limit: מקסימום requests לדקה
+            cache_ttl: זמן שמירה ב-cache (ברירת מחדל: ה-TTL של השירות)
+            rate_limit: מקסימום requests לדקה - רק אם לשירות עוד אין מגבלה (ראו set_rate_limit)
+            idempotent: POST שמחזיר תמיד אותה תשובה לאותו body (למשל inference) - מותר ל-cache
+            wait_for_rate_limit: בחריגה - להמתין לטוקן במקום לזרוק RateLimitExceeded מיד
+            rate_limit_timeout: זמן המתנה מקסימלי לטוקן (None - ללא הגבלה)
+            max_stale: stale-while-revalidate - ערך שפג תוקפו לפני פחות מזה מוחזר מיד
+                       ומתרענן ברקע (ברירת מחדל: המדיניות של השירות)
+            stale_if_error: ערך ישן עד גיל זה מוחזר אם ה-upstream נכשל
         """
         
-        # בדיקת Rate Limit
-        if not self._check_rate_limit(service_name, max_requests=rate_limit):
-            raise Exception(f"Rate limit exceeded for {service_name}")
+        plan = self._lookup_cache(
+            method, url, service_name, params, json, cache_ttl, idempotent, max_stale, stale_if_error
+        )
+        if plan.fresh:
+            return plan.value
+        
+        def send():
+            return self._send(
+                method, url, service_name, headers, params, json, timeout, max_retries,
+                rate_limit, wait_for_rate_limit, rate_limit_timeout, plan
+            )
         
-        # בדיקת Cache (רק ל-GET requests)
-        if method.upper() == "GET" and cache_ttl:
-            cache_key = self._get_cache_key(url, params)
-            cached_result = self._get_from_cache(cache_key, cache_ttl)
-            if cached_result:
-                return cached_result
+        if plan.key is None:
+            return send()
+        
+        # קריאות זהות שרצות במקביל חולקות קריאה אחת ל-upstream
+        def flight():
+            return self.single_flight.do((service_name, plan.key), send, namespace=service_name)
+        
+        if plan.revalidate:
+            self._refresh_in_background(service_name, plan.key, flight)
+            return plan.value
+        if plan.value is None:
+            return flight()
+        try:
+            return flight()
+        except Exception as e:
+            logger.warning(f"Serving stale response for {service_name} after upstream error: {e}")
+            self._revalidation_stat(service_name, "served_stale_on_error")
+            return plan.value
+    
+    def _refresh_in_background(self, service_name: str, request_key: str, flight):
+        """רענון אחד בלבד ברקע לכל key; שגיאה משאירה את הערך הישן ב-cache"""
+        refresh_key = (service_name, request_key)
+        with self._revalidation_lock:
+            if refresh_key in self._refreshing:
+                return
+            self._refreshing.add(refresh_key)
+        self._revalidation_stat(service_name, "background_refreshes")
+        
+        def run():
+            try:
+                flight()
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {service_name}: {e}")
+                self._revalidation_stat(service_name, "refresh_errors")
+            finally:
+                with self._revalidation_lock:
+                    self._refreshing.discard(refresh_key)
+        
+        self._refresh_executor.submit(run)
+    
+    def _send(
+        self,
+        method: str,
+        url: str,
+        service_name: str,
+        headers: Optional[Dict],
+        params: Optional[Dict],
+        json: Optional[Dict],
+        timeout: int,
+        max_retries: int,
+        rate_limit: int,
+        wait_for_rate_limit: bool,
+        rate_limit_timeout: Optional[float],
+        plan: CachePlan
+    ) -> Dict[str, Any]:
+        """הקריאה בפועל: circuit breaker, rate limit, retries ושמירה ב-cache"""
+        # breaker פתוח - נכשלים מיד, בלי להמתין ל-timeouts של upstream חולה
+        breaker = self._get_circuit_breaker(service_name)
+        self._check_circuit(breaker)
+        
+        # בדיקת Rate Limit (רק לקריאות שיוצאות בפועל)
+        self._check_rate_limit(
+            service_name,
+            max_requests=rate_limit,
+            wait=wait_for_rate_limit,
+            wait_timeout=rate_limit_timeout
+        )
         
         # ביצוע Request עם Retry Logic
         last_exception = None
         for attempt in range(max_retries):
+            # אם ה-breaker נפתח באמצע - לא ממשיכים לנסות
+            self._check_circuit(breaker, probe=True)
+            if attempt:
+                self.metrics.record_retry(service_name)
             try:
                 logger.info(f"Requesting {service_name}: {method} {url} (attempt {attempt + 1}/{max_retries})")
                 
+                started = time.monotonic()
                 response = self.session.request(
                     method=method,
                     url=url,
@@ -111,20 +481,26 @@ class APIGateway:
                     json=json,
                     timeout=timeout
                 )
+                self.metrics.record_response(service_name, response.status_code, time.monotonic() - started)
                 
+                if self._is_upstream_failure(response.status_code):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                    self._latency_window(service_name).add(time.monotonic() - started)
                 response.raise_for_status()
                 result = response.json() if response.content else {}
                 
                 # שמירה ב-cache
-                if method.upper() == "GET" and cache_ttl:
-                    cache_key = self._get_cache_key(url, params)
-                    self._set_cache(cache_key, result)
+                self._store_in_cache(plan, service_name, result, len(response.content))
                 
                 logger.info(f"Request successful for {service_name}")
                 return result
                 
             except requests.exceptions.Timeout as e:
                 last_exception = e
+                breaker.record_failure()
+                self.metrics.record_timeout(service_name)
                 logger.warning(f"Timeout on attempt {attempt + 1} for {service_name}")
                 time.sleep(2 ** attempt)  # Exponential backoff
                 
@@ -134,11 +510,14 @@ class APIGateway:
                 
             except requests.exceptions.RequestException as e:
                 last_exception = e
+                breaker.record_failure()
+                self.metrics.record_error(service_name)
                 logger.error(f"Request failed for {service_name}: {e}")
                 if attempt < max_retries - 1:
                     time.sleep(2 ** attempt)
                 
             except Exception as e:
+                breaker.record_cancelled()
                 logger.error(f"Unexpected error for {service_name}: {e}")
                 raise
         
@@ -151,14 +530,6 @@ class APIGateway:
     def post(self, url: str, service_name: str, **kwargs) -> Dict[str, Any]:
         """POST request"""
         return self.request("POST", url, service_name, **kwargs)
-    
-    def clear_cache(self, service_name: Optional[str] = None):
-        """ניקוי cache"""
-        if service_name:
-            self.cache = {k: v for k, v in self.cache.items() if service_name not in k}
-        else:
-            self.cache.clear()
-        logger.info(f"Cache cleared for {service_name or 'all services'}")
 
 
 # Singleton instance
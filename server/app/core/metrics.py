@@ -0,0 +1,231 @@
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence
+
+# גבולות ה-buckets בשניות (כמו ברירת המחדל של Prometheus, עם זנב ארוך ל-LLM)
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CACHE_OUTCOMES = ("hit", "stale", "miss")
+
+
+class Histogram:
+    """
+    היסטוגרמה עם buckets קבועים - כל observe הוא O(log buckets) וללא הקצאות,
+    כך שאפשר לרשום כל קריאה. אחוזונים מוערכים מה-buckets (interpolation לינארי)
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # האחרון: +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index else 0.0
+                if index == len(self.buckets):
+                    return lower  # מעל ה-bucket האחרון - לא ידוע כמה מעל
+                return lower + (self.buckets[index] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def cumulative(self) -> List[int]:
+        """ספירות מצטברות לכל גבול (le), כמו ב-Prometheus"""
+        total, result = 0, []
+        for bucket_count in self.counts:
+            total += bucket_count
+            result.append(total)
+        return result
+
+
+class ServiceMetrics:
+    """המונים של שירות אחד"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.latency = Histogram(buckets)
+        self.status_codes: Dict[int, int] = {}
+        self.attempts = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.short_circuited = 0
+        self.cache = {outcome: 0 for outcome in CACHE_OUTCOMES}
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = sum(self.cache.values())
+
+        def ms(seconds: Optional[float]) -> Optional[float]:
+            return round(seconds * 1000, 1) if seconds is not None else None
+
+        return {
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "short_circuited": self.short_circuited,
+            "status_codes": {str(code): count for code, count in sorted(self.status_codes.items())},
+            "latency_ms": {
+                "count": self.latency.count,
+                "avg": ms(self.latency.sum / self.latency.count) if self.latency.count else None,
+                "p50": ms(self.latency.percentile(0.5)),
+                "p95": ms(self.latency.percentile(0.95)),
+                "p99": ms(self.latency.percentile(0.99))
+            },
+            "cache": {
+                **self.cache,
+                # כמו TTLCache.stats: רק hit טרי; stale (שעולה דווקא כשה-upstream נכשל) מדווח בנפרד
+                "hit_ratio": round(self.cache["hit"] / lookups, 3) if lookups else 0.0,
+                "stale_ratio": round(self.cache["stale"] / lookups, 3) if lookups else 0.0
+            }
+        }
+
+
+class GatewayMetrics:
+    """
+    מדדים לכל קריאה יוצאת, לפי שירות: זמני תגובה (היסטוגרמה), status codes, retries,
+    timeouts, דחיות rate limit / circuit breaker ו-cache hit/stale/miss
+
+    אחד לתהליך (get_gateway_metrics) - ה-Gateway הסינכרוני והאסינכרוני כותבים לאותו מקום
+    זמן תגובה נמדד לכל ניסיון שחזרה ממנו תשובה (כולל 4xx/5xx), לא לקריאה הלוגית
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._services: Dict[str, ServiceMetrics] = {}
+
+    def _service(self, service_name: str) -> ServiceMetrics:
+        metrics = self._services.get(service_name)
+        if metrics is None:
+            metrics = self._services.setdefault(service_name, ServiceMetrics(self.buckets))
+        return metrics
+
+    # ============================================
+    # Recording
+    # ============================================
+
+    def record_response(self, service_name: str, status_code: int, seconds: float) -> None:
+        with self._lock:
+            metrics = self._service(service_name)
+            metrics.attempts += 1
+            metrics.status_codes[status_code] = metrics.status_codes.get(status_code, 0) + 1
+            metrics.latency.observe(seconds)
+
+    def record_timeout(self, service_name: str) -> None:
+        with self._lock:
+            metrics = self._service(service_name)
+            metrics.attempts += 1
+            metrics.timeouts += 1
+
+    def record_error(self, service_name: str) -> None:
+        """שגיאת תקשורת שאינה timeout (connection refused, reset...)"""
+        with self._lock:
+            metrics = self._service(service_name)
+            metrics.attempts += 1
+            metrics.errors += 1
+
+    def record_retry(self, service_name: str) -> None:
+        with self._lock:
+            self._service(service_name).retries += 1
+
+    def record_rate_limited(self, service_name: str) -> None:
+        with self._lock:
+            self._service(service_name).rate_limited += 1
+
+    def record_short_circuit(self, service_name: str) -> None:
+        with self._lock:
+            self._service(service_name).short_circuited += 1
+
+    def record_cache(self, service_name: str, outcome: str) -> None:
+        """outcome: hit / stale / miss"""
+        with self._lock:
+            self._service(service_name).cache[outcome] += 1
+
+    # ============================================
+    # Export
+    # ============================================
+
+    def snapshot(self, service_name: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """המדדים לכל שירות (או לשירות אחד) כ-dict"""
+        with self._lock:
+            return {
+                name: metrics.snapshot()
+                for name, metrics in sorted(self._services.items())
+                if service_name is None or name == service_name
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._services.clear()
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines = [
+            "# HELP gateway_request_duration_seconds Upstream response time per attempt",
+            "# TYPE gateway_request_duration_seconds histogram"
+        ]
+        with self._lock:
+            services = sorted(self._services.items())
+            for name, metrics in services:
+                bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, metrics.latency.cumulative()):
+                    lines.append(f'gateway_request_duration_seconds_bucket{{service="{name}",le="{bound}"}} {count}')
+                lines.append(f'gateway_request_duration_seconds_sum{{service="{name}"}} {metrics.latency.sum:.6f}')
+                lines.append(f'gateway_request_duration_seconds_count{{service="{name}"}} {metrics.latency.count}')
+
+            lines += [
+                "# HELP gateway_responses_total Upstream responses by status code",
+                "# TYPE gateway_responses_total counter"
+            ]
+            for name, metrics in services:
+                for code, count in sorted(metrics.status_codes.items()):
+                    lines.append(f'gateway_responses_total{{service="{name}",code="{code}"}} {count}')
+
+            counters = (
+                ("attempts", "Upstream attempts (including retries)"),
+                ("retries", "Retried attempts"),
+                ("timeouts", "Attempts that timed out"),
+                ("errors", "Attempts that failed with a transport error"),
+                ("rate_limited", "Calls rejected by the rate limiter"),
+                ("short_circuited", "Calls rejected by an open circuit breaker")
+            )
+            for field, help_text in counters:
+                lines += [f"# HELP gateway_{field}_total {help_text}", f"# TYPE gateway_{field}_total counter"]
+                for name, metrics in services:
+                    lines.append(f'gateway_{field}_total{{service="{name}"}} {getattr(metrics, field)}')
+
+            lines += [
+                "# HELP gateway_cache_lookups_total Cache lookups by outcome",
+                "# TYPE gateway_cache_lookups_total counter"
+            ]
+            for name, metrics in services:
+                for outcome in CACHE_OUTCOMES:
+                    lines.append(
+                        f'gateway_cache_lookups_total{{service="{name}",outcome="{outcome}"}} {metrics.cache[outcome]}'
+                    )
+        return "\n".join(lines) + "\n"
+
+
+# Singleton
+_gateway_metrics: Optional[GatewayMetrics] = None
+_gateway_metrics_lock = threading.Lock()
+
+def get_gateway_metrics() -> GatewayMetrics:
+    global _gateway_metrics
+    if _gateway_metrics is None:
+        with _gateway_metrics_lock:
+            if _gateway_metrics is None:
+                _gateway_metrics = GatewayMetrics()
+    return _gateway_metrics
@@ -2,6 +2,8 @@ from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .config import Settings
+from .rate_limiter import RateLimitExceeded
+from .circuit_breaker import CircuitOpenError
 
 def add_middlewares(app: FastAPI, settings: Settings) -> None:
     app.add_middleware(
@@ -16,6 +18,22 @@ def add_middlewares(app: FastAPI, settings: Settings) -> None:
     async def http_exception_handler(_: Request, exc: HTTPException):
         return JSONResponse(status_code=exc.status_code, content={"error": exc.detail})
 
+    @app.exception_handler(RateLimitExceeded)
+    async def rate_limit_exception_handler(_: Request, exc: RateLimitExceeded):
+        return JSONResponse(
+            status_code=429,
+            content={"error": str(exc)},
+            headers={"Retry-After": str(max(1, round(exc.retry_after)))}
+        )
+
+    @app.exception_handler(CircuitOpenError)
+    async def circuit_open_exception_handler(_: Request, exc: CircuitOpenError):
+        return JSONResponse(
+            status_code=503,
+            content={"error": str(exc)},
+            headers={"Retry-After": str(max(1, round(exc.retry_after)))}
+        )
+
     @app.exception_handler(Exception)
     async def unhandled_exception_handler(_: Request, exc: Exception):
         return JSONResponse(status_code=500, content={"error": "Internal Server Error"})
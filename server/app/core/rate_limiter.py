@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class RateLimitExceeded(Exception):
+    """חריגה ממגבלת הקצב - retry_after הוא הזמן (בשניות) עד שתתפנה הרשאה"""
+
+    def __init__(self, service_name: str, retry_after: float):
+        self.service_name = service_name
+        self.retry_after = retry_after
+        super().__init__(f"Rate limit exceeded for {service_name} (retry after {retry_after:.2f}s)")
+
+
+class TokenBucket:
+    """
+    Token bucket: capacity טוקנים, מתמלא בקצב rate לשנייה
+    מאפשר burst עד capacity ואז קצב קבוע. O(1) לכל בדיקה
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def try_acquire(self, now: float, tokens: float = 1) -> float:
+        """מחזיר 0 אם נלקח טוקן, אחרת כמה שניות לחכות"""
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    @property
+    def available(self) -> float:
+        return self._tokens
+
+
+class SlidingWindowCounter:
+    """
+    Sliding window counter: שני מונים (חלון נוכחי וקודם) במקום רשימת timestamps
+    ההערכה: previous * (החלק מהחלון הקודם שעוד בתוך החלון הנע) + current
+    """
+
+    def __init__(self, limit: int, window_seconds: float):
+        self.limit = limit
+        self.window = window_seconds
+        self._window_start = time.monotonic()
+        self._current = 0
+        self._previous = 0
+
+    def _roll(self, now: float) -> None:
+        elapsed_windows = int((now - self._window_start) // self.window)
+        if elapsed_windows >= 1:
+            self._previous = self._current if elapsed_windows == 1 else 0
+            self._current = 0
+            self._window_start += elapsed_windows * self.window
+
+    def try_acquire(self, now: float, tokens: float = 1) -> float:
+        """מחזיר 0 אם הבקשה נספרה, אחרת כמה שניות לחכות"""
+        self._roll(now)
+        elapsed = now - self._window_start
+        weight = 1 - elapsed / self.window
+        if self._previous * weight + self._current + tokens <= self.limit:
+            self._current += tokens
+            return 0.0
+        if self._current + tokens > self.limit or not self._previous:
+            return self.window - elapsed
+        # הזמן עד שמספיק מהחלון הקודם "יוצא" מהחלון הנע
+        needed_weight = (self.limit - self._current - tokens) / self._previous
+        return max(0.001, (weight - needed_weight) * self.window)
+
+    @property
+    def available(self) -> float:
+        elapsed = time.monotonic() - self._window_start
+        used = self._previous * max(0.0, 1 - elapsed / self.window) + self._current
+        return max(0.0, self.limit - used)
+
+
+class RateLimiter:
+    """
+    מגביל קצב thread-safe לשירות אחד: max_requests ל-window_seconds
+    strategy: "token_bucket" (ברירת מחדל, מאפשר burst) או "sliding_window"
+
+    הקורא בוחר מה קורה בחריגה:
+        block=False - זריקת RateLimitExceeded מיד (fail fast)
+        block=True  - המתנה עד שמתפנה הרשאה (עד timeout, ואז RateLimitExceeded)
+    """
+
+    STRATEGIES = ("token_bucket", "sliding_window")
+
+    def __init__(
+        self,
+        service_name: str,
+        max_requests: int,
+        window_seconds: float = 60,
+        strategy: str = "token_bucket"
+    ):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown rate limit strategy: {strategy}")
+        self.service_name = service_name
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.strategy = strategy
+        self._lock = threading.Lock()
+        if strategy == "token_bucket":
+            self._impl = TokenBucket(rate=max_requests / window_seconds, capacity=max_requests)
+        else:
+            self._impl = SlidingWindowCounter(limit=max_requests, window_seconds=window_seconds)
+        self.rejected = 0
+        self.waited = 0
+
+    def try_acquire(self) -> float:
+        """ניסיון אחד בלי המתנה: 0 אם הותר, אחרת זמן ההמתנה המשוער"""
+        with self._lock:
+            return self._impl.try_acquire(time.monotonic())
+
+    def _reject(self, wait: float) -> RateLimitExceeded:
+        with self._lock:
+            self.rejected += 1
+        return RateLimitExceeded(self.service_name, wait)
+
+    def _deadline(self, timeout: Optional[float]) -> Optional[float]:
+        return time.monotonic() + timeout if timeout is not None else None
+
+    def _next_wait(self, wait: float, block: bool, deadline: Optional[float], first: bool) -> float:
+        if not block or (deadline is not None and deadline - time.monotonic() < wait):
+            raise self._reject(wait)
+        if first:
+            with self._lock:
+                self.waited += 1
+        return wait
+
+    def acquire(self, block: bool = False, timeout: Optional[float] = None) -> None:
+        """גרסה סינכרונית (threads)"""
+        deadline = self._deadline(timeout)
+        first = True
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            time.sleep(self._next_wait(wait, block, deadline, first))
+            first = False
+
+    async def acquire_async(self, block: bool = False, timeout: Optional[float] = None) -> None:
+        """גרסה אסינכרונית - ההמתנה לא תופסת thread"""
+        deadline = self._deadline(timeout)
+        first = True
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(self._next_wait(wait, block, deadline, first))
+            first = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "strategy": self.strategy,
+                "max_requests": self.max_requests,
+                "window_seconds": self.window_seconds,
+                "available": round(self._impl.available, 2),
+                "rejected": self.rejected,
+                "waited": self.waited
+            }
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Stats:
+    """מונים לכל שירות: calls - קריאות שיצאו בפועל, collapsed - קריאות זהות שהצטרפו אליהן"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_namespace: Dict[str, Dict[str, int]] = {}
+
+    def record(self, namespace: str, leader: bool) -> None:
+        with self._lock:
+            stats = self._by_namespace.setdefault(namespace, {"calls": 0, "collapsed": 0})
+            stats["calls" if leader else "collapsed"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {namespace: dict(stats) for namespace, stats in self._by_namespace.items()}
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """
+    Single-flight ל-threads: קריאות זהות שרצות במקביל (אותו key) חולקות
+    קריאה אחת ל-upstream - הראשונה מבצעת, השאר ממתינות ומקבלות את אותה תוצאה
+    (או את אותה שגיאה)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = _Stats()
+
+    def do(self, key: Hashable, fn: Callable[[], Any], namespace: str = "default") -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        self._stats.record(namespace, leader)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return self._stats.snapshot()
+
+
+class AsyncSingleFlight:
+    """
+    Single-flight ל-asyncio: הקריאה רצה כ-task אחד וכולם (כולל הראשון) ממתינים לו
+    דרך shield - ביטול של ממתין אחד לא מבטל את הקריאה עבור האחרים
+    tasks נשמרים לפי event loop, כי אי אפשר להמתין ל-task מ-loop אחר
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._stats = _Stats()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], namespace: str = "default") -> Any:
+        task_key = (id(asyncio.get_running_loop()), key)
+        task = self._tasks.get(task_key)
+        leader = task is None
+        if leader:
+            task = asyncio.ensure_future(fn())
+            self._tasks[task_key] = task
+            task.add_done_callback(lambda t: self._finish(task_key, t))
+        self._stats.record(namespace, leader)
+        return await asyncio.shield(task)
+
+    def _finish(self, task_key: Hashable, task: asyncio.Task) -> None:
+        self._tasks.pop(task_key, None)
+        if not task.cancelled():
+            task.exception()  # מסמן שהשגיאה נקראה גם אם כל הממתינים בוטלו
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return self._stats.snapshot()
@@ -0,0 +1,60 @@
+import hashlib
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+
+# פרמטרים של מעקב/קמפיינים - לא משנים את התוכן
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ocid", "cmpid", "ref", "ref_src", "referrer", "smid", "smtyp",
+    "ito", "ns_mchannel", "ns_source", "ns_campaign", "ns_linkname", "ns_fee", "_ga", "_hsenc", "_hsmi"
+})
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_", "at_", "__twitter")
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+_SLASHES = re.compile(r"/{2,}")
+
+
+def _is_tracking(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonical_url(url: str) -> str:
+    """
+    צורה אחידה של URL לזיהוי כפילויות:
+    https תמיד, host באותיות קטנות בלי www. ובלי פורט ברירת מחדל, בלי fragment,
+    בלי פרמטרי מעקב (utm_*, fbclid...), שאר הפרמטרים ממוינים, בלי / בסוף הנתיב
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url if "://" in url else f"https://{url}")
+        port = parts.port
+    except ValueError:
+        return url  # פורט לא מספרי / מחוץ לטווח, IPv6 שבור - משאירים כמו שהוא במקום להפיל את הכותב
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return url  # mailto:, ftp: וכו' - משאירים כמו שהם
+
+    host = (parts.hostname or "").rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    if port and str(port) != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+
+    # קידוד אחיד של הנתיב (%7E ו-~ הם אותו דבר)
+    path = quote(unquote(_SLASHES.sub("/", parts.path)), safe="/:@!$&'()*+,;=-._~")
+    path = path.rstrip("/")
+
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking(name)
+    ))
+    return urlunsplit(("https", host, path, query, ""))
+
+
+def url_hash(url: Optional[str]) -> Optional[str]:
+    """hash באורך קבוע (32 תווי hex) של ה-URL הקנוני - לעמודת url_hash"""
+    if not url:
+        return None
+    return hashlib.blake2b(canonical_url(url).encode("utf-8"), digest_size=16).hexdigest()
@@ -15,7 +15,9 @@ from .events import (
     LikeRemovedEvent
 )
 
-from .event_store import EventStore, get_event_store
+from .event_store import EventStore, ConcurrencyError, get_event_store
+from .file_event_store import FileEventStore, get_file_event_store
+from .event_bus import EventBus, Subscription, get_event_bus
 
 __all__ = [
     # Events
@@ -35,5 +37,12 @@ __all__ = [
     "LikeRemovedEvent",
     
     "EventStore",
-    "get_event_store"
+    "ConcurrencyError",
+    "get_event_store",
+    "FileEventStore",
+    "get_file_event_store",
+
+    "EventBus",
+    "Subscription",
+    "get_event_bus"
 ]
\ No newline at end of file
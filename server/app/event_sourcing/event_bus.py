@@ -0,0 +1,243 @@
+import asyncio
+import json
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# הודעה שלא נשמרת ב-EventStore - רק נדחפת ללקוחות
+ARTICLE_STATS_CHANGED = "ArticleStatsChanged"
+# נשלח למנוי שלא עמד בקצב - עליו לטעון הכל מחדש
+RESYNC = "Resync"
+
+# שדות כבדים שלא נשלחים ב-push (הלקוח מביא אותם לפי דרישה)
+_HEAVY_FIELDS = ("content",)
+
+
+class Subscription:
+    """
+    מנוי אחד (חיבור SSE אחד) עם פילטרים
+    כל פילטר שהוא None פירושו "הכל"
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        event_types: Optional[Set[str]] = None,
+        aggregate_ids: Optional[Set[int]] = None,
+        categories: Optional[Set[str]] = None,
+        aggregate_type: str = "Article",
+        max_queue: int = 256,
+        queue: Optional[asyncio.Queue] = None
+    ):
+        self.loop = loop
+        self.event_types = event_types
+        self.aggregate_type = aggregate_type
+        self.aggregate_ids = aggregate_ids
+        self.categories = {c.lower() for c in categories} if categories else None
+        self.queue: asyncio.Queue = queue if queue is not None else asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def matches(self, message: Dict[str, Any]) -> bool:
+        if self.event_types is not None and message["event_type"] not in self.event_types:
+            return False
+        if self.aggregate_ids is not None and (
+            message["aggregate_type"] != self.aggregate_type or message["aggregate_id"] not in self.aggregate_ids
+        ):
+            return False
+        if self.categories is not None:
+            category = message.get("category")
+            if not category or category.lower() not in self.categories:
+                return False
+        return True
+
+    def _offer(self, frame: bytes) -> None:
+        """רץ ב-event loop של המנוי"""
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # מנוי איטי: זורקים את התור ומבקשים ממנו לטעון מחדש
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(format_sse(RESYNC, {"dropped": self.dropped}))
+
+    async def get(self, timeout: float) -> Optional[bytes]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+def format_sse(event_type: str, data: Dict[str, Any], event_id: Optional[int] = None) -> bytes:
+    """frame בפורמט Server-Sent Events"""
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, default=str)}")
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+class EventBus:
+    """
+    Pub/Sub בתוך התהליך
+    publish נקרא מכל thread (גם מה-threadpool של FastAPI); המסירה למנויים
+    נעשית ב-event loop שלהם. כל הודעה עוברת סריאליזציה פעם אחת בלבד,
+    ויש קפיצה אחת בין threads לכל loop - לא לכל מנוי.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wildcard: Set[Subscription] = set()
+        self._by_type: Dict[str, Set[Subscription]] = {}
+        self._by_aggregate: Dict[Tuple[str, int], Set[Subscription]] = {}
+        self.published = 0
+        self.delivered = 0
+
+    # ============================================
+    # Subscribe
+    # ============================================
+
+    def subscribe(
+        self,
+        event_types: Optional[Iterable[str]] = None,
+        aggregate_ids: Optional[Iterable[int]] = None,
+        categories: Optional[Iterable[str]] = None,
+        aggregate_type: str = "Article",
+        max_queue: int = 256,
+        queue: Optional[asyncio.Queue] = None
+    ) -> Subscription:
+        """
+        חייב להיקרא מתוך event loop פעיל
+        queue - תור של מנוי קיים, כדי שכמה מנויים יזינו חיבור אחד
+        """
+        subscription = Subscription(
+            loop=asyncio.get_running_loop(),
+            event_types=set(event_types) if event_types else None,
+            aggregate_ids=set(aggregate_ids) if aggregate_ids else None,
+            categories=set(categories) if categories else None,
+            aggregate_type=aggregate_type,
+            max_queue=max_queue,
+            queue=queue
+        )
+        with self._lock:
+            for bucket in self._buckets(subscription):
+                bucket.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            for bucket in self._buckets(subscription):
+                bucket.discard(subscription)
+
+    def _buckets(self, subscription: Subscription) -> List[Set[Subscription]]:
+        # המנוי נרשם באינדקס הכי סלקטיבי שלו, כך ש-publish לא סורק את כולם
+        if subscription.aggregate_ids is not None:
+            return [
+                self._by_aggregate.setdefault((subscription.aggregate_type, i), set())
+                for i in subscription.aggregate_ids
+            ]
+        if subscription.event_types is not None:
+            return [self._by_type.setdefault(t, set()) for t in subscription.event_types]
+        return [self._wildcard]
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            unique = set(self._wildcard)
+            for bucket in self._by_type.values():
+                unique.update(bucket)
+            for bucket in self._by_aggregate.values():
+                unique.update(bucket)
+            return len(unique)
+
+    # ============================================
+    # Publish
+    # ============================================
+
+    def publish_event(self, event: Dict[str, Any]) -> None:
+        """פרסום אירוע שנשמר ב-EventStore"""
+        event_data = event.get("event_data") or {}
+        updated_fields = event_data.get("updated_fields") or {}
+        self.publish(
+            event_type=event["event_type"],
+            aggregate_type=event["aggregate_type"],
+            aggregate_id=event["aggregate_id"],
+            event_data={k: v for k, v in event_data.items() if k not in _HEAVY_FIELDS},
+            event_id=event.get("id"),
+            version=event.get("version"),
+            category=event_data.get("category") or updated_fields.get("category")
+        )
+
+    def publish(
+        self,
+        event_type: str,
+        aggregate_type: str,
+        aggregate_id: int,
+        event_data: Dict[str, Any],
+        event_id: Optional[int] = None,
+        version: Optional[int] = None,
+        category: Optional[str] = None
+    ) -> int:
+        """מחזיר את מספר המנויים שההודעה נמסרה אליהם"""
+        message = {
+            "event_type": event_type,
+            "aggregate_type": aggregate_type,
+            "aggregate_id": aggregate_id,
+            "category": category
+        }
+
+        with self._lock:
+            self.published += 1
+            candidates = set(self._wildcard)
+            candidates.update(self._by_type.get(event_type, ()))
+            candidates.update(self._by_aggregate.get((aggregate_type, aggregate_id), ()))
+
+        # מנויים שחולקים תור (אותו חיבור) מקבלים את ההודעה פעם אחת
+        targets = []
+        seen_queues = set()
+        for subscription in candidates:
+            if id(subscription.queue) not in seen_queues and subscription.matches(message):
+                seen_queues.add(id(subscription.queue))
+                targets.append(subscription)
+        if not targets:
+            return 0
+
+        message["event_data"] = event_data
+        message["version"] = version
+        frame = format_sse(event_type, message, event_id)
+
+        by_loop: Dict[asyncio.AbstractEventLoop, List[Subscription]] = {}
+        for subscription in targets:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+
+        for loop, subscriptions in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver, frame, subscriptions)
+            except RuntimeError:
+                # ה-loop נסגר - המנויים ינוקו כשהחיבור שלהם ייסגר
+                logger.warning("Event bus: dropping delivery to a closed event loop")
+
+        self.delivered += len(targets)
+        return len(targets)
+
+
+def _deliver(frame: bytes, subscriptions: List[Subscription]) -> None:
+    for subscription in subscriptions:
+        subscription._offer(frame)
+
+
+# Singleton
+_event_bus: Optional[EventBus] = None
+_event_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> EventBus:
+    global _event_bus
+    if _event_bus is None:
+        with _event_bus_lock:
+            if _event_bus is None:
+                _event_bus = EventBus()
+    return _event_bus
@@ -2,59 +2,192 @@ import json
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 
+from app.core.config import get_settings
 from app.event_sourcing.events import BaseEvent, AggregateType, EventType
+from app.event_sourcing.event_bus import get_event_bus
+
+
+# החלת רשימת אירועים על מצב (State) - משותף לכל ה-backends
+def build_state(events: List[Dict[str, Any]], aggregate_id: int, state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    state = dict(state) if state else {}
+    for event in events:
+        event_type = event["event_type"]
+        event_data = event["event_data"]
+
+        if event_type == "ArticleCreated":
+            state = event_data.copy()
+            state["id"] = aggregate_id
+            state["is_deleted"] = False
+        elif event_type == "ArticleUpdated":
+            updated_fields = event_data.get("updated_fields", {})
+            state.update(updated_fields)
+        elif event_type == "ArticleDeleted":
+            state["is_deleted"] = True
+            state["deleted_at"] = event_data.get("deleted_at")
+        elif event_type == "UserRegistered":
+            state = event_data.copy()
+            state["id"] = aggregate_id
+            state["is_active"] = True
+        elif event_type == "UserUpdated":
+            updated_fields = event_data.get("updated_fields", {})
+            state.update(updated_fields)
+    return state
+
+
+# דחיפת אירוע שנשמר ל-EventBus (ללקוחות SSE) - משותף לכל ה-backends
+def publish_saved_event(event_id: int, event: BaseEvent, event_type: str, aggregate_type: str) -> None:
+    try:
+        get_event_bus().publish_event({
+            "id": event_id,
+            "event_type": event_type,
+            "aggregate_type": aggregate_type,
+            "aggregate_id": event.aggregate_id,
+            "event_data": event.event_data,
+            "version": event.version
+        })
+    except Exception as e:
+        # האירוע כבר נשמר - כשל ב-push לא מכשיל את הכתיבה
+        print(f"⚠️ Event bus publish failed for event {event_id}: {e}")
+
+
+class ConcurrencyError(Exception):
+    """כותב אחר הוסיף אירוע ל-aggregate מאז שנקראה הגרסה הצפויה"""
+
+    def __init__(self, aggregate_type: str, aggregate_id: int, expected_version: Optional[int], actual_version: int):
+        self.aggregate_type = aggregate_type
+        self.aggregate_id = aggregate_id
+        self.expected_version = expected_version
+        self.actual_version = actual_version
+        super().__init__(
+            f"Concurrency conflict on {aggregate_type}:{aggregate_id} - "
+            f"expected version {expected_version}, actual {actual_version}"
+        )
 
 
 class EventStore:
     # מחלקה שמנהלת אירועים (Event Sourcing)
+    MAX_APPEND_RETRIES = 3
+
+    _APPEND_SQL = """
+        INSERT INTO events (
+            event_type, 
+            aggregate_id, 
+            aggregate_type, 
+            event_data, 
+            metadata,
+            user_id, 
+            version
+        )
+        OUTPUT INSERTED.id, INSERTED.version
+        SELECT
+            :event_type, 
+            :aggregate_id, 
+            :aggregate_type, 
+            :event_data,
+            :metadata,
+            :user_id, 
+            v.current_version + 1
+        FROM (
+            SELECT COALESCE(MAX(version), 0) AS current_version
+            FROM events
+            WHERE aggregate_type = :aggregate_type
+              AND aggregate_id = :aggregate_id
+        ) v
+    """
+
     def __init__(self, db: Session):
         self.db = db
 
     # שמירת אירוע במסד הנתונים
-    def save_event(self, event: BaseEvent) -> int:
+    # הגרסה נקבעת כאן: הגרסה האחרונה של ה-aggregate + 1.
+    # expected_version - בדיקה אופטימית: אם מישהו אחר כתב בינתיים נזרק ConcurrencyError.
+    # ללא נעילות - ה-unique index על (aggregate_type, aggregate_id, version) דוחה כותב מתנגש.
+    def save_event(self, event: BaseEvent, expected_version: Optional[int] = None) -> int:
         event_type_str = event.event_type.value if isinstance(event.event_type, EventType) else event.event_type
         aggregate_type_str = event.aggregate_type.value if isinstance(event.aggregate_type, AggregateType) else event.aggregate_type
 
-        insert_query = text("""
-            INSERT INTO events (
-                event_type, 
-                aggregate_id, 
-                aggregate_type, 
-                event_data, 
-                metadata,
-                user_id, 
-                version
-            )
-            OUTPUT INSERTED.id
-            VALUES (
-                :event_type, 
-                :aggregate_id, 
-                :aggregate_type, 
-                :event_data,
-                :metadata,
-                :user_id, 
-                :version
-            )
-        """)
+        insert_sql = self._APPEND_SQL
+        params = self._append_params(event)
+        if expected_version is not None:
+            insert_sql += " WHERE v.current_version = :expected_version"
+            params["expected_version"] = expected_version
+
+        for attempt in range(self.MAX_APPEND_RETRIES):
+            try:
+                row = self.db.execute(text(insert_sql), params).fetchone()
+                self.db.commit()
+            except IntegrityError as e:
+                self.db.rollback()
+                msg = str(e.orig)
+                if "2627" not in msg and "2601" not in msg:
+                    raise
+                # כותב אחר תפס את אותה גרסה
+                if expected_version is not None:
+                    raise ConcurrencyError(aggregate_type_str, event.aggregate_id, expected_version,
+                                           self.get_aggregate_version(aggregate_type_str, event.aggregate_id))
+                continue
+
+            if row is None:
+                self.db.rollback()
+                raise ConcurrencyError(aggregate_type_str, event.aggregate_id, expected_version,
+                                       self.get_aggregate_version(aggregate_type_str, event.aggregate_id))
+
+            event.version = int(row.version)
+            publish_saved_event(int(row.id), event, event_type_str, aggregate_type_str)
+            return int(row.id)
 
-        result = self.db.execute(insert_query, {
-            "event_type": event_type_str,
+        raise ConcurrencyError(aggregate_type_str, event.aggregate_id, expected_version,
+                               self.get_aggregate_version(aggregate_type_str, event.aggregate_id))
+
+    # שמירת כמה אירועים בטרנזקציה אחת (למשל ArticleCreated לכל המאמרים של batch ייבוא)
+    # commit אחד במקום commit לכל אירוע; אם יש התנגשות גרסה - חוזרים לשמירה אחד-אחד
+    def save_events(self, events: List[BaseEvent]) -> List[int]:
+        all_params = [self._append_params(event) for event in events]
+        saved = []
+        try:
+            for params in all_params:
+                row = self.db.execute(text(self._APPEND_SQL), params).fetchone()
+                saved.append((int(row.id), int(row.version)))
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            return [self.save_event(event) for event in events]
+
+        for event, params, (event_id, version) in zip(events, all_params, saved):
+            event.version = version
+            publish_saved_event(event_id, event, params["event_type"], params["aggregate_type"])
+        return [event_id for event_id, _ in saved]
+
+    @staticmethod
+    def _append_params(event: BaseEvent) -> Dict[str, Any]:
+        return {
+            "event_type": event.event_type.value if isinstance(event.event_type, EventType) else event.event_type,
             "aggregate_id": event.aggregate_id,
-            "aggregate_type": aggregate_type_str,
+            "aggregate_type": event.aggregate_type.value if isinstance(event.aggregate_type, AggregateType) else event.aggregate_type,
             "event_data": json.dumps(event.event_data, ensure_ascii=False),
             "metadata": json.dumps(event.metadata, ensure_ascii=False) if event.metadata else None,
-            "user_id": event.user_id,
-            "version": event.version
-        })
+            "user_id": event.user_id
+        }
 
-        event_id = result.scalar()
-        self.db.commit()
-        return int(event_id) if event_id else 0
+    # הגרסה הנוכחית של aggregate (0 אם אין אירועים)
+    def get_aggregate_version(self, aggregate_type: str, aggregate_id: int) -> int:
+        query = text("""
+            SELECT MAX(version) AS max_version
+            FROM events
+            WHERE aggregate_type = :aggregate_type
+              AND aggregate_id = :aggregate_id
+        """)
+        row = self.db.execute(query, {
+            "aggregate_type": aggregate_type,
+            "aggregate_id": aggregate_id
+        }).fetchone()
+        return row.max_version if row and row.max_version else 0
 
-    # קבלת אירועים לפי מזהה וסוג ישות
-    def get_events_by_aggregate(self, aggregate_type: str, aggregate_id: int) -> List[Dict[str, Any]]:
+    # קבלת אירועים לפי מזהה וסוג ישות - range scan על האינדקס לפי גרסה
+    def get_events_by_aggregate(self, aggregate_type: str, aggregate_id: int, after_version: int = 0) -> List[Dict[str, Any]]:
         query = text("""
             SELECT 
                 id,
@@ -69,11 +202,13 @@ class EventStore:
             FROM events
             WHERE aggregate_type = :aggregate_type 
               AND aggregate_id = :aggregate_id
-            ORDER BY created_at ASC, version ASC
+              AND version > :after_version
+            ORDER BY version ASC
         """)
         result = self.db.execute(query, {
             "aggregate_type": aggregate_type,
-            "aggregate_id": aggregate_id
+            "aggregate_id": aggregate_id,
+            "after_version": after_version
         })
         events = []
         for row in result:
@@ -169,32 +304,12 @@ class EventStore:
         row = result.fetchone()
         return row.max_id if row and row.max_id else 0
 
-    # בניית מצב (State) מחדש מכל האירועים
+    # בניית מצב (State) מחדש - מה-Snapshot האחרון ורק האירועים שאחריו
     def replay_events(self, aggregate_type: str, aggregate_id: int) -> Dict[str, Any]:
-        events = self.get_events_by_aggregate(aggregate_type, aggregate_id)
-        state = {}
-        for event in events:
-            event_type = event["event_type"]
-            event_data = event["event_data"]
-
-            if event_type == "ArticleCreated":
-                state = event_data.copy()
-                state["id"] = aggregate_id
-                state["is_deleted"] = False
-            elif event_type == "ArticleUpdated":
-                updated_fields = event_data.get("updated_fields", {})
-                state.update(updated_fields)
-            elif event_type == "ArticleDeleted":
-                state["is_deleted"] = True
-                state["deleted_at"] = event_data.get("deleted_at")
-            elif event_type == "UserRegistered":
-                state = event_data.copy()
-                state["id"] = aggregate_id
-                state["is_active"] = True
-            elif event_type == "UserUpdated":
-                updated_fields = event_data.get("updated_fields", {})
-                state.update(updated_fields)
-        return state
+        snapshot = self.get_latest_snapshot(aggregate_type, aggregate_id)
+        after_version = snapshot["version"] if snapshot else 0
+        events = self.get_events_by_aggregate(aggregate_type, aggregate_id, after_version=after_version)
+        return build_state(events, aggregate_id, snapshot["state"] if snapshot else None)
 
     # שמירת Snapshot של המצב
     def save_snapshot(self, aggregate_type: str, aggregate_id: int, state: Dict[str, Any], version: int) -> int:
@@ -249,6 +364,9 @@ class EventStore:
         return None
 
 
-# פונקציה שמחזירה מופע של EventStore
-def get_event_store(db: Session) -> EventStore:
+# פונקציה שמחזירה מופע של EventStore לפי ה-backend שמוגדר ב-Settings
+def get_event_store(db: Session):
+    if get_settings().EVENT_STORE_BACKEND == "file":
+        from app.event_sourcing.file_event_store import get_file_event_store
+        return get_file_event_store()
     return EventStore(db)
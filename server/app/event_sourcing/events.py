@@ -50,7 +50,7 @@ class BaseEvent(BaseModel):
     event_data: Dict[str, Any]
     metadata: Optional[Dict[str, Any]] = None
     user_id: Optional[int] = None
-    version: int = 1
+    version: int = 0  # נקבע ע"י ה-EventStore בזמן השמירה (גרסה לכל aggregate)
     
     class Config:
         use_enum_values = True
@@ -0,0 +1,457 @@
+import atexit
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Tuple
+
+from app.core.config import get_settings
+from app.event_sourcing.events import BaseEvent, AggregateType, EventType
+from app.event_sourcing.event_store import ConcurrencyError, build_state, publish_saved_event
+
+# כותרת של כל רשומה ב-segment: אורך ה-payload + CRC32 שלו
+_RECORD_HEADER = struct.Struct("<II")
+# רשומה בקובץ האינדקס: offset + אורך כולל (כותרת + payload)
+_INDEX_ENTRY = struct.Struct("<QI")
+
+FSYNC_MODES = ("group", "interval", "none")
+
+
+class _Segment:
+    """
+    קובץ segment בודד (append-only) + אינדקס ה-offsets שלו
+    אירוע מספר N נמצא בכניסה N - base_id באינדקס
+    """
+
+    def __init__(self, directory: str, base_id: int):
+        self.base_id = base_id
+        self.path = os.path.join(directory, f"{base_id:020d}.seg")
+        self.index_path = os.path.join(directory, f"{base_id:020d}.idx")
+        self.entries: List[Tuple[int, int]] = []
+        self.size = 0
+        self._mmap: Optional[mmap.mmap] = None
+
+    @property
+    def last_id(self) -> int:
+        return self.base_id + len(self.entries) - 1
+
+    def load_index(self) -> bool:
+        """טעינת האינדקס מהדיסק - False אם הוא לא תואם ל-segment"""
+        if not os.path.exists(self.index_path):
+            return False
+        with open(self.index_path, "rb") as f:
+            data = f.read()
+        if len(data) % _INDEX_ENTRY.size:
+            return False
+        entries = [_INDEX_ENTRY.unpack_from(data, pos) for pos in range(0, len(data), _INDEX_ENTRY.size)]
+        size = os.path.getsize(self.path)
+        end = entries[-1][0] + entries[-1][1] if entries else 0
+        if end != size:
+            return False
+        self.entries = entries
+        self.size = size
+        return True
+
+    def rebuild(self) -> None:
+        """סריקת ה-segment, בדיקת CRC וחיתוך זנב חלקי (אחרי קריסה)"""
+        with open(self.path, "rb") as f:
+            data = f.read()
+
+        entries = []
+        pos = 0
+        while pos + _RECORD_HEADER.size <= len(data):
+            length, crc = _RECORD_HEADER.unpack_from(data, pos)
+            start = pos + _RECORD_HEADER.size
+            payload = data[start:start + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break
+            entries.append((pos, _RECORD_HEADER.size + length))
+            pos = start + length
+
+        if pos != len(data):
+            with open(self.path, "r+b") as f:
+                f.truncate(pos)
+
+        with open(self.index_path, "wb") as f:
+            f.write(b"".join(_INDEX_ENTRY.pack(offset, length) for offset, length in entries))
+
+        self.entries = entries
+        self.size = pos
+
+    def read(self, event_id: int) -> bytes:
+        offset, length = self.entries[event_id - self.base_id]
+        end = offset + length
+        # הגבול נבדק מול המיפוי שבאמת נחתך - _remap במקביל מחליף את self._mmap בכל רגע
+        mapping = self._mmap
+        if mapping is None or end > len(mapping):
+            mapping = self._remap()
+        return mapping[offset + _RECORD_HEADER.size:end]
+
+    def _remap(self) -> mmap.mmap:
+        # המיפוי הישן לא נסגר במפורש - קוראים אחרים עשויים עדיין להחזיק אותו
+        with open(self.path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mmap = mapping
+        return mapping
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+class FileEventStore:
+    """
+    Event Store מקומי מבוסס קבצים - אותו ממשק כמו EventStore
+    לוג append-only של segments בגודל קבוע, אינדקס offsets וקריאה דרך mmap.
+    fsync_mode:
+        group    - save_event חוזר רק אחרי fsync; כותבים במקביל חולקים fsync אחד
+        interval - thread ברקע מבצע fsync כל fsync_interval_ms
+        none     - בלי fsync (מערכת ההפעלה מחליטה)
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 64 * 1024 * 1024,
+        fsync_mode: str = "group",
+        fsync_interval_ms: int = 10
+    ):
+        if fsync_mode not in FSYNC_MODES:
+            raise ValueError(f"Unknown fsync mode: {fsync_mode}")
+
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync_mode = fsync_mode
+        self.fsync_interval = fsync_interval_ms / 1000.0
+
+        self._write_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._segments: List[_Segment] = []
+        self._segment_bases: List[int] = []
+        self._by_aggregate: Dict[Tuple[str, int], List[int]] = {}
+        self._by_type: Dict[str, List[int]] = {}
+        self._snapshots: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        self._snapshot_count = 0
+        self._last_id = 0
+        self._synced_id = 0
+        self._dirty = False
+        self._closed = False
+
+        os.makedirs(directory, exist_ok=True)
+        self._open()
+
+        self._flusher: Optional[threading.Thread] = None
+        if fsync_mode == "interval":
+            self._stop_flusher = threading.Event()
+            self._flusher = threading.Thread(target=self._flush_loop, name="event-store-fsync", daemon=True)
+            self._flusher.start()
+
+    # ============================================
+    # Open / Recovery
+    # ============================================
+
+    def _open(self) -> None:
+        bases = sorted(
+            int(name[:-4]) for name in os.listdir(self.directory)
+            if name.endswith(".seg") and name[:-4].isdigit()
+        )
+        for i, base in enumerate(bases):
+            segment = _Segment(self.directory, base)
+            is_active = i == len(bases) - 1
+            # ה-segment הפעיל תמיד נסרק מחדש - ייתכן זנב שלא נכתב עד הסוף
+            if is_active or not segment.load_index():
+                segment.rebuild()
+            self._add_segment(segment)
+            for event_id in range(segment.base_id, segment.last_id + 1):
+                record = json.loads(segment.read(event_id))
+                self._index_record(event_id, record["aggregate_type"], record["aggregate_id"], record["event_type"])
+            if segment.entries:
+                self._last_id = segment.last_id
+
+        if not self._segments:
+            self._add_segment(_Segment(self.directory, 1))
+            open(self._segments[-1].path, "ab").close()
+
+        self._synced_id = self._last_id
+        self._open_active_files()
+        self._load_snapshots()
+
+    def _add_segment(self, segment: _Segment) -> None:
+        self._segments.append(segment)
+        self._segment_bases.append(segment.base_id)
+
+    def _open_active_files(self) -> None:
+        segment = self._segments[-1]
+        self._active_file = open(segment.path, "ab")
+        self._active_index = open(segment.index_path, "ab")
+
+    def _index_record(self, event_id: int, aggregate_type: str, aggregate_id: int, event_type: str) -> None:
+        self._by_aggregate.setdefault((aggregate_type, aggregate_id), []).append(event_id)
+        self._by_type.setdefault(event_type, []).append(event_id)
+
+    # ============================================
+    # Writes
+    # ============================================
+
+    # שמירת אירוע בלוג - הגרסה היא מיקום האירוע ברשימת האירועים של ה-aggregate
+    def save_event(self, event: BaseEvent, expected_version: Optional[int] = None) -> int:
+        event_type_str = event.event_type.value if isinstance(event.event_type, EventType) else event.event_type
+        aggregate_type_str = event.aggregate_type.value if isinstance(event.aggregate_type, AggregateType) else event.aggregate_type
+
+        # הסריאליזציה נעשית מחוץ ל-lock; רק שדה הגרסה משורשר בפנים
+        body = json.dumps({
+            "event_type": event_type_str,
+            "aggregate_id": event.aggregate_id,
+            "aggregate_type": aggregate_type_str,
+            "event_data": event.event_data,
+            "metadata": event.metadata,
+            "user_id": event.user_id,
+            "created_at": datetime.utcnow().isoformat()
+        }, ensure_ascii=False).encode("utf-8")[:-1]
+
+        with self._write_lock:
+            if self._closed:
+                raise RuntimeError("Event store is closed")
+            current_version = len(self._by_aggregate.get((aggregate_type_str, event.aggregate_id), ()))
+            if expected_version is not None and expected_version != current_version:
+                raise ConcurrencyError(aggregate_type_str, event.aggregate_id, expected_version, current_version)
+            version = current_version + 1
+            event_id = self._last_id + 1
+            self._append(body + b', "version": %d}' % version)
+            self._index_record(event_id, aggregate_type_str, event.aggregate_id, event_type_str)
+            self._last_id = event_id
+
+        event.version = version
+        if self.fsync_mode == "group":
+            self._sync(event_id)
+        publish_saved_event(event_id, event, event_type_str, aggregate_type_str)
+        return event_id
+
+    # כמה אירועים ברצף (אותו ממשק כמו EventStore.save_events); ה-fsync הקבוצתי כבר מאחד את הכתיבות
+    def save_events(self, events: List[BaseEvent]) -> List[int]:
+        return [self.save_event(event) for event in events]
+
+    def _append(self, payload: bytes) -> None:
+        segment = self._segments[-1]
+        length = _RECORD_HEADER.size + len(payload)
+        if segment.entries and segment.size + length > self.segment_bytes:
+            self._roll()
+            segment = self._segments[-1]
+
+        self._active_file.write(_RECORD_HEADER.pack(len(payload), zlib.crc32(payload)))
+        self._active_file.write(payload)
+        self._active_index.write(_INDEX_ENTRY.pack(segment.size, length))
+        segment.entries.append((segment.size, length))
+        segment.size += length
+        self._dirty = True
+
+    def _roll(self) -> None:
+        """סגירת ה-segment הפעיל (כולל fsync) ופתיחת segment חדש"""
+        for f in (self._active_file, self._active_index):
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+        self._dirty = False
+        self._add_segment(_Segment(self.directory, self._last_id + 1))
+        self._open_active_files()
+
+    def _sync(self, event_id: int) -> None:
+        """
+        Group commit: מי שמחזיק את ה-lock מבצע fsync אחד עבור כל מה שנכתב עד עכשיו,
+        והכותבים שחיכו מגלים שהאירוע שלהם כבר נשמר לדיסק
+        """
+        with self._sync_lock:
+            if self._synced_id >= event_id:
+                return
+            with self._write_lock:
+                if self._closed:
+                    return
+                target = self._last_id
+                self._active_file.flush()
+                self._dirty = False
+                fd = os.dup(self._active_file.fileno())
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self._synced_id = target
+
+    def _flush_loop(self) -> None:
+        while not self._stop_flusher.wait(self.fsync_interval):
+            if self._last_id > self._synced_id:
+                self._sync(self._last_id)
+
+    def flush(self) -> None:
+        """fsync לכל מה שנכתב עד עכשיו"""
+        self._sync(self._last_id)
+
+    def close(self) -> None:
+        if self._flusher is not None:
+            self._stop_flusher.set()
+            self._flusher.join()
+        self.flush()
+        with self._write_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._active_file.close()
+            self._active_index.close()
+            for segment in self._segments:
+                segment.close()
+
+    # ============================================
+    # Reads
+    # ============================================
+
+    def _prepare_read(self) -> int:
+        """מוודא שהנתונים שבבאפר זמינים ל-mmap ומחזיר את ה-ID האחרון"""
+        with self._write_lock:
+            self._flush_buffer()
+            return self._last_id
+
+    def _prepare_ids(self, index: Dict[Any, List[int]], key: Any, start: int) -> List[int]:
+        """
+        ה-IDs מהאינדקס, נחתכים באותו lock של ה-flush - אחרת save_event במקביל מוסיף ID
+        שה-bytes שלו עדיין בבאפר, וה-mmap מחזיר JSON חתוך
+        """
+        with self._write_lock:
+            self._flush_buffer()
+            return index.get(key, [])[start:]
+
+    def _flush_buffer(self) -> None:
+        if self._dirty:
+            self._active_file.flush()
+            self._dirty = False
+
+    def _segment_for(self, event_id: int) -> _Segment:
+        return self._segments[bisect.bisect_right(self._segment_bases, event_id) - 1]
+
+    def _read_event(self, event_id: int) -> Dict[str, Any]:
+        record = json.loads(self._segment_for(event_id).read(event_id))
+        return {
+            "id": event_id,
+            "event_type": record["event_type"],
+            "aggregate_id": record["aggregate_id"],
+            "aggregate_type": record["aggregate_type"],
+            "event_data": record["event_data"] or {},
+            "metadata": record["metadata"],
+            "user_id": record["user_id"],
+            "created_at": datetime.fromisoformat(record["created_at"]),
+            "version": record["version"]
+        }
+
+    # הגרסה הנוכחית של aggregate (0 אם אין אירועים)
+    def get_aggregate_version(self, aggregate_type: str, aggregate_id: int) -> int:
+        return len(self._by_aggregate.get((aggregate_type, aggregate_id), ()))
+
+    # קבלת אירועים לפי מזהה וסוג ישות - גרסה N נמצאת במקום N-1 ברשימה
+    def get_events_by_aggregate(self, aggregate_type: str, aggregate_id: int, after_version: int = 0) -> List[Dict[str, Any]]:
+        event_ids = self._prepare_ids(self._by_aggregate, (aggregate_type, aggregate_id), after_version)
+        return [self._read_event(event_id) for event_id in event_ids]
+
+    # קבלת אירועים מה-ID האחרון - סריקה רציפה של ה-segments
+    def get_events_since(self, since_event_id: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+        last_id = self._prepare_read()
+        end = min(last_id, since_event_id + limit)
+        return [self._read_event(event_id) for event_id in range(since_event_id + 1, end + 1)]
+
+    # קבלת אירועים לפי סוג (מהחדש לישן)
+    def get_events_by_type(self, event_type: str, limit: int = 100) -> List[Dict[str, Any]]:
+        if limit <= 0:
+            return []
+        event_ids = self._prepare_ids(self._by_type, event_type, -limit)
+        return [self._read_event(event_id) for event_id in reversed(event_ids)]
+
+    # קבלת ID של האירוע האחרון
+    def get_latest_event_id(self) -> int:
+        return self._last_id
+
+    # בניית מצב (State) מחדש - מה-Snapshot האחרון ורק האירועים שאחריו
+    def replay_events(self, aggregate_type: str, aggregate_id: int) -> Dict[str, Any]:
+        snapshot = self.get_latest_snapshot(aggregate_type, aggregate_id)
+        after_version = snapshot["version"] if snapshot else 0
+        events = self.get_events_by_aggregate(aggregate_type, aggregate_id, after_version=after_version)
+        return build_state(events, aggregate_id, snapshot["state"] if snapshot else None)
+
+    # ============================================
+    # Snapshots
+    # ============================================
+
+    def _snapshots_path(self) -> str:
+        return os.path.join(self.directory, "snapshots.log")
+
+    def _load_snapshots(self) -> None:
+        path = self._snapshots_path()
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    snapshot = json.loads(line)
+                except ValueError:
+                    break  # שורה אחרונה חלקית
+                self._snapshot_count += 1
+                key = (snapshot["aggregate_type"], snapshot["aggregate_id"])
+                current = self._snapshots.get(key)
+                if current is None or snapshot["version"] >= current["version"]:
+                    self._snapshots[key] = snapshot
+
+    # שמירת Snapshot של המצב
+    def save_snapshot(self, aggregate_type: str, aggregate_id: int, state: Dict[str, Any], version: int) -> int:
+        snapshot = {
+            "aggregate_type": aggregate_type,
+            "aggregate_id": aggregate_id,
+            "state": state,
+            "version": version,
+            "created_at": datetime.utcnow().isoformat()
+        }
+        line = json.dumps(snapshot, ensure_ascii=False).encode("utf-8") + b"\n"
+        with self._write_lock:
+            with open(self._snapshots_path(), "ab") as f:
+                f.write(line)
+                if self.fsync_mode != "none":
+                    f.flush()
+                    os.fsync(f.fileno())
+            self._snapshot_count += 1
+            key = (aggregate_type, aggregate_id)
+            current = self._snapshots.get(key)
+            if current is None or version >= current["version"]:
+                self._snapshots[key] = snapshot
+            return self._snapshot_count
+
+    # קבלת ה-Snapshot האחרון
+    def get_latest_snapshot(self, aggregate_type: str, aggregate_id: int) -> Optional[Dict[str, Any]]:
+        snapshot = self._snapshots.get((aggregate_type, aggregate_id))
+        if snapshot:
+            return {
+                "state": snapshot["state"],
+                "version": snapshot["version"],
+                "created_at": datetime.fromisoformat(snapshot["created_at"])
+            }
+        return None
+
+
+# Singleton - לוג אחד לכל תהליך
+_file_event_store: Optional[FileEventStore] = None
+_file_event_store_lock = threading.Lock()
+
+
+def get_file_event_store() -> FileEventStore:
+    global _file_event_store
+    if _file_event_store is None:
+        with _file_event_store_lock:
+            if _file_event_store is None:
+                settings = get_settings()
+                _file_event_store = FileEventStore(
+                    directory=settings.EVENT_STORE_DIR,
+                    segment_bytes=settings.EVENT_STORE_SEGMENT_BYTES,
+                    fsync_mode=settings.EVENT_STORE_FSYNC_MODE,
+                    fsync_interval_ms=settings.EVENT_STORE_FSYNC_INTERVAL_MS
+                )
+                atexit.register(_file_event_store.close)
+    return _file_event_store
@@ -1,43 +1,79 @@
 import google.generativeai as genai 
 from typing import Dict, List, Any
+from types import SimpleNamespace
 import os
 from dotenv import load_dotenv
 
+from app.core.cache import TTLCache
+from app.replay.harness import REPLAY, cassette_call, get_cassette_mode
+
 load_dotenv()
 
 
+class _ReplayChat:
+    """chat session ב-replay: רק ההיסטוריה, התשובות מגיעות מהקסטה"""
+    
+    def __init__(self):
+        self.history: List[Any] = []
+    
+    def add(self, role: str, text: str) -> None:
+        self.history.append(SimpleNamespace(role=role, parts=[SimpleNamespace(text=text)]))
+
+
 class GeminiAPIGateway:
     
+    MAX_CHAT_SESSIONS = 500
+    CHAT_SESSION_IDLE_SECONDS = 60 * 60
+    
     def __init__(self):
         self.api_key = os.getenv("GEMINI_API_KEY")
+        self.replay = get_cassette_mode() == REPLAY
         
-        if not self.api_key:
+        if not self.api_key and not self.replay:
             raise ValueError("❌ GEMINI_API_KEY לא מוגדר ב-.env")
                 
-        # יצירת המודל
-        self.model = genai.GenerativeModel("gemini-2.0-flash-exp")
-        self.chat_sessions = {}
+        # יצירת המודל (ב-replay אין קריאות אמיתיות)
+        self.model = None if self.replay else genai.GenerativeModel("gemini-2.0-flash-exp")
+        # sessions שלא היו פעילים שעה נזרקים; מעבר למכסה נזרק הכי פחות פעיל
+        self.chat_sessions = TTLCache(
+            max_entries=self.MAX_CHAT_SESSIONS,
+            default_ttl=self.CHAT_SESSION_IDLE_SECONDS,
+            name="gemini_chat_sessions"
+        )
         
         print("✅ Gemini Gateway initialized")
     
     def start_chat_session(self, session_id: str) -> None:
         """התחל session חדש של צ'אט"""
-        self.chat_sessions[session_id] = self.model.start_chat(history=[])
+        chat = _ReplayChat() if self.replay else self.model.start_chat(history=[])
+        self.chat_sessions.set(session_id, chat, size=0)
         print(f"💬 Started new chat session: {session_id}")
     
     def send_message(self, session_id: str, message: str) -> Dict[str, Any]:
         """שלח הודעה ב-session קיים"""
         try:
-            if session_id not in self.chat_sessions:
+            chat = self.chat_sessions.get(session_id)
+            if chat is None:
                 self.start_chat_session(session_id)
+                chat = self.chat_sessions.get(session_id)
             
-            chat = self.chat_sessions[session_id]
-            response = chat.send_message(message)
+            # ה-key בקסטה: ההודעה ומספר התור (לא ה-session_id) - שיחה זהה משוחזרת זהה
+            text = cassette_call(
+                "gemini",
+                "chat",
+                {"message": message, "turn": len(chat.history) // 2},
+                lambda: chat.send_message(message).text
+            )
+            if self.replay:
+                chat.add("user", message)
+                chat.add("model", text)
+            # כל הודעה מאריכה את חיי ה-session
+            self.chat_sessions.set(session_id, chat, size=0)
             
             return {
                 "session_id": session_id,
                 "message": message,
-                "response": response.text,
+                "response": text,
                 "success": True
             }
             
@@ -53,10 +89,10 @@ class GeminiAPIGateway:
     
     def get_chat_history(self, session_id: str) -> List[Dict[str, str]]:
         """קבל היסטוריית צ'אט"""
-        if session_id not in self.chat_sessions:
+        chat = self.chat_sessions.get(session_id)
+        if chat is None:
             return []
         
-        chat = self.chat_sessions[session_id]
         history = []
         
         for message in chat.history:
@@ -69,8 +105,7 @@ class GeminiAPIGateway:
     
     def clear_chat_session(self, session_id: str) -> None:
         """נקה session"""
-        if session_id in self.chat_sessions:
-            del self.chat_sessions[session_id]
+        if self.chat_sessions.invalidate(session_id):
             print(f"🗑️ Cleared chat session: {session_id}")
     
     def ask_about_news(self, article_title: str, article_summary: str, question: str) -> str:
@@ -90,8 +125,7 @@ class GeminiAPIGateway:
             אנא ענה על השאלה בצורה ברורה ותמציתית בעברית.
             """
             
-            response = self.model.generate_content(prompt)
-            return response.text
+            return self._generate(prompt)
             
         except Exception as e:
             return f"שגיאה בשאלה על המאמר: {str(e)}"
@@ -114,9 +148,8 @@ class GeminiAPIGateway:
                 תשובה בעברית.
                 """
             
-            response = self.model.generate_content(prompt)
             return {
-                "analysis": response.text,
+                "analysis": self._generate(prompt),
                 "success": True
             }
             
@@ -125,6 +158,11 @@ class GeminiAPIGateway:
                 "analysis": f"שגיאה: {str(e)}",
                 "success": False
             }
+    
+    def _generate(self, prompt: str) -> str:
+        return cassette_call(
+            "gemini", "generate_content", {"prompt": prompt}, lambda: self.model.generate_content(prompt).text
+        )
 
 
 # Singleton instance
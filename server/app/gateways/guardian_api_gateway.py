@@ -1,36 +1,25 @@
-from newspaper import Article as NewsArticle
-from typing import Optional
+from typing import List, Optional
+
+from app.services.scraping_service import get_scraping_service
 
 
 def scrape_full_content(url: str) -> Optional[str]:
-    try:
-        article = NewsArticle(url)
-        article.download()
-        article.parse()
-        
-        return article.text
-        
-    except Exception as e:
-        print(f"Scraping error for {url}: {e}")
-        return None
+    """הטקסט המלא של מאמר אחד (דרך ScrapingService - cache, timeout ונימוס לדומיין)"""
+    return get_scraping_service().scrape_sync(url)
 
 
 def enhance_article_with_scraping(article_data: dict) -> dict:
+    return enhance_articles_with_scraping([article_data])[0]
+
 
-    if not article_data.get("url"):
-        return article_data
-    
-    if article_data.get("content") and len(article_data["content"]) > 1000:
-        return article_data
-    
-    print(f"🔍 Scraping full content from: {article_data['url']}")
-    
-    full_content = scrape_full_content(article_data["url"])
-    
-    if full_content and len(full_content) > 200:
-        article_data["content"] = full_content
-        print(f"   ✅ Got {len(full_content)} characters")
-    else:
-        print(f"   ⚠️  Failed to scrape")
-    
-    return article_data
\ No newline at end of file
+def enhance_articles_with_scraping(articles: List[dict]) -> List[dict]:
+    """
+    ממלא את ה-content המלא למאמרים שהתוכן שלהם קצר (עד 1000 תווים) -
+    כל ההורדות במקביל, הפירוש ב-process pool
+    """
+    print(f"🔍 Scraping full content for up to {len(articles)} articles")
+    before = [len(article.get("content") or "") for article in articles]
+    get_scraping_service().enhance_many_sync(articles)
+    enhanced = sum(len(article.get("content") or "") > length for article, length in zip(articles, before))
+    print(f"   ✅ Enhanced {enhanced} articles")
+    return articles
@@ -1,9 +1,12 @@
-import requests
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 
+from app.core.async_gateway import get_async_gateway
+from app.core.gateway import get_gateway
+from app.replay.harness import REPLAY, get_cassette_mode
+
 load_dotenv()
 
 
@@ -14,9 +17,15 @@ class NewsAPIGateway:
         self.api_key = os.getenv("NEWS_API_KEY")
         self.base_url = "http://eventregistry.org/api/v1"
         
-        if not self.api_key:
+        if not self.api_key and get_cassette_mode() != REPLAY:
             raise ValueError("❌ NEWS_API_KEY לא מוגדר ב-.env")
     
+    # כותרות מתעדכנות כל כמה דקות: טרי 5 דק', ישן עד 15 דק' מוחזר מיד ומתרענן ברקע,
+    # ועד שעה אם NewsAPI.ai נכשל
+    CACHE_POLICY = {"cache_ttl": 300, "max_stale": 900, "stale_if_error": 3600}
+    # ייבוא אינקרמנטלי: תוצאה ישנה נראית כמו "אין חדש" מול ה-watermark - תמיד ישר מ-NewsAPI.ai
+    NO_CACHE_POLICY = {"cache_ttl": 0, "max_stale": 0, "stale_if_error": 0}
+    
     def _make_request(self, endpoint: str, params: Dict) -> Dict:
         """בצע בקשה ל-API עם error handling"""
         try:
@@ -24,10 +33,7 @@ class NewsAPIGateway:
             url = f"{self.base_url}/{endpoint}"
             
             print(f"🌐 שולח בקשה ל-NewsAPI.ai: {endpoint}")
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = get_gateway().get(url, "newsapi", params=params, timeout=10, **self.CACHE_POLICY)
             
             # בדיקת שגיאות בפורמט של Event Registry
             if "error" in data:
@@ -35,10 +41,24 @@ class NewsAPIGateway:
             
             return data
             
-        except requests.exceptions.RequestException as e:
+        except Exception as e:
             print(f"❌ שגיאה בקריאה ל-NewsAPI.ai: {e}")
             raise
     
+    async def _make_request_async(self, endpoint: str, params: Dict, use_cache: bool = True) -> Dict:
+        """כמו _make_request, דרך ה-Gateway האסינכרוני (pool משותף, בלי לתפוס thread)"""
+        params = {**params, "apiKey": self.api_key}
+        url = f"{self.base_url}/{endpoint}"
+        policy = self.CACHE_POLICY if use_cache else self.NO_CACHE_POLICY
+        
+        print(f"🌐 שולח בקשה ל-NewsAPI.ai: {endpoint}")
+        data = await get_async_gateway().get(url, "newsapi", params=params, timeout=10, **policy)
+        
+        if "error" in data:
+            raise Exception(f"NewsAPI.ai Error: {data.get('error', 'Unknown error')}")
+        
+        return data
+    
     def _normalize_articles(self, raw_articles: List[Dict]) -> List[Dict]:
         """המר מאמרים מפורמט Event Registry לפורמט אחיד"""
         normalized = []
@@ -57,6 +77,7 @@ class NewsAPIGateway:
                     "title": article.get("title", ""),
                     "description": article.get("body", "")[:200] + "..." if article.get("body") else None,
                     "url": article.get("url", ""),
+                    "uri": article.get("uri"),
                     "image_url": article.get("image"),
                     "published_at": published_at.isoformat() if published_at else None,
                     "content": article.get("body"),
@@ -88,7 +109,8 @@ class NewsAPIGateway:
         keyword: str,
         language: str = "eng",
         max_items: int = 20,
-        sort_by: str = "date"
+        sort_by: str = "date",
+        page: int = 1
     ) -> List[Dict]:
         """
         קבל מאמרים לפי מילת חיפוש
@@ -96,13 +118,52 @@ class NewsAPIGateway:
         Args:
             keyword: מילת החיפוש
             language: שפה (eng, heb, deu, spa וכו')
-            max_items: מספר מקסימלי של תוצאות
+            max_items: מספר מקסימלי של תוצאות (בעמוד)
             sort_by: date, rel (relevance), socialScore
+            page: מספר העמוד (מ-1)
         """
-        params = {
+        params = self._keyword_params(keyword, language, max_items, sort_by, page)
+        data = self._make_request("article/getArticles", params)
+        return self._articles_from(data, "")
+    
+    async def get_articles_by_keyword_async(
+        self,
+        keyword: str,
+        language: str = "eng",
+        max_items: int = 20,
+        sort_by: str = "date",
+        page: int = 1
+    ) -> List[Dict]:
+        """גרסה אסינכרונית של get_articles_by_keyword"""
+        articles, _ = await self.get_articles_page_async(keyword, page, language, max_items, sort_by)
+        return articles
+    
+    async def get_articles_page_async(
+        self,
+        keyword: str,
+        page: int = 1,
+        language: str = "eng",
+        page_size: int = 100,
+        sort_by: str = "date",
+        date_start: Optional[datetime] = None,
+        use_cache: bool = True
+    ) -> Tuple[List[Dict], int]:
+        """
+        עמוד אחד של תוצאות + מספר העמודים הכולל (ל-pagination מקבילי)
+        date_start - רק מאמרים מהיום הזה והלאה (Event Registry מסנן ברמת יום)
+        use_cache=False - בלי cache ובלי תשובה ישנה (הייבוא)
+        """
+        params = self._keyword_params(keyword, language, page_size, sort_by, page)
+        if date_start:
+            params["dateStart"] = date_start.strftime("%Y-%m-%d")
+        data = await self._make_request_async("article/getArticles", params, use_cache=use_cache)
+        return self._articles_from(data, f" ('{keyword}' עמוד {page})"), data.get("articles", {}).get("pages", 1)
+    
+    def _keyword_params(self, keyword: str, language: str, max_items: int, sort_by: str, page: int = 1) -> Dict:
+        return {
             "action": "getArticles",
             "keyword": keyword,
-            "articlesPage": 1,
+            "articlesPage": page,
             "articlesCount": min(max_items, 100),
             "articlesSortBy": sort_by,
             "articlesSortByAsc": "false",
@@ -110,12 +171,11 @@ class NewsAPIGateway:
             "resultType": "articles",
             "lang": language,
         }
-        
-        data = self._make_request("article/getArticles", params)
-        
+    
+    def _articles_from(self, data: Dict, description: str) -> List[Dict]:
+        """חילוץ ונירמול המאמרים מתשובת getArticles"""
         articles = data.get("articles", {}).get("results", [])
-        print(f"✅ התקבלו {len(articles)} מאמרים מ-NewsAPI.ai")
-        
+        print(f"✅ התקבלו {len(articles)} מאמרים מ-NewsAPI.ai{description}")
         return self._normalize_articles(articles)
     
     def get_top_headlines(
@@ -129,38 +189,35 @@ class NewsAPIGateway:
         
         Categories: business, technology, sports וכו'
         """
-        if category:
-            keyword = category.lower()
-            
-            params = {
-                "action": "getArticles",
-                "keyword": keyword,
-                "articlesPage": 1,
-                "articlesCount": min(page_size, 100),
-                "articlesSortBy": "date",
-                "articlesSortByAsc": "false",
-                "dataType": ["news"],
-                "resultType": "articles",
-                "lang": "eng",
-            }
-        else:
-            params = {
-                "action": "getArticles",
-                "articlesPage": 1,
-                "articlesCount": min(page_size, 100),
-                "articlesSortBy": "date",
-                "articlesSortByAsc": "false",
-                "dataType": ["news"],
-                "resultType": "articles",
-                "lang": "eng",
-            }
-        
+        params = self._headlines_params(category, page_size)
         data = self._make_request("article/getArticles", params)
-        
-        articles = data.get("articles", {}).get("results", [])
-        print(f"✅ התקבלו {len(articles)} מאמרים מ-NewsAPI.ai (קטגוריה: {category or 'כללי'})")
-        
-        return self._normalize_articles(articles)
+        return self._articles_from(data, f" (קטגוריה: {category or 'כללי'})")
+    
+    async def get_top_headlines_async(
+        self,
+        category: Optional[str] = None,
+        country: str = "us",
+        page_size: int = 20
+    ) -> List[Dict]:
+        """גרסה אסינכרונית של get_top_headlines"""
+        params = self._headlines_params(category, page_size)
+        data = await self._make_request_async("article/getArticles", params)
+        return self._articles_from(data, f" (קטגוריה: {category or 'כללי'})")
+    
+    def _headlines_params(self, category: Optional[str], page_size: int) -> Dict:
+        params = {
+            "action": "getArticles",
+            "articlesPage": 1,
+            "articlesCount": min(page_size, 100),
+            "articlesSortBy": "date",
+            "articlesSortByAsc": "false",
+            "dataType": ["news"],
+            "resultType": "articles",
+            "lang": "eng",
+        }
+        if category:
+            params["keyword"] = category.lower()
+        return params
     
     def search_articles(
         self,
@@ -173,6 +230,31 @@ class NewsAPIGateway:
         """
         חפש מאמרים לפי מילות חיפוש
         """
+        params = self._search_params(query, from_date, to_date, language, page_size)
+        data = self._make_request("article/getArticles", params)
+        return self._articles_from(data, f" עבור חיפוש: '{query}'")
+    
+    async def search_articles_async(
+        self,
+        query: str,
+        from_date: Optional[datetime] = None,
+        to_date: Optional[datetime] = None,
+        language: str = "eng",
+        page_size: int = 20
+    ) -> List[Dict]:
+        """גרסה אסינכרונית של search_articles"""
+        params = self._search_params(query, from_date, to_date, language, page_size)
+        data = await self._make_request_async("article/getArticles", params)
+        return self._articles_from(data, f" עבור חיפוש: '{query}'")
+    
+    def _search_params(
+        self,
+        query: str,
+        from_date: Optional[datetime],
+        to_date: Optional[datetime],
+        language: str,
+        page_size: int
+    ) -> Dict:
         params = {
             "action": "getArticles",
             "keyword": query,
@@ -191,12 +273,7 @@ class NewsAPIGateway:
         if to_date:
             params["dateEnd"] = to_date.strftime("%Y-%m-%d")
         
-        data = self._make_request("article/getArticles", params)
-        
-        articles = data.get("articles", {}).get("results", [])
-        print(f"✅ התקבלו {len(articles)} מאמרים עבור חיפוש: '{query}'")
-        
-        return self._normalize_articles(articles)
+        return params
     
     def get_articles_by_topic(
         self,
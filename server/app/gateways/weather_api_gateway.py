@@ -1,9 +1,11 @@
-import requests
 from typing import Dict, List
 from datetime import datetime
 import os
 from dotenv import load_dotenv
 
+from app.core.gateway import get_gateway
+from app.replay.harness import REPLAY, get_cassette_mode
+
 load_dotenv()
 
 
@@ -15,19 +17,34 @@ class WeatherAPIGateway:
         self.base_url = "https://api.openweathermap.org/data/2.5"
         self.default_city = "Tel Aviv"
         
-        if not self.api_key:
+        if not self.api_key and get_cassette_mode() != REPLAY:
             raise ValueError("❌ WEATHER_API_KEY לא מוגדר ב-.env")
     
+    # (cache_ttl, max_stale, stale_if_error) לכל endpoint. ה-TTL, ה-stale-while-revalidate וה-stale-if-error
+    # לכל עיר מנוהלים ב-WeatherService; כאן רק מאחדים bursts. ערך ישן מה-Gateway היה נשמר שם כטרי
+    # (רענון של ה-prefetcher חייב להביא נתון חדש או להיכשל)
+    CACHE_POLICIES = {
+        "weather": (60, 0, 0),
+        "forecast": (60, 0, 0)
+    }
+    
     def _make_request(self, endpoint: str, params: Dict) -> Dict:
-        """בצע בקשה ל-API"""
+        """בצע בקשה ל-API (דרך ה-Gateway: cache עם stale-while-revalidate, retries, breaker)"""
         params["appid"] = self.api_key
         params["units"] = "metric"
         params["lang"] = "he"
         
         url = f"{self.base_url}/{endpoint}"
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json()
+        cache_ttl, max_stale, stale_if_error = self.CACHE_POLICIES.get(endpoint, (600, 0, 0))
+        return get_gateway().get(
+            url,
+            "openweathermap",
+            params=params,
+            timeout=10,
+            cache_ttl=cache_ttl,
+            max_stale=max_stale,
+            stale_if_error=stale_if_error
+        )
     
     def get_current_weather(self, city: str = None) -> Dict:
         """קבל מזג אוויר נוכחי"""
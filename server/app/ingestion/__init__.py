@@ -0,0 +1,37 @@
+from .bloom import BloomFilter, get_url_bloom
+from .bulk import ArticleBulkWriter, BulkResult, article_row
+from .daemon import IngestionDaemon, InstanceLock, InstanceLockError, run_stats
+from .feeds import POPULAR_CATEGORIES, Feed, default_feeds, load_feeds
+from .jsonl import export_articles, import_articles, iter_jsonl
+from .near_duplicates import MinHasher, NearDuplicateIndex, get_near_duplicate_index, story_text
+from .pipeline import IngestJob, IngestionPipeline, StageStats
+from .watermarks import IngestionWatermark, Watermark, WatermarkStore
+
+__all__ = [
+    "BloomFilter",
+    "get_url_bloom",
+    "ArticleBulkWriter",
+    "BulkResult",
+    "article_row",
+    "IngestionDaemon",
+    "InstanceLock",
+    "InstanceLockError",
+    "run_stats",
+    "POPULAR_CATEGORIES",
+    "Feed",
+    "default_feeds",
+    "load_feeds",
+    "export_articles",
+    "import_articles",
+    "iter_jsonl",
+    "MinHasher",
+    "NearDuplicateIndex",
+    "get_near_duplicate_index",
+    "story_text",
+    "IngestJob",
+    "IngestionPipeline",
+    "StageStats",
+    "IngestionWatermark",
+    "Watermark",
+    "WatermarkStore"
+]
@@ -0,0 +1,69 @@
+import math
+import threading
+from typing import Callable, Iterable, Optional
+
+from app.core.config import get_settings
+
+
+class BloomFilter:
+    """
+    Bloom filter על hashes (מחרוזות hex כמו url_hash): contains=False אומר בוודאות "לא ראינו",
+    contains=True אומר "אולי" (בסיכוי error_rate שלא). גודל קבוע - ~1.2MB למיליון פריטים ב-1%
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # double hashing: k מיקומים משני חצאים של ה-hash (הפריטים כבר hash אחיד - לא צריך לחשב שוב)
+        h1, h2 = int(item[:16], 16), int(item[16:32], 16) | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        with self._lock:
+            for position in self._positions(item):
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def saturated(self) -> bool:
+        """מעבר ל-capacity שיעור הטעויות עולה - כדאי לבנות מחדש, גדול יותר"""
+        return self.count > self.capacity
+
+
+# Singleton - כל ה-url_hash שב-DB, נטען פעם אחת לתהליך
+_url_bloom: Optional[BloomFilter] = None
+_url_bloom_lock = threading.Lock()
+
+def get_url_bloom(load: Callable[[], Iterable[str]]) -> BloomFilter:
+    """
+    ה-Bloom filter של ה-URLs שכבר ב-DB. load - מחזיר את כל ה-url_hash הקיימים
+    (נקרא בפעם הראשונה, ושוב אם הפילטר התמלא מעבר ל-capacity)
+    """
+    global _url_bloom
+    if _url_bloom is None or _url_bloom.saturated:
+        with _url_bloom_lock:
+            if _url_bloom is None or _url_bloom.saturated:
+                settings = get_settings()
+                capacity = settings.INGEST_BLOOM_CAPACITY
+                if _url_bloom is not None:
+                    capacity = max(capacity, _url_bloom.count * 2)
+                while True:
+                    bloom = BloomFilter(capacity, settings.INGEST_BLOOM_ERROR_RATE)
+                    for item in load():
+                        bloom.add(item)
+                    if not bloom.saturated:
+                        break
+                    capacity = bloom.count * 2  # ה-DB גדול מה-capacity - טוענים שוב, בגודל מתאים
+                _url_bloom = bloom
+    return _url_bloom
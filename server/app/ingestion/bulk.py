@@ -0,0 +1,261 @@
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.urls import url_hash
+from app.event_sourcing import ArticleCreatedEvent, get_event_store
+from app.ingestion.bloom import BloomFilter, get_url_bloom
+from app.ingestion.near_duplicates import NearDuplicateIndex, get_near_duplicate_index, story_text
+from app.mvc.models.articles.article_entity import Article
+
+logger = logging.getLogger(__name__)
+
+# העמודות שהייבוא ממלא; created_at / updated_at נשארים ל-default של ה-entity
+ARTICLE_COLUMNS = (
+    "title", "summary", "content", "url", "url_hash", "source", "category", "image_url", "thumb_url", "published_at",
+    "duplicate_of"
+)
+
+
+def article_row(article: Dict[str, Any], category: str) -> Optional[Dict[str, Any]]:
+    """מאמר מנורמל של NewsAPIGateway -> עמודות של Article (None אם חסר url/כותרת)"""
+    if not article.get("url") or not article.get("title"):
+        return None
+    published_at = None
+    if article.get("published_at"):
+        try:
+            published_at = datetime.fromisoformat(article["published_at"].replace("Z", "+00:00"))
+        except ValueError:
+            pass
+    return {
+        "title": article["title"][:500],
+        "summary": article.get("description") or article["title"][:200],
+        "content": article.get("content") or article.get("description"),
+        "url": article["url"],
+        "url_hash": url_hash(article["url"]),
+        "source": (article.get("source") or "")[:200],
+        "category": category,
+        "image_url": article.get("image_url"),
+        "thumb_url": article.get("image_url"),
+        "published_at": published_at
+    }
+
+
+class BulkResult:
+    """
+    סיכום של write: כמה נכנסו, כמה כבר היו ב-DB, כמה הופיעו פעמיים בקלט,
+    כמה היו עותקים של ידיעה קיימת (near_duplicates), ולכמה שורות ה-Bloom filter חסך את בדיקת הקיום ב-DB
+    """
+
+    def __init__(self):
+        self.inserted = 0
+        self.existing = 0
+        self.duplicates = 0
+        self.near_duplicates = 0
+        self.bloom_skipped = 0
+        self.chunks = 0
+        self.events = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return round(self.inserted / self.seconds, 1) if self.seconds else 0.0
+
+    def merge(self, other: "BulkResult") -> "BulkResult":
+        """צבירה של כמה write (למשל write לכל chunk של קובץ גדול)"""
+        for name in ("inserted", "existing", "duplicates", "near_duplicates", "bloom_skipped", "chunks", "events", "seconds"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        return self
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "inserted": self.inserted,
+            "existing": self.existing,
+            "duplicates": self.duplicates,
+            "near_duplicates": self.near_duplicates,
+            "bloom_skipped": self.bloom_skipped,
+            "chunks": self.chunks,
+            "events": self.events,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": self.rows_per_second
+        }
+
+
+class ArticleBulkWriter:
+    """
+    כתיבת מאמרים בכמויות - במקום query(...).first() ו-db.add לכל שורה
+
+    - dedupe לפי url_hash (hash של ה-URL הקנוני - utm_*, http/https, / בסוף וכו' לא יוצרים כפילות)
+    - Bloom filter של כל ה-url_hash שב-DB: שורה שהוא בטוח שלא ראה לא נבדקת ב-DB בכלל;
+      רק ה"אולי" נבדקים - שאילתה אחת (url_hash IN ...) לכל chunk
+    - near-duplicates: אותה ידיעה מכמה אתרים (URL שונה) מזוהה ב-MinHash + LSH על כותרת וגוף;
+      skip - לא נשמרת, cluster - נשמרת עם duplicate_of = ה-url_hash של המאמר הקנוני
+    - לכל chunk: INSERT אחד רב-שורות (executemany / insertmanyvalues של SQLAlchemy), commit אחד
+    - ArticleCreatedEvent לכל מאמר חדש - נשמרים יחד אחרי ה-commit של ה-chunk
+    - ה-Bloom filter מכיר רק את מה שנטען ממנו ומה שהכותבים בתהליך הזה הוסיפו - מאמר שנכתב דרך ה-ORM
+      או בתהליך אחר לא בו. לכן "בטוח חדש" הוא קיצור דרך בלבד: ה-unique index על url_hash (ועל url) ב-DB
+      הוא ההגנה, וכשהוא נופל בודקים שוב את כל ה-chunk ב-DB, לפי hash ולפי url, פעם אחת;
+      ה-hashes שנמצאו אז נוספים ל-Bloom filter
+    """
+
+    MAX_CHUNK_SIZE = 2000  # SQL Server: עד 2100 פרמטרים לשאילתה
+
+    def __init__(
+        self,
+        db: Session,
+        chunk_size: Optional[int] = None,
+        emit_events: bool = True,
+        bloom: Optional[BloomFilter] = None,
+        use_bloom: bool = True,
+        near_duplicates: Optional[NearDuplicateIndex] = None,
+        near_duplicate_mode: Optional[str] = None
+    ):
+        self.db = db
+        self.chunk_size = min(chunk_size or get_settings().INGEST_BULK_CHUNK_SIZE, self.MAX_CHUNK_SIZE)
+        self.emit_events = emit_events
+        self.bloom = bloom if bloom is not None or not use_bloom else get_url_bloom(self._all_hashes)
+        self.near_duplicate_mode = near_duplicate_mode or get_settings().INGEST_NEAR_DUP_MODE
+        self.near_duplicates = None
+        if self.near_duplicate_mode != "off":
+            self.near_duplicates = (
+                near_duplicates if near_duplicates is not None else get_near_duplicate_index(self._recent_stories)
+            )
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> BulkResult:
+        result = BulkResult()
+        started = time.perf_counter()
+        seen = set()
+        chunk: List[Dict[str, Any]] = []
+        for row in rows:
+            row_hash = row.get("url_hash") or url_hash(row.get("url"))
+            if row_hash is None or row_hash in seen:
+                result.duplicates += 1
+                continue
+            seen.add(row_hash)
+            chunk.append({column: row.get(column) for column in ARTICLE_COLUMNS})
+            chunk[-1]["url_hash"] = row_hash
+            if len(chunk) >= self.chunk_size:
+                self._write_chunk(chunk, result)
+                chunk = []
+        if chunk:
+            self._write_chunk(chunk, result)
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def _write_chunk(self, chunk: List[Dict[str, Any]], result: BulkResult) -> None:
+        for attempt in range(2):
+            fresh = self._new_rows(chunk, result, full_check=bool(attempt))
+            new_rows, indexed = self._unique_stories(fresh)
+            try:
+                ids = self._insert(new_rows)
+                self.db.commit()
+                break
+            except Exception as e:
+                # כל כשל (גם deadlock / OperationalError) - הסיפורים לא נשמרו ולא נשארים באינדקס
+                self.db.rollback()
+                if self.near_duplicates is not None:
+                    for key in indexed:
+                        self.near_duplicates.remove(key)
+                if attempt or not isinstance(e, IntegrityError):
+                    raise
+
+        result.chunks += 1
+        result.inserted += len(new_rows)
+        result.existing += len(chunk) - len(fresh)
+        result.near_duplicates += len(fresh) - len(indexed)
+        if self.bloom is not None:
+            for row in new_rows:
+                self.bloom.add(row["url_hash"])
+        if self.emit_events and new_rows:
+            result.events += self._emit(ids, new_rows)
+
+    def _new_rows(self, chunk: List[Dict[str, Any]], result: BulkResult, full_check: bool) -> List[Dict[str, Any]]:
+        if full_check or self.bloom is None:
+            candidates = chunk
+        else:
+            candidates = [row for row in chunk if row["url_hash"] in self.bloom]
+            result.bloom_skipped += len(chunk) - len(candidates)
+        if not candidates:
+            return chunk
+
+        hashes = [row["url_hash"] for row in candidates]
+        existing = {row_hash for (row_hash,) in self.db.query(Article.url_hash).filter(Article.url_hash.in_(hashes))}
+        existing_urls = set()
+        if full_check:
+            urls = [row["url"] for row in candidates]
+            existing_urls = {url for (url,) in self.db.query(Article.url).filter(Article.url.in_(urls))}
+            if self.bloom is not None:
+                # נכתבו מחוץ לכותב הזה - שה-Bloom filter לא יענה עליהם שוב "בטוח חדש"
+                for row_hash in existing:
+                    self.bloom.add(row_hash)
+        return [row for row in chunk if row["url_hash"] not in existing and row["url"] not in existing_urls]
+
+    def _unique_stories(self, rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """(השורות לשמירה, המפתחות שנוספו לאינדקס - הסיפורים החדשים)"""
+        if self.near_duplicates is None:
+            return rows, [row["url_hash"] for row in rows]
+        kept, indexed = [], []
+        for row in rows:
+            signature = self.near_duplicates.signature(story_text(row["title"], row["content"] or row["summary"]))
+            match = self.near_duplicates.match(signature, exclude=row["url_hash"])
+            if match is None:
+                # נוסף מיד - עותק בהמשך אותו chunk כבר ימצא אותו
+                self.near_duplicates.add(row["url_hash"], signature)
+                indexed.append(row["url_hash"])
+                kept.append(row)
+            elif self.near_duplicate_mode == "cluster":
+                row["duplicate_of"] = match[0]
+                kept.append(row)
+        return kept, indexed
+
+    def _recent_stories(self, limit: int) -> List[Tuple[str, str]]:
+        rows = (
+            self.db.query(Article.url_hash, Article.title, Article.content, Article.summary)
+            .filter(Article.url_hash.isnot(None), Article.duplicate_of.is_(None))
+            .order_by(Article.id.desc())
+            .limit(limit)
+            .all()
+        )
+        return [(row.url_hash, story_text(row.title, row.content or row.summary)) for row in reversed(rows)]
+
+    def _all_hashes(self) -> Iterable[str]:
+        query = self.db.query(Article.url_hash).filter(Article.url_hash.isnot(None)).yield_per(10000)
+        return (row_hash for (row_hash,) in query)
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> List[int]:
+        if not rows:
+            return []
+        if not self.emit_events:
+            self.db.execute(insert(Article), rows)
+            return []
+        # ה-ids נדרשים לאירועים - RETURNING / OUTPUT בסדר של השורות
+        statement = insert(Article).returning(Article.id, sort_by_parameter_order=True)
+        return [row_id for (row_id,) in self.db.execute(statement, rows)]
+
+    def _emit(self, ids: List[int], rows: List[Dict[str, Any]]) -> int:
+        events = [
+            ArticleCreatedEvent(
+                article_id=article_id,
+                title=row["title"],
+                summary=row["summary"] or "",
+                url=row["url"],
+                image_url=row["image_url"] or "",
+                category=row["category"],
+                content=row["content"],
+                source=row["source"]
+            )
+            for article_id, row in zip(ids, rows)
+        ]
+        try:
+            return len(get_event_store(self.db).save_events(events))
+        except Exception as e:
+            # המאמרים כבר נשמרו - כשל באירועים לא מבטל את הייבוא
+            self.db.rollback()
+            logger.error(f"Saving {len(events)} ArticleCreated events failed: {e}")
+            return 0
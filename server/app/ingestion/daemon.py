@@ -0,0 +1,222 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import get_settings
+from app.ingestion.feeds import Feed, load_feeds
+from app.ingestion.pipeline import IngestionPipeline
+
+logger = logging.getLogger(__name__)
+
+
+class InstanceLockError(RuntimeError):
+    """daemon אחר כבר מחזיק את ה-lock"""
+
+
+class InstanceLock:
+    """lock על קובץ (flock / msvcrt) - משתחרר אוטומטית אם התהליך מת, גם בלי release"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, "a+")
+        try:
+            if os.name == "nt":
+                import msvcrt
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._file.close()
+            self._file = None
+            raise InstanceLockError(f"Another ingestion daemon holds {self.path}")
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(str(os.getpid()))
+        self._file.flush()
+
+    def release(self):
+        if self._file is not None:
+            self._file.close()  # סגירה משחררת את ה-lock
+            self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class IngestionDaemon:
+    """
+    ייבוא ללא אדם: כל feed (מילת מפתח + קטגוריה) רץ כל interval שלו
+
+    - jitter: ההרצה הראשונה של כל feed מפוזרת על פני ה-interval, וכל הרצה הבאה זזה ב-±jitter,
+      כך שה-feeds לא יוצאים כולם יחד ולא "מסתנכרנים" עם הזמן
+    - כל ה-feeds שהגיע זמנם רצים יחד ב-IngestionPipeline אחד (במקביל, ב-quota משותף);
+      ה-watermarks של ה-pipeline מבטיחים שכל הרצה מביאה רק את מה שחדש
+    - checkpoint: אחרי כל הרצה נכתב (אטומית) קובץ state עם מתי כל feed רץ ומתי הבא,
+      והסטטיסטיקה - אחרי קריסה/restart ממשיכים מאותו לוח זמנים, ו-/admin/ingestion קורא אותו
+    - instance lock: רק daemon אחד רץ על אותה תיקיית state
+    """
+
+    def __init__(
+        self,
+        feeds: Optional[List[Feed]] = None,
+        state_dir: Optional[str] = None,
+        jitter: Optional[float] = None,
+        pipeline_factory: Optional[Callable[[], IngestionPipeline]] = None,
+        max_sleep: float = 60
+    ):
+        settings = get_settings()
+        self.feeds = feeds if feeds is not None else load_feeds(
+            settings.INGEST_FEEDS_PATH, settings.INGEST_DEFAULT_INTERVAL_MINUTES * 60
+        )
+        self.state_dir = state_dir or settings.INGEST_STATE_DIR
+        self.jitter = settings.INGEST_JITTER_FRACTION if jitter is None else jitter
+        self.pipeline_factory = pipeline_factory or IngestionPipeline
+        self.max_sleep = max_sleep
+
+        self.lock = InstanceLock(os.path.join(self.state_dir, "daemon.lock"))
+        self.checkpoint_path = checkpoint_path(self.state_dir)
+        self._stop = threading.Event()
+        self.state: Dict[str, Any] = {"feeds": {}, "totals": _empty_stats(), "runs": 0}
+
+    # ============================================
+    # Checkpoint
+    # ============================================
+
+    def load_checkpoint(self):
+        """לוח הזמנים והסטטיסטיקה מההרצה הקודמת; feed חדש מקבל זמן ראשון אקראי בתוך ה-interval"""
+        if os.path.exists(self.checkpoint_path):
+            try:
+                with open(self.checkpoint_path, encoding="utf-8") as f:
+                    self.state = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable checkpoint {self.checkpoint_path}: {e}")
+        now = time.time()
+        for feed in self.feeds:
+            entry = self.state["feeds"].setdefault(feed.name, {})
+            if "next_run_at" not in entry:
+                entry["next_run_at"] = now + random.uniform(0, feed.interval_seconds)
+
+    def save_checkpoint(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.state["updated_at"] = datetime.utcnow().isoformat()
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    # ============================================
+    # Scheduling
+    # ============================================
+
+    def due(self, now: float) -> List[Feed]:
+        return [feed for feed in self.feeds if self.state["feeds"][feed.name]["next_run_at"] <= now]
+
+    def seconds_until_next(self, now: float) -> float:
+        if not self.feeds:
+            return self.max_sleep
+        next_at = min(self.state["feeds"][feed.name]["next_run_at"] for feed in self.feeds)
+        return min(max(next_at - now, 0.0), self.max_sleep)
+
+    def _schedule(self, feed: Feed, ran_at: float):
+        spread = feed.interval_seconds * self.jitter
+        self.state["feeds"][feed.name]["next_run_at"] = ran_at + feed.interval_seconds + random.uniform(-spread, spread)
+
+    # ============================================
+    # Running
+    # ============================================
+
+    def run_once(self, feeds: Optional[List[Feed]] = None) -> Dict[str, Any]:
+        """הרצה אחת של feeds (ברירת מחדל: אלה שהגיע זמנם), עדכון ה-checkpoint והחזרת הסטטיסטיקה"""
+        started = time.time()
+        feeds = self.due(started) if feeds is None else feeds
+        if not feeds:
+            return _empty_stats()
+
+        try:
+            report = self.pipeline_factory().run_sync([feed.job() for feed in feeds])
+            stats = run_stats(report)
+            status = "ok" if not stats["failed"] else "partial"
+        except Exception as e:
+            logger.error(f"Ingestion run for {len(feeds)} feeds failed: {e}")
+            stats = {**_empty_stats(), "failed": len(feeds), "duration": round(time.time() - started, 3)}
+            status = f"error: {e}"
+
+        for feed in feeds:
+            entry = self.state["feeds"][feed.name]
+            entry["last_run_at"] = started
+            entry["last_status"] = status
+            self._schedule(feed, started)
+        last_run = {**stats, "feeds": [feed.name for feed in feeds], "started_at": started, "status": status}
+        self.state["last_run"] = last_run
+        self.state["runs"] = self.state.get("runs", 0) + 1
+        totals = self.state["totals"]
+        for key in ("fetched", "new", "duplicate", "failed"):
+            totals[key] += stats[key]
+        totals["duration"] = round(totals["duration"] + stats["duration"], 3)
+        self.save_checkpoint()
+
+        logger.info(
+            f"Ingested {len(feeds)} feeds: fetched={stats['fetched']} new={stats['new']} "
+            f"duplicate={stats['duplicate']} failed={stats['failed']} in {stats['duration']}s"
+        )
+        return stats
+
+    def run_forever(self):
+        with self.lock:
+            self.load_checkpoint()
+            logger.info(f"Ingestion daemon started with {len(self.feeds)} feeds (pid {os.getpid()})")
+            while not self._stop.is_set():
+                self.run_once()
+                self._stop.wait(self.seconds_until_next(time.time()))
+            logger.info("Ingestion daemon stopped")
+
+    def stop(self):
+        self._stop.set()
+
+
+def _empty_stats() -> Dict[str, Any]:
+    return {"fetched": 0, "new": 0, "duplicate": 0, "failed": 0, "duration": 0.0}
+
+
+def run_stats(report: Dict[str, Any]) -> Dict[str, Any]:
+    """דוח של IngestionPipeline -> fetched / new / duplicate / failed / duration"""
+    stages = report["stages"]
+    return {
+        # כולל מאמרים שה-watermark זיהה כמוכרים
+        "fetched": stages["fetch"]["out"] + report["known"],
+        "new": report["added"],
+        # מוכרים + URL כפול בהרצה / כבר ב-DB / עותק של ידיעה קיימת
+        "duplicate": report["known"] + max(stages["normalize"]["out"] - report["added"], 0),
+        "failed": sum(stage["errors"] for stage in stages.values()),
+        "duration": report["seconds"]
+    }
+
+
+def checkpoint_path(state_dir: Optional[str] = None) -> str:
+    return os.path.join(state_dir or get_settings().INGEST_STATE_DIR, "checkpoint.json")
+
+
+def read_status(state_dir: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """ה-checkpoint האחרון (לתצוגה מתהליך אחר, למשל ה-API); None אם ה-daemon עוד לא רץ"""
+    path = checkpoint_path(state_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,73 @@
+import json
+import os
+from typing import Any, Dict, List
+
+from app.ingestion.pipeline import IngestJob
+
+# 📚 רשימת קטגוריות פופולריות
+POPULAR_CATEGORIES = {
+    "1": {"name": "Technology", "keywords": ["technology", "AI", "software"]},
+    "2": {"name": "Business", "keywords": ["business", "economy", "finance"]},
+    "3": {"name": "Sports", "keywords": ["sports", "football", "basketball"]},
+    "4": {"name": "Health", "keywords": ["health", "medicine", "wellness"]},
+    "5": {"name": "Science", "keywords": ["science", "research", "space"]},
+    "6": {"name": "Entertainment", "keywords": ["entertainment", "movies", "music"]},
+    "7": {"name": "Politics", "keywords": ["politics", "election", "government"]},
+    "8": {"name": "Environment", "keywords": ["climate", "environment", "sustainability"]},
+    "9": {"name": "Education", "keywords": ["education", "university", "learning"]},
+    "10": {"name": "Travel", "keywords": ["travel", "tourism", "vacation"]},
+}
+
+
+class Feed:
+    """מילת מפתח שה-daemon מייבא כל interval_seconds לקטגוריה category"""
+
+    __slots__ = ("keyword", "category", "interval_seconds", "max_items")
+
+    def __init__(self, keyword: str, category: str, interval_seconds: float, max_items: int = 100):
+        self.keyword = keyword
+        self.category = category
+        self.interval_seconds = interval_seconds
+        self.max_items = max_items
+
+    @property
+    def name(self) -> str:
+        return f"{self.category}/{self.keyword}"
+
+    def job(self) -> IngestJob:
+        return IngestJob(self.keyword, self.category, self.max_items)
+
+
+def default_feeds(interval_seconds: float, max_items: int = 100) -> List[Feed]:
+    """כל מילות המפתח של POPULAR_CATEGORIES"""
+    return [
+        Feed(keyword, category["name"], interval_seconds, max_items)
+        for category in POPULAR_CATEGORIES.values()
+        for keyword in category["keywords"]
+    ]
+
+
+def load_feeds(path: str, default_interval_seconds: float) -> List[Feed]:
+    """
+    קובץ JSON - רשימה של {"keyword", "category", "interval_minutes"?, "max_items"?};
+    אם הקובץ לא קיים - default_feeds.
+    מילת מפתח מופיעה פעם אחת בלבד: ה-watermark נשמר לכל מילה, ומאמר (URL) שייך לקטגוריה אחת -
+    feed שני של אותה מילה בקטגוריה אחרת לא היה מקבל אף מאמר
+    """
+    if not path or not os.path.exists(path):
+        return default_feeds(default_interval_seconds)
+    with open(path, encoding="utf-8") as f:
+        entries: List[Dict[str, Any]] = json.load(f)
+    keywords = [entry["keyword"] for entry in entries]
+    duplicates = sorted({keyword for keyword in keywords if keywords.count(keyword) > 1})
+    if duplicates:
+        raise ValueError(f"Feeds file {path} lists these keywords more than once: {', '.join(duplicates)}")
+    return [
+        Feed(
+            entry["keyword"],
+            entry.get("category") or entry["keyword"].capitalize(),
+            entry["interval_minutes"] * 60 if entry.get("interval_minutes") else default_interval_seconds,
+            entry.get("max_items", 100)
+        )
+        for entry in entries
+    ]
@@ -0,0 +1,213 @@
+import gzip
+import io
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.ingestion.bulk import ARTICLE_COLUMNS, ArticleBulkWriter, BulkResult
+from app.mvc.models.articles.article_entity import Article
+
+# שורה אחת בקובץ = מאמר אחד, העמודות שהייבוא כותב; id לא נכתב - ב-DB היעד מקבלים id חדש
+EXPORT_COLUMNS = ARTICLE_COLUMNS
+
+Progress = Callable[[Dict[str, Any]], None]
+
+
+def open_jsonl(path: str, mode: str) -> TextIO:
+    """קובץ טקסט UTF-8; gzip אם הסיומת .gz (gzip עם כמה members - כמו שה-export כותב - נקרא כרגיל)"""
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, mode + "b", compresslevel=6), encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _encode(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _decode_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    row = {column: record.get(column) for column in EXPORT_COLUMNS}
+    if isinstance(row["published_at"], str):
+        try:
+            row["published_at"] = datetime.fromisoformat(row["published_at"].replace("Z", "+00:00")).replace(tzinfo=None)
+        except ValueError:
+            row["published_at"] = None
+    return row
+
+
+# ============================================
+# Progress files (resume)
+# ============================================
+
+def progress_path(path: str) -> str:
+    return f"{path}.progress"
+
+
+def read_progress(path: str) -> Dict[str, Any]:
+    try:
+        with open(progress_path(path), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_progress(path: str, progress: Dict[str, Any]) -> None:
+    tmp_path = f"{progress_path(path)}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(progress, f)
+    os.replace(tmp_path, progress_path(path))
+
+
+def clear_progress(path: str) -> None:
+    if os.path.exists(progress_path(path)):
+        os.remove(progress_path(path))
+
+
+# ============================================
+# Export
+# ============================================
+
+def export_articles(
+    db: Session,
+    path: str,
+    chunk_size: int = 5000,
+    after_id: int = 0,
+    limit: Optional[int] = None,
+    on_progress: Optional[Progress] = None,
+    resume_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    DB -> JSONL לפי סדר id, chunk אחרי chunk (keyset: id > האחרון) - הזיכרון תלוי ב-chunk_size בלבד
+    after_id > 0 ממשיך קובץ קיים (append). אחרי כל chunk נשמרים ב-<path>.progress ה-id האחרון
+    וגודל הקובץ (resume_size בהמשך): מה שנכתב אחריו בתהליך שנהרג (שורות כפולות, או member של gzip
+    חתוך - שהופך את כל מה שאחריו לבלתי קריא) נחתך לפני ההמשך. ב-.gz כל chunk הוא member שלם
+    """
+    columns = [Article.id] + [getattr(Article, column) for column in EXPORT_COLUMNS]
+    started = time.perf_counter()
+    written = 0
+    last_id = after_id
+    with open(path, "ab" if after_id else "wb") as f:
+        if after_id and resume_size is not None and resume_size < os.path.getsize(path):
+            f.truncate(resume_size)
+        while limit is None or written < limit:
+            size = chunk_size if limit is None else min(chunk_size, limit - written)
+            rows = db.execute(
+                select(*columns).where(Article.id > last_id).order_by(Article.id).limit(size)
+            ).all()
+            if not rows:
+                break
+            data = "".join(
+                json.dumps(
+                    {column: _encode(value) for column, value in zip(EXPORT_COLUMNS, row[1:])},
+                    ensure_ascii=False
+                ) + "\n"
+                for row in rows
+            ).encode("utf-8")
+            if path.endswith(".gz"):
+                data = gzip.compress(data, compresslevel=6)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())  # ה-progress לא מצביע על בתים שעוד לא בדיסק
+            written += len(rows)
+            last_id = rows[-1][0]
+            write_progress(path, {"last_id": last_id, "bytes": f.tell()})
+            if on_progress:
+                on_progress(_summary(written, started, last_id=last_id))
+    return _summary(written, started, last_id=last_id)
+
+
+# ============================================
+# Import
+# ============================================
+
+def iter_jsonl(path: str, offset: int = 0) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """(מספר השורה, רשומה) לכל שורה אחרי offset; שורה שאינה JSON תקין - רשומה None"""
+    with open_jsonl(path, "r") as f:
+        for line_no, line in enumerate(f, start=1):
+            if line_no <= offset:
+                continue
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError:
+                yield line_no, None
+
+
+def import_articles(
+    db: Session,
+    path: str,
+    chunk_size: Optional[int] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    emit_events: bool = False,
+    near_duplicate_mode: str = "off",
+    on_progress: Optional[Progress] = None
+) -> Dict[str, Any]:
+    """
+    JSONL -> DB דרך ArticleBulkWriter, chunk אחרי chunk - לא נטען יותר מ-chunk שורות לזיכרון
+    אחרי ה-commit של כל chunk מספר השורה נשמר ב-<path>.progress - offset להמשך אחרי הפסקה
+    ברירות המחדל מכוונות ל-seed: בלי אירועים ובלי בדיקת עותקים (אפשר להפעיל)
+    """
+    chunk_size = min(chunk_size or get_settings().INGEST_BULK_CHUNK_SIZE, ArticleBulkWriter.MAX_CHUNK_SIZE)
+    writer = ArticleBulkWriter(
+        db, chunk_size=chunk_size, emit_events=emit_events, near_duplicate_mode=near_duplicate_mode
+    )
+    total = BulkResult()
+    started = time.perf_counter()
+    invalid = 0
+    read = 0
+    done = offset  # השורה האחרונה שנקראה
+    chunk: List[Dict[str, Any]] = []
+
+    def summary() -> Dict[str, Any]:
+        return _summary(read, started, offset=done, inserted=total.inserted, **_counts(total, invalid))
+
+    def flush():
+        # write נפרד לכל chunk: ה-set של כפילויות בתוך הקלט לא גדל עם הקובץ (כפילות בין chunks נתפסת ב-DB)
+        total.merge(writer.write(chunk))
+        chunk.clear()
+        write_progress(path, {"offset": done})
+        if on_progress:
+            on_progress(summary())
+
+    for line_no, record in iter_jsonl(path, offset):
+        if limit is not None and read >= limit:
+            break
+        read += 1
+        done = line_no
+        if record is None or not record.get("url") or not record.get("title"):
+            invalid += 1
+        else:
+            chunk.append(_decode_row(record))
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk or read:
+        flush()
+    return summary()
+
+
+def _counts(result: BulkResult, invalid: int) -> Dict[str, int]:
+    return {
+        "existing": result.existing,
+        "duplicates": result.duplicates,
+        "near_duplicates": result.near_duplicates,
+        "invalid": invalid,
+        "events": result.events
+    }
+
+
+def _summary(rows: int, started: float, **extra: Any) -> Dict[str, Any]:
+    seconds = time.perf_counter() - started
+    return {
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds, 1) if seconds else 0.0,
+        **extra
+    }
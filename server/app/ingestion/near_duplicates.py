@@ -0,0 +1,146 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import get_settings
+
+_WORDS = re.compile(r"\w+", re.UNICODE)
+
+
+def story_text(title: Optional[str], body: Optional[str], max_chars: int = 2000) -> str:
+    """הטקסט שממנו מחושבת טביעת האצבע: כותרת + תחילת הגוף (עותקים של אותה ידיעה נבדלים בעיקר בסוף)"""
+    return f"{title or ''} {(body or '')[:max_chars]}"
+
+
+def shingles(text: str, size: int = 3) -> Set[int]:
+    """רצפים של size מילים (אותיות קטנות, בלי פיסוק), כל אחד כ-hash של 64 ביט"""
+    words = _WORDS.findall(text.casefold())
+    if len(words) < size:
+        words = words + [""] * (size - len(words))
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(words[i:i + size]).encode("utf-8"), digest_size=8).digest(), "big")
+        for i in range(len(words) - size + 1)
+    }
+
+
+class MinHasher:
+    """
+    MinHash בגרסת one-permutation: hash אחד לכל shingle, מחולק ל-num_perm תאים, ובכל תא נשמר המינימום -
+    O(מספר ה-shingles) במקום O(shingles * num_perm). תא ריק מקבל את הערך של התא המלא הבא (densification)
+    אחוז התאים הזהים בין שתי חתימות מעריך את ה-Jaccard של ה-shingles
+    """
+
+    def __init__(self, num_perm: int = 64):
+        self.num_perm = num_perm
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        bins: List[Optional[int]] = [None] * self.num_perm
+        for h in shingles(text):
+            slot, value = h % self.num_perm, h // self.num_perm
+            if bins[slot] is None or value < bins[slot]:
+                bins[slot] = value
+        filled = [slot for slot, value in enumerate(bins) if value is not None]
+        if len(filled) == self.num_perm:
+            return tuple(bins)
+        # התא המלא הבא (מעגלית) + המרחק אליו - כך ששני טקסטים דומים ממלאים את אותם תאים באותו אופן
+        signature = []
+        for slot, value in enumerate(bins):
+            if value is None:
+                source = next((f for f in filled if f > slot), filled[0])
+                value = bins[source] * self.num_perm + (source - slot) % self.num_perm
+            signature.append(value)
+        return tuple(signature)
+
+    @staticmethod
+    def similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+        return sum(x == y for x, y in zip(first, second)) / len(first)
+
+
+class NearDuplicateIndex:
+    """
+    LSH על חתימות MinHash: החתימה מחולקת ל-bands; שני מאמרים הם מועמדים אם band אחד זהה,
+    ורק המועמדים נבדקים מול threshold - בלי להשוות לכל המאמרים.
+    שומר רק את max_items האחרונים (עותקים של ידיעה מגיעים באותם ימים)
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.7, max_items: int = 20000):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_items = max_items
+        self._signatures: "OrderedDict[str, Tuple[int, ...]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        return self.hasher.signature(text)
+
+    def match(self, signature: Tuple[int, ...], exclude: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """(המפתח של המאמר הדומה ביותר, דמיון) אם עבר את ה-threshold, אחרת None"""
+        with self._lock:
+            candidates = set()
+            for band_key in self._band_keys(signature):
+                candidates |= self._buckets.get(band_key, set())
+            candidates.discard(exclude)
+            best = None
+            for key in candidates:
+                similarity = MinHasher.similarity(signature, self._signatures[key])
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (key, similarity)
+            return best
+
+    def add(self, key: str, signature: Tuple[int, ...]) -> None:
+        with self._lock:
+            if key in self._signatures:
+                self._remove(key)
+            self._signatures[key] = signature
+            for band_key in self._band_keys(signature):
+                self._buckets.setdefault(band_key, set()).add(key)
+            while len(self._signatures) > self.max_items:
+                self._remove(next(iter(self._signatures)))
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            if key in self._signatures:
+                self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        signature = self._signatures.pop(key)
+        for band_key in self._band_keys(signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+
+# Singleton - המאמרים האחרונים שב-DB, נטען פעם אחת לתהליך
+_near_duplicate_index: Optional[NearDuplicateIndex] = None
+_near_duplicate_index_lock = threading.Lock()
+
+def get_near_duplicate_index(load: Callable[[int], Iterable[Tuple[str, str]]]) -> NearDuplicateIndex:
+    """load(limit) - (url_hash, story_text) של limit המאמרים הקנוניים האחרונים, מהישן לחדש"""
+    global _near_duplicate_index
+    if _near_duplicate_index is None:
+        with _near_duplicate_index_lock:
+            if _near_duplicate_index is None:
+                settings = get_settings()
+                index = NearDuplicateIndex(
+                    threshold=settings.INGEST_NEAR_DUP_THRESHOLD,
+                    max_items=settings.INGEST_NEAR_DUP_WINDOW
+                )
+                for key, text in load(index.max_items):
+                    index.add(key, index.signature(text))
+                _near_duplicate_index = index
+    return _near_duplicate_index
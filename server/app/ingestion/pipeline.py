@@ -0,0 +1,369 @@
+import asyncio
+import itertools
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.core.async_gateway import get_async_gateway
+from app.core.config import get_settings
+from app.core.rate_limiter import RateLimiter
+from app.gateways.news_api_gateway import NewsAPIGateway
+from app.ingestion.bulk import ArticleBulkWriter, BulkResult, article_row
+from app.ingestion.watermarks import Watermark, WatermarkStore
+from app.services.image_service import get_image_service
+
+logger = logging.getLogger(__name__)
+
+# סוף הזרם בין שלבים
+_DONE = object()
+
+
+class IngestJob:
+    """
+    מילת מפתח אחת לייבוא: category - הקטגוריה שהמאמרים יקבלו, max_items - כמה לכל היותר
+    (בייבוא הראשון; כשיש watermark מיובא כל מה שחדש, עד max_pages של ה-pipeline)
+    """
+
+    __slots__ = ("keyword", "category", "max_items")
+
+    def __init__(self, keyword: str, category: str, max_items: int = 100):
+        self.keyword = keyword
+        self.category = category
+        self.max_items = max_items
+
+
+class StageStats:
+    """מונים של שלב אחד ב-pipeline: כמה נכנס, כמה יצא, ושגיאות"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def start(self):
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+
+    def finish(self):
+        self.finished_at = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "in": self.items_in,
+            "out": self.items_out,
+            "errors": self.errors,
+            "seconds": round(self.elapsed, 3),
+            "per_second": round(self.items_out / self.elapsed, 1) if self.elapsed else 0.0
+        }
+
+
+class IngestionPipeline:
+    """
+    ייבוא מקבילי של מאמרים מ-NewsAPI.ai: fetch -> normalize -> dedupe -> persist
+
+    - fetch: fetch_concurrency workers מושכים (מילת מפתח, עמוד) במקביל; עמוד 1 של כל מילה
+      מחזיר את מספר העמודים, ושאר העמודים נכנסים לתור מיד - כך שגם העמודים יוצאים במקביל.
+      כל הקריאות עוברות ב-quota גלובלי (quota_per_minute) - לא חשוב כמה workers יש
+    - השלבים מחוברים בתורים חסומים (queue_size): אם ה-DB איטי, התורים מתמלאים וה-fetch
+      ממתין במקום לצבור מאמרים בזיכרון (backpressure)
+    - dedupe: URL (קנוני, לפי url_hash) שכבר עבר בהרצה הזו נזרק; לכל קטגוריה לכל היותר סכום ה-max_items שלה
+    - persist: batches של batch_size דרך ArticleBulkWriter (בדיקת קיום אחת, INSERT רב-שורות
+      ו-ArticleCreatedEvents לכל batch). ה-DB (SQLAlchemy סינכרוני) רץ ב-thread כדי לא לעצור את ה-event loop
+    - incremental: לכל (source, מילת מפתח) נשמר watermark - המאמר החדש ביותר שייבאנו.
+      הבקשות נשלחות עם dateStart, העמודים נמשכים אחד אחרי השני, והמשיכה נעצרת במאמר
+      המוכר הראשון - כך שמספר הקריאות ל-API וה-DB תלוי רק במה שבאמת חדש.
+      max_items לא עוצר את המשיכה לפני הגבול (מה שבין העמוד האחרון ל-watermark היה אובד לתמיד);
+      אם max_pages נגמר לפני מאמר מוכר - המילה לא הושלמה.
+      ה-watermark מתקדם רק אם כל העמודים של המילה וכל ה-batches נשמרו בהצלחה
+    - thumbnails: לפני השמירה ה-image_url של כל batch עובר ב-ImageService, ו-thumb_url מצביע על
+      ה-thumbnail בשרת (אם נכשל - נשאר ה-image_url)
+    """
+
+    def __init__(
+        self,
+        gateway: Optional[NewsAPIGateway] = None,
+        session_factory: Optional[Callable[[], Any]] = None,
+        fetch_concurrency: int = 8,
+        quota_per_minute: int = 60,
+        page_size: int = 100,
+        max_pages: int = 5,
+        queue_size: int = 200,
+        batch_size: Optional[int] = None,
+        language: str = "eng",
+        incremental: bool = True,
+        source: str = "newsapi",
+        emit_events: bool = True,
+        thumbnails: Optional[bool] = None,
+        run_timeout: Optional[float] = None
+    ):
+        self.gateway = gateway or NewsAPIGateway()
+        self.session_factory = session_factory
+        self.fetch_concurrency = fetch_concurrency
+        self.quota = RateLimiter("newsapi_ingestion", quota_per_minute, 60)
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.queue_size = queue_size
+        self.batch_size = batch_size or get_settings().INGEST_BULK_CHUNK_SIZE
+        self.language = language
+        self.incremental = incremental
+        self.source = source
+        self.emit_events = emit_events
+        if thumbnails is None:
+            thumbnails = get_settings().INGEST_THUMBNAILS
+        self.images = get_image_service() if thumbnails else None
+        self.run_timeout = get_settings().INGEST_RUN_TIMEOUT_SECONDS if run_timeout is None else run_timeout
+        self.stats: Dict[str, StageStats] = {}
+        self.watermarks: Dict[str, Watermark] = {}
+        self._newest: Dict[str, Watermark] = {}
+        self._failed_keywords = set()
+        self.known = 0
+        self.near_duplicates = 0
+
+    # ============================================
+    # Run
+    # ============================================
+
+    def run_sync(self, jobs: Iterable[IngestJob]) -> Dict[str, Any]:
+        """
+        להרצה מסקריפט סינכרוני (וכל ריצה של ה-daemon). ה-loop של asyncio.run נגמר בסוף הריצה,
+        ולכן ה-clients שנוצרו עליו (ה-gateway האסינכרוני, שירות התמונות) נסגרים לפניו - אחרת כל ריצה משאירה pool פתוח.
+        הרצה שנתקעת נעצרת אחרי run_timeout שניות (TimeoutError) - ה-daemon לא נשאר תקוע איתה ועם ה-lock
+        """
+        async def run_and_close():
+            try:
+                return await asyncio.wait_for(self.run(jobs), self.run_timeout or None)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Ingestion run exceeded {self.run_timeout}s") from None
+            finally:
+                await get_async_gateway().aclose()
+                if self.images is not None:
+                    await self.images.aclose()
+
+        return asyncio.run(run_and_close())
+
+    async def run(self, jobs: Iterable[IngestJob]) -> Dict[str, Any]:
+        jobs = list(jobs)
+        self.stats = {name: StageStats(name) for name in ("fetch", "normalize", "dedupe", "persist")}
+        self._newest, self._failed_keywords, self.known, self.near_duplicates = {}, set(), 0, 0
+        started = time.perf_counter()
+        store = WatermarkStore(self._factory()) if self.incremental else None
+        self.watermarks = await asyncio.to_thread(store.load, self.source, [job.keyword for job in jobs]) if store else {}
+
+        pages: asyncio.Queue = asyncio.Queue()  # (job, page) - חסום בעקיפין ע"י max_pages
+        raw: asyncio.Queue = asyncio.Queue(self.queue_size)
+        normalized: asyncio.Queue = asyncio.Queue(self.queue_size)
+        unique: asyncio.Queue = asyncio.Queue(self.queue_size)
+
+        for job in jobs:
+            pages.put_nowait((job, 1))
+
+        fetchers = [asyncio.ensure_future(self._fetch_worker(pages, raw)) for _ in range(self.fetch_concurrency)]
+        downstream = [
+            asyncio.ensure_future(self._normalize(raw, normalized)),
+            asyncio.ensure_future(self._dedupe(normalized, unique, jobs)),
+            asyncio.ensure_future(self._persist(unique))
+        ]
+        try:
+            await self._unless_stage_fails(pages.join(), downstream)
+            self.stats["fetch"].finish()
+            await self._unless_stage_fails(raw.put(_DONE), downstream)
+            added = (await asyncio.gather(*downstream))[-1]
+        finally:
+            for task in fetchers + downstream:
+                task.cancel()
+
+        advanced = []
+        if store and not self.stats["persist"].errors:
+            watermarks = {
+                keyword: self.watermarks[keyword].merge(newest) if keyword in self.watermarks else newest
+                for keyword, newest in self._newest.items()
+                if keyword not in self._failed_keywords
+            }
+            await asyncio.to_thread(store.save, self.source, watermarks)
+            advanced = sorted(watermarks)
+
+        return {
+            "added": added,
+            "known": self.known,
+            "near_duplicates": self.near_duplicates,
+            "watermarks_advanced": advanced,
+            "seconds": round(time.perf_counter() - started, 3),
+            "stages": {name: stats.as_dict() for name, stats in self.stats.items()}
+        }
+
+    @staticmethod
+    async def _unless_stage_fails(step, stages: List[asyncio.Future]):
+        """
+        המתנה ל-step (סוף ה-fetch / סימון סוף הזרם). שלב שנפל לפני כן לא קורא יותר מהתור שלו,
+        התורים מתמלאים וה-fetch נחסם לתמיד - לכן שלב שהסתיים לפני step מפיל את ההרצה
+        """
+        step = asyncio.ensure_future(step)
+        done, _ = await asyncio.wait([step, *stages], return_when=asyncio.FIRST_COMPLETED)
+        if step in done:
+            return step.result()
+        step.cancel()
+        for task in done:
+            task.result()  # החריגה של השלב
+        raise RuntimeError("An ingestion stage exited before the end of the stream")
+
+    # ============================================
+    # Stages
+    # ============================================
+
+    async def _fetch_worker(self, pages: asyncio.Queue, raw: asyncio.Queue):
+        stats = self.stats["fetch"]
+        while True:
+            job, page = await pages.get()
+            stats.start()
+            stats.items_in += 1
+            try:
+                await self.quota.acquire_async(block=True)
+                watermark = self.watermarks.get(job.keyword)
+                page_size = self.page_size if watermark else min(self.page_size, job.max_items)
+                articles, total_pages = await self.gateway.get_articles_page_async(
+                    job.keyword, page, self.language, page_size,
+                    date_start=watermark.published_at if watermark else None,
+                    use_cache=False  # עמוד מה-cache (עד 20 דק') היה נראה כמו "אין חדש" מול ה-watermark
+                )
+                if watermark is None:
+                    if page == 1:
+                        needed = min(total_pages, self.max_pages, math.ceil(job.max_items / page_size))
+                        # שאר העמודים יוצאים במקביל, לכל היותר כמה שצריך בשביל max_items
+                        for next_page in range(2, needed + 1):
+                            pages.put_nowait((job, next_page))
+                else:
+                    # מהחדש לישן: מהמאמר המוכר הראשון הכל כבר אצלנו - לא ממשיכים לעמוד הבא
+                    fresh = list(itertools.takewhile(lambda article: not watermark.is_known(article), articles))
+                    self.known += len(articles) - len(fresh)
+                    if len(fresh) == len(articles) and page < total_pages:
+                        if page < self.max_pages:
+                            pages.put_nowait((job, page + 1))
+                        else:
+                            # יש עוד חדשים שלא נמשכו - watermark חדש היה מדלג עליהם לתמיד
+                            self._failed_keywords.add(job.keyword)
+                            logger.warning(
+                                f"'{job.keyword}' has more than {self.max_pages} new pages - watermark not advanced"
+                            )
+                    articles = fresh
+                self._advance(job.keyword, articles)
+                for article in articles:
+                    await raw.put((job, article))
+                    stats.items_out += 1
+            except Exception as e:
+                stats.errors += 1
+                self._failed_keywords.add(job.keyword)
+                logger.warning(f"Fetching '{job.keyword}' page {page} failed: {e}")
+            finally:
+                pages.task_done()
+
+    def _advance(self, keyword: str, articles: List[Dict[str, Any]]):
+        newest = Watermark.first(articles)
+        if newest is not None:
+            current = self._newest.get(keyword)
+            self._newest[keyword] = current.merge(newest) if current else newest
+
+    async def _normalize(self, raw: asyncio.Queue, normalized: asyncio.Queue):
+        stats = self.stats["normalize"]
+        while True:
+            item = await raw.get()
+            if item is _DONE:
+                stats.finish()
+                await normalized.put(_DONE)
+                return
+            stats.start()
+            stats.items_in += 1
+            job, article = item
+            try:
+                row = article_row(article, job.category)
+            except Exception as e:
+                # מאמר פגום אחד לא עוצר את השלב (ואת כל ה-pipeline אחריו)
+                logger.warning(f"Normalizing {article.get('url')!r} failed: {e}")
+                row = None
+            if row is None:
+                stats.errors += 1
+                continue
+            await normalized.put((job, row))
+            stats.items_out += 1
+
+    async def _dedupe(self, normalized: asyncio.Queue, unique: asyncio.Queue, jobs: List[IngestJob]):
+        stats = self.stats["dedupe"]
+        seen = set()
+        remaining: Dict[str, int] = {}
+        for job in jobs:
+            remaining[job.category] = remaining.get(job.category, 0) + job.max_items
+        while True:
+            item = await normalized.get()
+            if item is _DONE:
+                stats.finish()
+                await unique.put(_DONE)
+                return
+            stats.start()
+            stats.items_in += 1
+            job, row = item
+            try:
+                if row["url_hash"] in seen:
+                    continue
+                # רק בייבוא הראשון - ממילה עם watermark כל החדשים נשמרים (אחרת הם אובדים)
+                if job.keyword not in self.watermarks:
+                    if remaining[row["category"]] <= 0:
+                        continue
+                    remaining[row["category"]] -= 1
+                seen.add(row["url_hash"])
+            except Exception as e:
+                stats.errors += 1
+                logger.warning(f"Deduplicating {row.get('url')!r} failed: {e}")
+                continue
+            await unique.put(row)
+            stats.items_out += 1
+
+    async def _persist(self, unique: asyncio.Queue) -> int:
+        stats = self.stats["persist"]
+        batch: List[Dict[str, Any]] = []
+        added = 0
+        while True:
+            row = await unique.get()
+            if row is not _DONE:
+                stats.start()
+                stats.items_in += 1
+                batch.append(row)
+            if batch and (row is _DONE or len(batch) >= self.batch_size):
+                try:
+                    if self.images is not None:
+                        await self.images.apply_thumbnails(batch)
+                    result = await asyncio.to_thread(self._write_batch, batch)
+                    added += result.inserted
+                    stats.items_out += result.inserted
+                    self.near_duplicates += result.near_duplicates
+                except Exception as e:
+                    stats.errors += 1
+                    logger.error(f"Persisting {len(batch)} articles failed: {e}")
+                batch = []
+            if row is _DONE:
+                stats.finish()
+                return added
+
+    def _write_batch(self, rows: List[Dict[str, Any]]) -> BulkResult:
+        db = self._session()
+        try:
+            return ArticleBulkWriter(db, chunk_size=len(rows), emit_events=self.emit_events).write(rows)
+        finally:
+            db.close()
+
+    def _factory(self) -> Callable[[], Any]:
+        if self.session_factory is None:
+            from app.core.db import SessionLocal
+            self.session_factory = SessionLocal
+        return self.session_factory
+
+    def _session(self):
+        return self._factory()()
@@ -0,0 +1,162 @@
+import json
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from sqlalchemy import Column, DateTime, Integer, String, Text, UniqueConstraint
+
+from app.mvc.models.base import Base
+
+
+class IngestionWatermark(Base):
+    """עד איפה כבר ייבאנו לכל (מקור, מילת מפתח): זמן הפרסום של המאמר החדש ביותר וה-URIs שלו"""
+    __tablename__ = "ingestion_watermarks"
+    __table_args__ = (UniqueConstraint("source", "keyword", name="uq_ingestion_watermark"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String(50), nullable=False)
+    keyword = Column(String(200), nullable=False)
+    last_published_at = Column(DateTime, nullable=False)
+    last_uris = Column(Text)  # JSON - כל ה-URIs עם last_published_at (כמה מאמרים באותה שנייה)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<IngestionWatermark({self.source}/{self.keyword} @ {self.last_published_at})>"
+
+
+def to_utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """datetime עם/בלי אזור זמן -> UTC בלי אזור זמן (כמו שנשמר ב-DB)"""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def published_at_of(article: Dict[str, Any]) -> Optional[datetime]:
+    """published_at של מאמר מנורמל של NewsAPIGateway (מחרוזת ISO) כ-UTC"""
+    value = article.get("published_at")
+    if not value:
+        return None
+    try:
+        return to_utc_naive(datetime.fromisoformat(value.replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+
+class Watermark:
+    """
+    הגבול בין מה שכבר ראינו לחדש. התוצאות ממוינות מהחדש לישן, אז המאמר הראשון
+    שמוכר (ישן מ-published_at, או באותו זמן עם URI מוכר) אומר שמכאן והלאה הכל כבר אצלנו
+    """
+
+    __slots__ = ("published_at", "uris")
+
+    def __init__(self, published_at: datetime, uris: Iterable[str] = ()):
+        self.published_at = to_utc_naive(published_at)
+        self.uris = set(uris)
+
+    def is_known(self, article: Dict[str, Any]) -> bool:
+        published_at = published_at_of(article)
+        if published_at is None:
+            return False  # בלי תאריך אי אפשר לדעת - ה-dedupe לפי URL יטפל
+        if published_at != self.published_at:
+            return published_at < self.published_at
+        return (article.get("uri") or article.get("url")) in self.uris
+
+    def advance(self, article: Dict[str, Any]) -> None:
+        """הזזת הגבול קדימה אם המאמר חדש יותר"""
+        published_at = published_at_of(article)
+        if published_at is None or published_at < self.published_at:
+            return
+        if published_at > self.published_at:
+            self.published_at = published_at
+            self.uris = set()
+        self.uris.add(article.get("uri") or article.get("url"))
+
+    def merge(self, other: "Watermark") -> "Watermark":
+        """הגבול המאוחר מבין השניים (איחוד URIs אם באותו זמן)"""
+        if other.published_at > self.published_at:
+            return other
+        if other.published_at == self.published_at:
+            self.uris |= other.uris
+        return self
+
+    @classmethod
+    def first(cls, articles: Iterable[Dict[str, Any]]) -> Optional["Watermark"]:
+        """ה-watermark של קבוצת מאמרים (None אם לאף אחד אין תאריך)"""
+        watermark = None
+        for article in articles:
+            published_at = published_at_of(article)
+            if published_at is None:
+                continue
+            if watermark is None:
+                watermark = cls(published_at)
+            watermark.advance(article)
+        return watermark
+
+
+class WatermarkStore:
+    """טעינה ושמירה של watermarks בטבלת ingestion_watermarks (נוצרת בשימוש הראשון)"""
+
+    def __init__(self, session_factory: Callable[[], Any]):
+        self.session_factory = session_factory
+        self._table_ready = False
+
+    def load(self, source: str, keywords: Iterable[str]) -> Dict[str, Watermark]:
+        db = self._session()
+        try:
+            rows = db.query(IngestionWatermark).filter(
+                IngestionWatermark.source == source,
+                IngestionWatermark.keyword.in_(list(set(keywords)))
+            )
+            return {
+                row.keyword: Watermark(row.last_published_at, json.loads(row.last_uris or "[]"))
+                for row in rows
+            }
+        finally:
+            db.close()
+
+    def save(self, source: str, watermarks: Dict[str, Watermark]) -> None:
+        if not watermarks:
+            return
+        db = self._session()
+        try:
+            existing = {
+                row.keyword: row for row in db.query(IngestionWatermark).filter(
+                    IngestionWatermark.source == source,
+                    IngestionWatermark.keyword.in_(list(watermarks))
+                )
+            }
+            for keyword, watermark in watermarks.items():
+                row = existing.get(keyword)
+                if row is None:
+                    row = IngestionWatermark(source=source, keyword=keyword)
+                    db.add(row)
+                elif row.last_published_at and row.last_published_at > watermark.published_at:
+                    continue  # הרצה אחרת כבר התקדמה יותר
+                row.last_published_at = watermark.published_at
+                row.last_uris = json.dumps(sorted(watermark.uris))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def reset(self, source: str, keyword: Optional[str] = None) -> int:
+        """מחיקת watermarks (ייבוא מלא בהרצה הבאה). מחזיר כמה נמחקו"""
+        db = self._session()
+        try:
+            query = db.query(IngestionWatermark).filter(IngestionWatermark.source == source)
+            if keyword is not None:
+                query = query.filter(IngestionWatermark.keyword == keyword)
+            deleted = query.delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def _session(self):
+        db = self.session_factory()
+        if not self._table_ready:
+            IngestionWatermark.__table__.create(bind=db.get_bind(), checkfirst=True)
+            self._table_ready = True
+        return db
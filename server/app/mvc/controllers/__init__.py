@@ -3,11 +3,19 @@ from . import auth_controller
 from . import health_controller
 from . import llm_controller
 from . import likes_controller 
+from . import events_controller
+from . import metrics_controller
+from . import weather_controller
+from . import images_controller
 
 __all__ = [
     "articles_controller",
     "auth_controller", 
     "health_controller",
     "llm_controller",
-    "likes_controller"  
+    "likes_controller",
+    "events_controller",
+    "metrics_controller",
+    "weather_controller",
+    "images_controller"
 ]
\ No newline at end of file
@@ -10,6 +10,8 @@ from app.core.auth_utils import get_current_active_user
 from app.mvc.models.users.user_entity import User
 from app.mvc.models.articles.article_entity import Article
 from app.services.classification_service import get_classification_service
+from app.services.image_service import get_image_service
+from app.ingestion.daemon import read_status as read_ingestion_status
 
 router = APIRouter(tags=["admin"], prefix="/admin")
 
@@ -104,6 +106,11 @@ def create_article(
             if cat_result:
                 category_id = cat_result[0]
         
+        # thumbnail בשרת לתמונה (אם לא נשלח thumb_url מפורש)
+        thumb_url = payload.thumb_url
+        if not thumb_url and payload.image_url:
+            thumb_url = get_image_service().thumb_urls_sync([payload.image_url]).get(payload.image_url)
+        
         # יצירת URL ייחודי אם ריק
         url_value = payload.url or f"https://example.com/article/{uuid.uuid4()}"
         
@@ -116,7 +123,7 @@ def create_article(
             source=payload.source or "Manual",
             category=category_id,  # שמירת ID ולא שם
             image_url=payload.image_url,
-            thumb_url=payload.thumb_url or payload.image_url,
+            thumb_url=thumb_url or payload.image_url,
             published_at=datetime.utcnow()
         )
         
@@ -347,6 +354,15 @@ def get_available_categories(admin_user: User = Depends(require_admin)):
     }
 
 
+@router.get("/ingestion")
+def get_ingestion_status(admin_user: User = Depends(require_admin)):
+    """מצב ה-daemon של הייבוא: ההרצה האחרונה, סיכומים ולוח הזמנים של כל feed (מה-checkpoint)"""
+    status = read_ingestion_status()
+    if status is None:
+        return {"running": False, "message": "Ingestion daemon has not run yet"}
+    return {"running": True, **status}
+
+
 @router.get("/articles")
 def get_all_articles_admin(
     admin_user: User = Depends(require_admin),
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional, List
+
+from app.core.auth_utils import get_token_user_id
+from app.event_sourcing.event_bus import get_event_bus, format_sse
+
+router = APIRouter(tags=["events"])
+
+HEARTBEAT_SECONDS = 15
+MAX_ARTICLE_IDS = 500
+
+
+def _split(value: Optional[str]) -> Optional[List[str]]:
+    if not value:
+        return None
+    items = [v.strip() for v in value.split(",") if v.strip()]
+    return items or None
+
+
+@router.get("/events/stream")
+async def stream_events(
+    request: Request,
+    types: Optional[str] = Query(None, description="ArticleCreated,ArticleStatsChanged,..."),
+    categories: Optional[str] = Query(None, description="Technology,Sports,..."),
+    article_ids: Optional[str] = Query(None, description="1,2,3 - המאמרים שמוצגים כרגע"),
+    user_id: int = Depends(get_token_user_id)
+):
+    """
+    Server-Sent Events - דחיפת שינויים (deltas) ללקוח במקום טעינה מלאה
+    article_ids      - כל האירועים של המאמרים שמוצגים כרגע (לייקים, עדכון, מחיקה)
+    types/categories - פיד של אירועים חדשים, למשל ArticleCreated בקטגוריה
+    """
+    ids = _split(article_ids)
+    watched = [int(i) for i in ids[:MAX_ARTICLE_IDS] if i.isdigit()] if ids else None
+    bus = get_event_bus()
+
+    subscriptions = []
+    if watched:
+        subscriptions.append(bus.subscribe(aggregate_ids=watched))
+    if types or categories or not watched:
+        subscriptions.append(bus.subscribe(
+            event_types=_split(types),
+            categories=_split(categories),
+            queue=subscriptions[0].queue if subscriptions else None
+        ))
+    subscription = subscriptions[0]
+
+    async def event_generator():
+        try:
+            yield format_sse("Subscribed", {"user_id": user_id})
+            while not await request.is_disconnected():
+                frame = await subscription.get(timeout=HEARTBEAT_SECONDS)
+                # comment line של SSE - שומר את החיבור פתוח דרך proxies
+                yield frame if frame is not None else b": keep-alive\n\n"
+        finally:
+            for sub in subscriptions:
+                bus.unsubscribe(sub)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/events/stats")
+def event_bus_stats(user_id: int = Depends(get_token_user_id)):
+    """סטטיסטיקות של ה-EventBus"""
+    bus = get_event_bus()
+    return {
+        "subscribers": bus.subscriber_count,
+        "published": bus.published,
+        "delivered": bus.delivered
+    }
@@ -1,7 +1,25 @@
 from fastapi import APIRouter
 
+from app.core.async_gateway import get_async_gateway
+from app.core.gateway import get_gateway
+
 router = APIRouter(tags=["health"])
 
 @router.get("/health")
 def health():
     return {"status": "up"}
+
+@router.get("/health/upstreams")
+def upstreams_health():
+    """
+    מצב ה-circuit breakers של השירותים החיצוניים (0 closed, 1 half_open, 2 open)
+    לכל gateway בנפרד - לשירות כמו newsapi או weather יש breaker בכל אחד מהם
+    """
+    async_gateway = get_async_gateway()
+    return {
+        "circuit_breakers": {
+            "sync": get_gateway().get_circuit_breaker_stats(),
+            "async": async_gateway.get_circuit_breaker_stats()
+        },
+        "hedges": async_gateway.get_hedge_stats()
+    }
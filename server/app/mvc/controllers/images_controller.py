@@ -0,0 +1,34 @@
+import os
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+
+from app.services.image_service import CONTENT_TYPE, THUMB_SIZES, get_image_service, is_image_hash
+
+router = APIRouter(prefix="/images", tags=["images"])
+
+# הקובץ נקבע לפי hash התוכן ולא משתנה לעולם - הלקוח (ו-proxy) שומרים אותו שנה בלי לבדוק שוב
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/{digest}/{size}")
+def get_thumbnail(digest: str, size: str, request: Request):
+    """thumbnail של תמונת מאמר (JPEG) - small / medium / large"""
+    if size not in THUMB_SIZES or not is_image_hash(digest):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    etag = f'"{digest}-{size}"'
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    path = get_image_service().path_for(digest, size)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(path, media_type=CONTENT_TYPE, headers=headers)
+
+
+@router.get("/stats")
+def image_stats():
+    """מונים של שירות ה-thumbnails (הורדות, resize, שימוש חוזר, cache)"""
+    return get_image_service().stats()
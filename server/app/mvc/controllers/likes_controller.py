@@ -6,6 +6,7 @@ from app.core.db import get_db
 from app.mvc.models.users.user_entity import User
 from app.core.auth_utils import get_current_active_user
 from app.mvc.models.likes.likes_service import LikesService
+from app.event_sourcing.event_bus import get_event_bus, ARTICLE_STATS_CHANGED
 import traceback
 
 router = APIRouter(tags=["likes"])
@@ -13,6 +14,19 @@ router = APIRouter(tags=["likes"])
 class BatchStatsRequest(BaseModel):
     ids: List[int]
 
+def _publish_stats(article_id: int, stats: dict) -> None:
+    """דחיפת המונים המעודכנים למנויי SSE (בלי שדות שתלויים במשתמש)"""
+    get_event_bus().publish(
+        event_type=ARTICLE_STATS_CHANGED,
+        aggregate_type="Article",
+        aggregate_id=article_id,
+        event_data={
+            "likes_count": stats["likes_count"],
+            "dislikes_count": stats["dislikes_count"],
+            "total_reactions": stats["total_reactions"]
+        }
+    )
+
 @router.post("/articles/{article_id}/like")
 def toggle_like(
     article_id: int,
@@ -22,6 +36,7 @@ def toggle_like(
     try:
         service = LikesService(db)
         stats = service.toggle_like(article_id, current_user.id)
+        _publish_stats(article_id, stats)
         return {"ok": True, "stats": stats}
     except Exception as e:
         print(f"❌ Controller Error in toggle_like for article {article_id}: {e}")
@@ -37,6 +52,7 @@ def toggle_dislike(
     try:
         service = LikesService(db)
         stats = service.toggle_dislike(article_id, current_user.id)
+        _publish_stats(article_id, stats)
         return {"ok": True, "stats": stats}
     except Exception as e:
         print(f"❌ Controller Error in toggle_dislike for article {article_id}: {e}")
@@ -54,7 +54,7 @@ class ArticleAnalysisRequest(BaseModel):
 # === Endpoints ===
 
 @router.post("/llm/sentiment", response_model=SentimentResponse)
-def analyze_sentiment(
+async def analyze_sentiment(
     payload: SentimentRequest,
     current_user: User = Depends(get_current_active_user),
     hf_service: HuggingFaceService = Depends(get_huggingface_service)
@@ -64,7 +64,7 @@ def analyze_sentiment(
     מזהה אם הטקסט חיובי או שלילי
     """
     try:
-        result = hf_service.analyze_sentiment(payload.text)
+        result = await hf_service.analyze_sentiment(payload.text)
         
         if "error" in result:
             raise HTTPException(status_code=500, detail=result["error"])
@@ -80,7 +80,7 @@ def analyze_sentiment(
         raise HTTPException(status_code=500, detail=f"Sentiment analysis failed: {str(e)}")
 
 @router.post("/llm/summarize", response_model=SummarizationResponse)
-def summarize_text(
+async def summarize_text(
     payload: SummarizationRequest,
     current_user: User = Depends(get_current_active_user),
     hf_service: HuggingFaceService = Depends(get_huggingface_service)
@@ -90,7 +90,7 @@ def summarize_text(
     שימושי לסיכום מאמרים ארוכים
     """
     try:
-        result = hf_service.summarize_text(
+        result = await hf_service.summarize_text(
             payload.text,
             max_length=payload.max_length,
             min_length=payload.min_length
@@ -106,7 +106,7 @@ def summarize_text(
         raise HTTPException(status_code=500, detail=f"Summarization failed: {str(e)}")
 
 @router.post("/llm/translate", response_model=TranslationResponse)
-def translate_text(
+async def translate_text(
     payload: TranslationRequest,
     current_user: User = Depends(get_current_active_user),
     hf_service: HuggingFaceService = Depends(get_huggingface_service)
@@ -116,7 +116,7 @@ def translate_text(
     תומך ב: אנגלית <-> עברית
     """
     try:
-        result = hf_service.translate_text(payload.text, payload.direction)
+        result = await hf_service.translate_text(payload.text, payload.direction)
         
         if "error" in result:
             raise HTTPException(status_code=500, detail=result["error"])
@@ -128,7 +128,7 @@ def translate_text(
         raise HTTPException(status_code=500, detail=f"Translation failed: {str(e)}")
 
 @router.post("/llm/classify", response_model=ClassificationResponse)
-def classify_text(
+async def classify_text(
     payload: ClassificationRequest,
     current_user: User = Depends(get_current_active_user),
     hf_service: HuggingFaceService = Depends(get_huggingface_service)
@@ -138,7 +138,7 @@ def classify_text(
     מזהה את הנושא המרכזי של הטקסט
     """
     try:
-        result = hf_service.classify_text(payload.text, payload.categories)
+        result = await hf_service.classify_text(payload.text, payload.categories)
         
         if "error" in result:
             raise HTTPException(status_code=500, detail=result["error"])
@@ -150,7 +150,7 @@ def classify_text(
         raise HTTPException(status_code=500, detail=f"Classification failed: {str(e)}")
 
 @router.post("/llm/analyze-article")
-def analyze_article(
+async def analyze_article(
     payload: ArticleAnalysisRequest,
     current_user: User = Depends(get_current_active_user),
     hf_service: HuggingFaceService = Depends(get_huggingface_service)
@@ -160,7 +160,7 @@ def analyze_article(
     משלב sentiment + classification
     """
     try:
-        result = hf_service.analyze_article(payload.title, payload.summary)
+        result = await hf_service.analyze_article(payload.title, payload.summary)
         return {
             "title": payload.title,
             "analysis": result
@@ -0,0 +1,18 @@
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import get_gateway_metrics
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """מדדי הקריאות היוצאות בפורמט Prometheus"""
+    return get_gateway_metrics().render_prometheus()
+
+@router.get("/upstreams")
+def upstream_metrics(service: Optional[str] = None):
+    """מדדי הקריאות היוצאות לכל שירות: latency (p50/p95/p99), status codes, retries, timeouts, cache"""
+    return {"services": get_gateway_metrics().snapshot(service)}
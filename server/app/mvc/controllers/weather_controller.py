@@ -0,0 +1,45 @@
+from typing import Optional
+
+from fastapi import APIRouter, Query
+
+from app.services.weather_prefetcher import get_weather_prefetcher
+from app.services.weather_service import WeatherService, get_weather_service
+
+router = APIRouter(prefix="/weather", tags=["weather"])
+
+@router.get("/current")
+def get_current_weather(city: Optional[str] = None):
+    """מזג אוויר נוכחי"""
+    try:
+        return get_weather_service().get_current_weather(city)
+    except Exception as e:
+        return {"error": str(e)}
+
+@router.get("/daily")
+def get_daily_forecast(city: Optional[str] = None):
+    """תחזית ל-5 ימים"""
+    try:
+        return {"daily_forecast": get_weather_service().get_daily_forecast(city)}
+    except Exception as e:
+        return {"error": str(e)}
+
+@router.get("/batch")
+def get_weather_batch(
+    cities: str = Query(..., description="Tel Aviv,Haifa,Eilat"),
+    include: str = Query("current,daily", description="current,daily")
+):
+    """כמה ערים בבקשה אחת - {"cities": {עיר: {"current", "daily_forecast"} או {"error"}}}"""
+    try:
+        names = [city.strip() for city in cities.split(",") if city.strip()]
+        kinds = [kind.strip() for kind in include.split(",") if kind.strip() in WeatherService.KINDS]
+        return {"cities": get_weather_service().get_many(names, kinds or WeatherService.KINDS)}
+    except Exception as e:
+        return {"error": str(e)}
+
+@router.get("/stats")
+def get_weather_stats():
+    """cache, הערים הפופולריות ומצב ה-prefetcher"""
+    try:
+        return {"cache": get_weather_service().stats(), "prefetch": get_weather_prefetcher().stats()}
+    except Exception as e:
+        return {"error": str(e)}
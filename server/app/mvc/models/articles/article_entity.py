@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from sqlalchemy.orm import validates
 from datetime import datetime
 from app.mvc.models.base import Base  
+from app.core.urls import url_hash
 
 
 class Article(Base):
@@ -11,6 +13,8 @@ class Article(Base):
     summary = Column(Text)
     content = Column(Text)
     url = Column(String(1000), unique=True, nullable=False)
+    url_hash = Column(String(32))  # hash של ה-URL הקנוני - בדיקות כפילות עוברות דרכו (unique, ראו למטה)
+    duplicate_of = Column(String(32), index=True)  # url_hash של המאמר הקנוני אם זה עותק של אותה ידיעה
     source = Column(String(200))
     category = Column(String(100), index=True)
     image_url = Column(String(1000))
@@ -19,5 +23,19 @@ class Article(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # unique רק על שורות עם hash (שורות ישנות לפני ה-backfill הן NULL) - כל כותב, גם מתהליך אחר
+    # או דרך ה-ORM, לא יכול להכניס URL קנוני קיים; ה-Bloom filter של הייבוא הוא רק קיצור דרך
+    __table_args__ = (
+        Index(
+            "ix_articles_url_hash", "url_hash", unique=True,
+            mssql_where=url_hash.isnot(None), sqlite_where=url_hash.isnot(None), postgresql_where=url_hash.isnot(None)
+        ),
+    )
+    
+    @validates("url")
+    def _set_url_hash(self, key, url):
+        self.url_hash = url_hash(url)
+        return url
+    
     def __repr__(self):
         return f"<Article(id={self.id}, title='{self.title[:30]}...')>"
\ No newline at end of file
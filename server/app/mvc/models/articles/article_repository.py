@@ -18,7 +18,8 @@ class ArticleRepository:
         return self.db.query(Article).filter(Article.id == article_id).first()
 
     def list(self, category: Optional[str], page: int, page_size: int) -> Tuple[List[Article], int]:
-        q = self.db.query(Article)
+        # עותקים של אותה ידיעה (duplicate_of) לא מוצגים - רק המאמר הקנוני
+        q = self.db.query(Article).filter(Article.duplicate_of.is_(None))
         if category:
             q = q.filter(Article.category == category)
 
@@ -35,7 +36,7 @@ class ArticleRepository:
         return rows, total
 
     def search(self, qtext: str, category: Optional[str]) -> List[Article]:
-        q = self.db.query(Article)
+        q = self.db.query(Article).filter(Article.duplicate_of.is_(None))
         if category:
             q = q.filter(Article.category == category)
 
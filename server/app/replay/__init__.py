@@ -0,0 +1,33 @@
+from .cassette import Cassette, CassetteMissError, match_key
+from .profile import ReplayProfile, ReplayProfiles
+from .transports import Replayer, RecordingAdapter, ReplayAdapter, RecordingTransport, ReplayTransport
+from .harness import (
+    get_cassette_mode,
+    get_cassette,
+    get_replayer,
+    install_session_adapters,
+    make_async_transport,
+    cassette_call
+)
+
+__all__ = [
+    "Cassette",
+    "CassetteMissError",
+    "match_key",
+
+    "ReplayProfile",
+    "ReplayProfiles",
+
+    "Replayer",
+    "RecordingAdapter",
+    "ReplayAdapter",
+    "RecordingTransport",
+    "ReplayTransport",
+
+    "get_cassette_mode",
+    "get_cassette",
+    "get_replayer",
+    "install_session_adapters",
+    "make_async_transport",
+    "cassette_call"
+]
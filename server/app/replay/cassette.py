@@ -0,0 +1,195 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+# פרמטרים שלא נשמרים בקסטה ולא משתתפים בהתאמה - מפתחות API
+SECRET_PARAMS = {"apikey", "api_key", "appid", "key", "token", "access_token"}
+
+# host -> שם השירות (כמו service_name ב-Gateway); host אחר נשמר בשמו
+SERVICE_HOSTS = {
+    "eventregistry.org": "newsapi",
+    "api.openweathermap.org": "openweathermap",
+    "api-inference.huggingface.co": "huggingface",
+    "content.guardianapis.com": "guardian",
+    "generativelanguage.googleapis.com": "gemini"
+}
+
+
+class CassetteMissError(Exception):
+    """אין בקסטה תשובה מוקלטת לבקשה - ב-replay לא יוצאים לרשת"""
+
+    def __init__(self, service_name: str, method: str, url: str):
+        self.service_name = service_name
+        super().__init__(f"No recorded interaction for {service_name}: {method} {url}")
+
+
+def service_for_url(url: str) -> str:
+    host = urlsplit(url).hostname or ""
+    return SERVICE_HOSTS.get(host, host)
+
+
+def _strip_secrets(url: str, params: Optional[Any] = None) -> Dict[str, Any]:
+    """URL בלי query + params ממוזגים (גם מה-query של ה-URL), בלי מפתחות API"""
+    parts = urlsplit(url)
+    merged: Dict[str, Any] = {}
+    for name, value in parse_qsl(parts.query, keep_blank_values=True):
+        merged.setdefault(name, []).append(value)
+    for name, value in (params or {}).items():
+        merged.setdefault(name, []).extend(value if isinstance(value, (list, tuple)) else [value])
+    clean = {
+        name: values[0] if len(values) == 1 else values
+        for name, values in merged.items()
+        if name.lower() not in SECRET_PARAMS
+    }
+    return {"url": urlunsplit((parts.scheme, parts.netloc, parts.path, "", "")), "params": clean}
+
+
+def match_key(method: str, url: str, params: Optional[Any] = None, body: Any = None) -> str:
+    """
+    key של בקשה - method + URL + params + body בצורה קנונית, בלי מפתחות API
+    (כמו ה-cache key של ה-Gateway), כך שהקלטה ממפתח אחד מתאימה להרצה עם מפתח אחר
+    """
+    request = _strip_secrets(url, params)
+    canonical = json.dumps(
+        {"method": method.upper(), **request, "body": body},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def decode_body(content: bytes) -> Any:
+    """body של בקשה/תשובה: JSON אם אפשר, אחרת טקסט"""
+    if not content:
+        return None
+    try:
+        return json.loads(content)
+    except (ValueError, UnicodeDecodeError):
+        return content.decode("utf-8", errors="replace")
+
+
+class Cassette:
+    """
+    הקלטות של קריאות יוצאות - קובץ JSONL לכל שירות בתיקייה
+    שורה לכל אינטראקציה: request (בלי מפתחות API וכותרות), status, body של התשובה ו-latency
+
+    ב-replay כל התיקייה נטענת לזיכרון; כמה הקלטות לאותה בקשה מוחזרות לפי הסדר (מחזורי),
+    כך ש-polling מקבל את אותה סדרת תשובות בכל הרצה
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._interactions: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._loaded = False
+        self.recorded = 0
+        self.played = 0
+        self.misses = 0
+
+    # ============================================
+    # Record
+    # ============================================
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Any],
+        body: Any,
+        status: int,
+        response_body: Any,
+        latency: float,
+        content_type: str = "application/json",
+        service_name: Optional[str] = None
+    ) -> None:
+        service_name = service_name or service_for_url(url)
+        interaction = {
+            "service": service_name,
+            "key": match_key(method, url, params, body),
+            "request": {"method": method.upper(), **_strip_secrets(url, params), "body": body},
+            "response": {"status": status, "content_type": content_type, "body": response_body},
+            "latency_ms": round(latency * 1000, 1),
+            "recorded_at": time.time()
+        }
+        line = json.dumps(interaction, ensure_ascii=False, default=str) + "\n"
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            # append של שורה אחת - בטוח גם כשכמה workers מקליטים לאותו קובץ
+            with open(self._path(service_name), "a", encoding="utf-8") as f:
+                f.write(line)
+            self._interactions.setdefault(interaction["key"], []).append(interaction)
+            self.recorded += 1
+
+    def _path(self, service_name: str) -> str:
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in service_name)
+        return os.path.join(self.directory, f"{safe}.jsonl")
+
+    # ============================================
+    # Replay
+    # ============================================
+
+    def load(self) -> int:
+        """טעינת כל קבצי ה-JSONL בתיקייה. מחזיר כמה אינטראקציות נטענו"""
+        interactions: Dict[str, List[Dict[str, Any]]] = {}
+        count = 0
+        if os.path.isdir(self.directory):
+            for name in sorted(os.listdir(self.directory)):
+                if not name.endswith(".jsonl"):
+                    continue
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        interaction = json.loads(line)
+                        interactions.setdefault(interaction["key"], []).append(interaction)
+                        count += 1
+        with self._lock:
+            self._interactions = interactions
+            self._cursors = {}
+            self._loaded = True
+        logger.info(f"Loaded {count} recorded interactions from {self.directory}")
+        return count
+
+    def play(self, method: str, url: str, params: Optional[Any] = None, body: Any = None) -> Dict[str, Any]:
+        """האינטראקציה הבאה שמתאימה לבקשה (זורק CassetteMissError אם אין)"""
+        if not self._loaded:
+            self.load()
+        key = match_key(method, url, params, body)
+        with self._lock:
+            recorded = self._interactions.get(key)
+            if not recorded:
+                self.misses += 1
+                raise CassetteMissError(service_for_url(url), method, url)
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            self.played += 1
+            return recorded[cursor % len(recorded)]
+
+    def interactions(self) -> List[Dict[str, Any]]:
+        """כל האינטראקציות שנטענו / הוקלטו, לפי סדר"""
+        with self._lock:
+            return [interaction for recorded in self._interactions.values() for interaction in recorded]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            services: Dict[str, int] = {}
+            for recorded in self._interactions.values():
+                for interaction in recorded:
+                    services[interaction["service"]] = services.get(interaction["service"], 0) + 1
+            return {
+                "directory": self.directory,
+                "interactions": services,
+                "recorded": self.recorded,
+                "played": self.played,
+                "misses": self.misses
+            }
@@ -0,0 +1,102 @@
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+import requests
+
+from app.core.config import get_settings
+from app.replay.cassette import Cassette, decode_body
+from app.replay.profile import ReplayProfiles
+from app.replay.transports import RecordingAdapter, RecordingTransport, ReplayAdapter, ReplayTransport, Replayer
+
+logger = logging.getLogger(__name__)
+
+OFF = "off"
+RECORD = "record"
+REPLAY = "replay"
+
+_cassette: Optional[Cassette] = None
+_replayer: Optional[Replayer] = None
+_cassette_lock = threading.Lock()
+_replayer_lock = threading.Lock()
+
+
+def get_cassette_mode() -> str:
+    """off / record / replay (API_CASSETTE_MODE)"""
+    mode = get_settings().API_CASSETTE_MODE.lower()
+    if mode not in (OFF, RECORD, REPLAY):
+        raise ValueError(f"Unknown API_CASSETTE_MODE '{mode}' (expected off | record | replay)")
+    return mode
+
+
+def get_cassette() -> Cassette:
+    global _cassette
+    if _cassette is None:
+        with _cassette_lock:
+            if _cassette is None:
+                _cassette = Cassette(get_settings().API_CASSETTE_DIR)
+    return _cassette
+
+
+def get_replayer() -> Replayer:
+    global _replayer
+    if _replayer is None:
+        with _replayer_lock:
+            if _replayer is None:
+                settings = get_settings()
+                profiles = (
+                    ReplayProfiles.from_file(settings.API_REPLAY_PROFILE_PATH)
+                    if settings.API_REPLAY_PROFILE_PATH else ReplayProfiles()
+                )
+                _replayer = Replayer(get_cassette(), profiles, seed=settings.API_REPLAY_SEED)
+    return _replayer
+
+
+def install_session_adapters(session: requests.Session) -> None:
+    """מחבר ל-session של requests את ה-adapter של record / replay לפי המצב"""
+    mode = get_cassette_mode()
+    if mode == OFF:
+        return
+    adapter = RecordingAdapter(get_cassette()) if mode == RECORD else ReplayAdapter(get_replayer())
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    logger.info(f"API cassette mode '{mode}' enabled for requests session")
+
+
+def make_async_transport(http2: bool, limits: httpx.Limits) -> Optional[httpx.AsyncBaseTransport]:
+    """transport ל-httpx.AsyncClient לפי המצב (None - ה-transport הרגיל)"""
+    mode = get_cassette_mode()
+    if mode == OFF:
+        return None
+    if mode == REPLAY:
+        return ReplayTransport(get_replayer())
+    return RecordingTransport(httpx.AsyncHTTPTransport(http2=http2, limits=limits), get_cassette())
+
+
+def cassette_call(service_name: str, operation: str, request: Dict[str, Any], fn: Callable[[], Any]) -> Any:
+    """
+    record / replay לקריאות דרך SDK (למשל Gemini) שלא עוברות ב-requests/httpx
+    fn מחזירה ערך שניתן לסריאליזציה ל-JSON; ב-replay היא לא נקראת
+    """
+    mode = get_cassette_mode()
+    url = f"sdk://{service_name}/{operation}"
+    if mode == REPLAY:
+        body = json.dumps(request, ensure_ascii=False).encode("utf-8")
+        outcome, delay, status, _, content = get_replayer().respond("CALL", url, body)
+        time.sleep(delay)
+        if outcome == "timeout":
+            raise TimeoutError(f"Replay timeout for {service_name}")
+        if status >= 400:
+            raise Exception(f"Replayed error for {service_name}: {status}")
+        return decode_body(content)
+
+    started = time.monotonic()
+    result = fn()
+    if mode == RECORD:
+        get_cassette().record(
+            "CALL", url, None, request, 200, result, time.monotonic() - started, service_name=service_name
+        )
+    return result
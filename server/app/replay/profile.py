@@ -0,0 +1,94 @@
+import json
+import math
+import random
+from typing import Any, Dict, Optional
+
+LATENCY_DISTRIBUTIONS = ("recorded", "fixed", "uniform", "normal", "lognormal")
+
+
+class ReplayProfile:
+    """
+    התנהגות שירות אחד ב-replay: התפלגות latency ושיעור שגיאות
+
+        latency     - recorded: ה-latency שהוקלט (כפול scale)
+                      fixed: latency_ms
+                      uniform: בין min_ms ל-max_ms
+                      normal: latency_ms ± stddev_ms
+                      lognormal: חציון latency_ms, פיזור sigma (זנב ארוך, כמו APIs אמיתיים)
+        error_rate   - חלק מהקריאות שמחזירות error_status (ברירת מחדל 503)
+        timeout_rate - חלק מהקריאות שנכשלות ב-timeout
+    """
+
+    def __init__(
+        self,
+        latency: str = "recorded",
+        scale: float = 1.0,
+        latency_ms: float = 100.0,
+        stddev_ms: float = 20.0,
+        min_ms: float = 50.0,
+        max_ms: float = 150.0,
+        sigma: float = 0.5,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        timeout_rate: float = 0.0
+    ):
+        if latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{latency}' (expected one of {LATENCY_DISTRIBUTIONS})")
+        self.latency = latency
+        self.scale = scale
+        self.latency_ms = latency_ms
+        self.stddev_ms = stddev_ms
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.timeout_rate = timeout_rate
+
+    def delay(self, rng: random.Random, recorded_ms: float) -> float:
+        """ה-latency לקריאה הבאה, בשניות"""
+        if self.latency == "recorded":
+            ms = recorded_ms * self.scale
+        elif self.latency == "fixed":
+            ms = self.latency_ms
+        elif self.latency == "uniform":
+            ms = rng.uniform(self.min_ms, self.max_ms)
+        elif self.latency == "normal":
+            ms = rng.gauss(self.latency_ms, self.stddev_ms)
+        else:
+            ms = rng.lognormvariate(math.log(max(self.latency_ms, 1e-3)), self.sigma)
+        return max(ms, 0.0) / 1000
+
+    def outcome(self, rng: random.Random) -> str:
+        """ok / error / timeout"""
+        roll = rng.random()
+        if roll < self.timeout_rate:
+            return "timeout"
+        if roll < self.timeout_rate + self.error_rate:
+            return "error"
+        return "ok"
+
+
+class ReplayProfiles:
+    """
+    פרופיל לכל שירות + ברירת מחדל. נטען מ-JSON בצורה:
+        {"default": {"latency": "recorded"}, "huggingface": {"latency": "lognormal", "latency_ms": 800, "error_rate": 0.02}}
+    """
+
+    def __init__(self, profiles: Optional[Dict[str, ReplayProfile]] = None, default: Optional[ReplayProfile] = None):
+        self.profiles = profiles or {}
+        self.default = default or ReplayProfile()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Dict[str, Any]]) -> "ReplayProfiles":
+        data = dict(data)
+        default = ReplayProfile(**data.pop("default", {}))
+        return cls({name: ReplayProfile(**options) for name, options in data.items()}, default)
+
+    @classmethod
+    def from_file(cls, path: str) -> "ReplayProfiles":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def get(self, service_name: str) -> ReplayProfile:
+        return self.profiles.get(service_name, self.default)
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+import httpx
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from app.replay.cassette import Cassette, decode_body, service_for_url
+from app.replay.profile import ReplayProfiles
+
+
+class Replayer:
+    """
+    הלוגיקה המשותפת ל-replay הסינכרוני והאסינכרוני: התשובה המוקלטת,
+    ה-latency לפי הפרופיל של השירות, והאם להזריק שגיאה / timeout
+    RNG עם seed - אותה הרצה נותנת אותה סדרת latency ושגיאות
+    """
+
+    def __init__(self, cassette: Cassette, profiles: ReplayProfiles, seed: int = 0):
+        self.cassette = cassette
+        self.profiles = profiles
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.injected: Dict[str, Dict[str, int]] = {}
+
+    def respond(self, method: str, url: str, body: bytes) -> Tuple[str, float, int, str, bytes]:
+        """(outcome, delay, status, content_type, content) - outcome הוא ok / error / timeout"""
+        interaction = self.cassette.play(method, url, body=decode_body(body))
+        service_name = interaction["service"]
+        profile = self.profiles.get(service_name)
+        with self._lock:
+            delay = profile.delay(self._rng, interaction.get("latency_ms", 0.0))
+            outcome = profile.outcome(self._rng)
+            if outcome != "ok":
+                stats = self.injected.setdefault(service_name, {"error": 0, "timeout": 0})
+                stats[outcome] += 1
+
+        if outcome == "error":
+            content = json.dumps({"error": "Injected by replay profile"}).encode("utf-8")
+            return outcome, delay, profile.error_status, "application/json", content
+
+        response = interaction["response"]
+        content_type = response.get("content_type") or "application/json"
+        payload = response.get("body")
+        if payload is None:
+            content = b""
+        elif isinstance(payload, str) and "json" not in content_type:
+            content = payload.encode("utf-8")
+        else:
+            content = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        return outcome, delay, response["status"], content_type, content
+
+
+def _timeout_seconds(timeout: Any) -> float:
+    """timeout של requests יכול להיות מספר או (connect, read)"""
+    if isinstance(timeout, tuple):
+        timeout = timeout[-1]
+    return float(timeout) if timeout else float("inf")
+
+
+# ============================================
+# requests (APIGateway)
+# ============================================
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter רגיל שכותב כל בקשה ותשובה לקסטה"""
+
+    def __init__(self, cassette: Cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        started = time.monotonic()
+        response = super().send(request, **kwargs)
+        self.cassette.record(
+            request.method,
+            request.url,
+            None,
+            decode_body(request.body.encode("utf-8") if isinstance(request.body, str) else request.body),
+            response.status_code,
+            decode_body(response.content),
+            time.monotonic() - started,
+            response.headers.get("Content-Type", "application/json")
+        )
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """מחזיר תשובות מהקסטה בלי לצאת לרשת"""
+
+    def __init__(self, replayer: Replayer):
+        super().__init__()
+        self.replayer = replayer
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+        outcome, delay, status, content_type, content = self.replayer.respond(request.method, request.url, body or b"")
+        limit = _timeout_seconds(timeout)
+        if outcome == "timeout" or delay > limit:
+            time.sleep(min(delay, limit) if limit != float("inf") else delay)
+            raise requests.exceptions.ReadTimeout(f"Replay timeout for {service_for_url(request.url)}", request=request)
+        time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = status
+        response.reason = "Replayed"
+        response.headers["Content-Type"] = content_type
+        response._content = content
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+# ============================================
+# httpx (AsyncAPIGateway)
+# ============================================
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """עוטף את ה-transport האמיתי וכותב כל בקשה ותשובה לקסטה"""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        response = await self.inner.handle_async_request(request)
+        content = await response.aread()
+        self.cassette.record(
+            request.method,
+            str(request.url),
+            None,
+            decode_body(request.content),
+            response.status_code,
+            decode_body(content),
+            time.monotonic() - started,
+            response.headers.get("content-type", "application/json")
+        )
+        return response
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """מחזיר תשובות מהקסטה בלי לצאת לרשת; ה-latency דרך asyncio.sleep"""
+
+    def __init__(self, replayer: Replayer):
+        self.replayer = replayer
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        outcome, delay, status, content_type, content = self.replayer.respond(request.method, url, request.content)
+        limit = (request.extensions.get("timeout") or {}).get("read") or float("inf")
+        if outcome == "timeout" or delay > limit:
+            await asyncio.sleep(min(delay, limit) if limit != float("inf") else delay)
+            raise httpx.ReadTimeout(f"Replay timeout for {service_for_url(url)}", request=request)
+        await asyncio.sleep(delay)
+        return httpx.Response(status, headers={"content-type": content_type}, content=content, request=request)
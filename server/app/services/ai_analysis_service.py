@@ -1,3 +1,4 @@
+import asyncio
 from typing import Dict, Any, List
 from app.services.uggingface_service import get_huggingface_service
 import json
@@ -8,7 +9,7 @@ class AIAnalysisService:
     def __init__(self):
         self.hf_service = get_huggingface_service()
     
-    def analyze_article_full(self, title: str, summary: str, body: str = "") -> Dict[str, Any]:
+    async def analyze_article_full(self, title: str, summary: str, body: str = "") -> Dict[str, Any]:
         """
         ניתוח מלא של מאמר:
         1. Sentiment Analysis
@@ -20,17 +21,18 @@ class AIAnalysisService:
         if body:
             full_text += f" {body[:500]}"  
         
-        # 1. Sentiment Analysis
-        sentiment = self.hf_service.analyze_sentiment(full_text)
-        
-        # 2. NER - זיהוי ישויות
-        entities = self.extract_entities(full_text)
-        
-        # 3. Key Topics/Classification
-        classification = self.hf_service.classify_text(full_text, [
-            "Politics", "Economy", "Technology", "Sports",
-            "Health", "Entertainment", "Science", "World"
-        ])
+        # שלושת הניתוחים יוצאים במקביל
+        sentiment, entities, classification = await asyncio.gather(
+            # 1. Sentiment Analysis
+            self.hf_service.analyze_sentiment(full_text),
+            # 2. NER - זיהוי ישויות
+            self.extract_entities(full_text),
+            # 3. Key Topics/Classification
+            self.hf_service.classify_text(full_text, [
+                "Politics", "Economy", "Technology", "Sports",
+                "Health", "Entertainment", "Science", "World"
+            ])
+        )
         
         return {
             "sentiment": {
@@ -42,24 +44,25 @@ class AIAnalysisService:
             "category_confidence": classification.get("confidence", 0.0)
         }
     
-    def extract_entities(self, text: str) -> List[Dict[str, Any]]:
+    async def extract_entities(self, text: str) -> List[Dict[str, Any]]:
         """
         זיהוי ישויות (NER) - שמות, ארגונים, מקומות וכו'
         
         משתמש במודל Hugging Face NER
         """
         try:
-            from app.core.gateway import get_gateway
-            gateway = get_gateway()
+            from app.core.async_gateway import get_async_gateway
+            gateway = get_async_gateway()
             
             # Hugging Face NER model
-            result = gateway.post(
+            result = await gateway.post(
                 url="https://api-inference.huggingface.co/models/dslim/bert-base-NER",
                 service_name="huggingface_ner",
                 json={"inputs": text},
                 headers={"Content-Type": "application/json"},
                 timeout=30,
-                cache_ttl=3600
+                cache_ttl=3600,
+                idempotent=True
             )
             
             if isinstance(result, list):
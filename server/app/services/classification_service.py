@@ -1,14 +1,22 @@
 
-from typing import Dict, List, Any
-import requests
+from typing import Dict, List, Any, Optional
 import os
 from dotenv import load_dotenv
 
+from app.core.config import get_settings
+from app.core.gateway import get_gateway
+from app.services.local_classifier import article_text, get_local_classifier
+
 load_dotenv()
 
 
 class ClassificationService:
-    """שירות סיווג מאמרים באמצעות Hugging Face"""
+    """
+    שירות סיווג מאמרים - CLASSIFIER_BACKEND:
+    remote - zero-shot ב-Hugging Face (facebook/bart-large-mnli)
+    local  - LocalClassifier שאומן על המאמרים שכבר מסווגים ב-DB (מיקרו-שניות, בלי רשת)
+    hybrid - מקומי; רק confidence מתחת ל-CLASSIFIER_LOCAL_MIN_CONFIDENCE (או אין מודל) עובר ל-remote
+    """
     
     # הקטגוריות האפשריות
     CATEGORIES = [
@@ -27,11 +35,46 @@ class ClassificationService:
     def __init__(self):
         self.api_key = os.getenv("HUGGINGFACE_API_KEY")
         self.api_url = "https://api-inference.huggingface.co/models/facebook/bart-large-mnli"
+        settings = get_settings()
+        self.backend = settings.CLASSIFIER_BACKEND
+        self.min_confidence = settings.CLASSIFIER_LOCAL_MIN_CONFIDENCE
         
         if not self.api_key:
             print("⚠️  Warning: HUGGINGFACE_API_KEY not set!")
     
     def classify_article(self, title: str, content: str = "", summary: str = "") -> Dict[str, Any]:
+        local = None
+        if self.backend in ("local", "hybrid"):
+            local = self._classify_local(title, content, summary)
+            if local and (self.backend == "local" or local["confidence"] >= self.min_confidence):
+                return local
+            if self.backend == "local":
+                return {"category": "General", "confidence": 0.0, "error": "Local classifier is not trained", "backend": "local"}
+        
+        result = self._classify_remote(title, content, summary)
+        if "error" in result and local:
+            # המודל המרוחק לא זמין - עדיף הניחוש המקומי מ-General
+            return {**local, "escalation_error": result["error"]}
+        return result
+    
+    def _classify_local(self, title: str, content: str, summary: str) -> Optional[Dict[str, Any]]:
+        """סיווג במודל המקומי, או None אם עוד לא אומן"""
+        model = get_local_classifier()
+        if model is None:
+            return None
+        ranked = model.predict_proba(article_text(title, summary, content))
+        return {
+            "category": ranked[0][0],
+            "confidence": ranked[0][1],
+            "all_scores": dict(ranked),
+            "suggestions": [
+                {"category": label, "confidence": score}
+                for label, score in ranked[:3]
+            ],
+            "backend": "local"
+        }
+    
+    def _classify_remote(self, title: str, content: str = "", summary: str = "") -> Dict[str, Any]:
         try:
             text = f"{title}. "
             if summary:
@@ -72,7 +115,8 @@ class ClassificationService:
                 "suggestions": [
                     {"category": label, "confidence": score}
                     for label, score in list(zip(result["labels"], result["scores"]))[:3]
-                ]
+                ],
+                "backend": "remote"
             }
             
         except Exception as e:
@@ -100,22 +144,17 @@ class ClassificationService:
         }
         
         try:
-            response = requests.post(
+            # דרך ה-Gateway: cache, retries, breaker, מדדים ו-record/replay
+            return get_gateway().post(
                 self.api_url,
+                "huggingface_classification",
                 headers=headers,
                 json=payload,
-                timeout=30
+                timeout=30,
+                max_retries=2,
+                cache_ttl=3600,
+                idempotent=True  # אותו טקסט ואותן קטגוריות -> אותו סיווג
             )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {
-                    "error": f"API returned {response.status_code}: {response.text}"
-                }
-                
-        except requests.exceptions.Timeout:
-            return {"error": "Request timeout - model might be loading"}
         except Exception as e:
             return {"error": str(e)}
     
@@ -0,0 +1,268 @@
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import get_settings
+from app.core.disk_cache import DiskCache
+from app.core.metrics import get_gateway_metrics
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "images"
+CACHE_NAMESPACE = "image_url"
+
+# גודל -> רוחב מקסימלי (הגובה עד פי 2 מהרוחב); הקטנה בלבד, לעולם לא הגדלה
+THUMB_SIZES = {"small": 160, "medium": 480, "large": 960}
+CONTENT_TYPE = "image/jpeg"
+
+_HASH_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+URL_TTL = 30 * 24 * 3600  # URL -> hash; התמונה עצמה לפי התוכן ולא פגה לעולם
+FAILURE_TTL = 3600  # URL שנכשל לא ננסה שוב עד אז
+
+
+def image_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def is_image_hash(value: str) -> bool:
+    return bool(_HASH_PATTERN.match(value))
+
+
+def render_thumbnails(data: bytes, quality: int = 80) -> Dict[str, bytes]:
+    """התמונה המקורית -> JPEG מוקטן לכל גודל ב-THUMB_SIZES; רץ בתהליך נפרד (CPU)"""
+    from PIL import Image, ImageOps
+
+    results = {}
+    with Image.open(io.BytesIO(data)) as original:
+        # JPEG: פענוח ישר בקנה מידה מוקטן (1/2, 1/4, 1/8) - הרבה יותר מהיר מפענוח מלא והקטנה
+        original.draft("RGB", (max(THUMB_SIZES.values()), max(THUMB_SIZES.values()) * 2))
+        image = ImageOps.exif_transpose(original)
+        if image.mode != "RGB":
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            rgba = image.convert("RGBA")
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            image = background
+        # מהגדול לקטן - כל גודל מוקטן מהקודם ולא מהמקור
+        for size, width in sorted(THUMB_SIZES.items(), key=lambda item: -item[1]):
+            image.thumbnail((width, width * 2), Image.LANCZOS)
+            buffer = io.BytesIO()
+            image.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+            results[size] = buffer.getvalue()
+    return results
+
+
+class ImageService:
+    """
+    thumbnails בצד השרת - הלקוח מוריד JPEG קטן במקום התמונה המקורית של האתר
+
+    - כל תמונה מורדת פעם אחת (httpx.AsyncClient, עד IMAGE_CONCURRENCY במקביל, timeout ומגבלת גודל)
+    - resize + recompress לכל הגדלים ב-THUMB_SIZES ב-ProcessPoolExecutor
+    - נשמר בדיסק לפי hash של התוכן (IMAGE_CACHE_DIR/ab/<hash>/<size>.jpg) - אותה תמונה מכמה URLs נשמרת פעם אחת,
+      והקובץ לעולם לא משתנה, כך ש-/images/{hash}/{size} מוגש עם cache "immutable"
+    - URL -> hash ב-DiskCache: URL שכבר עובד לא יורד שוב; URL שנכשל לא ננסה שוב שעה
+
+    ה-client וה-semaphore קשורים ל-event loop - נפרדים לכל loop; thumb_urls_sync (asyncio.run) סוגר את שלו בסוף
+    """
+
+    def __init__(self, cache: Optional[DiskCache] = None, directory: Optional[str] = None):
+        settings = get_settings()
+        self.directory = directory or settings.IMAGE_CACHE_DIR
+        self.base_url = settings.IMAGE_PUBLIC_BASE_URL.rstrip("/") + settings.API_PREFIX
+        self.thumb_size = settings.IMAGE_THUMB_SIZE
+        self.quality = settings.IMAGE_QUALITY
+        self.concurrency = settings.IMAGE_CONCURRENCY
+        self.timeout = settings.IMAGE_TIMEOUT_SECONDS
+        self.max_bytes = settings.IMAGE_MAX_BYTES
+        self.workers = settings.IMAGE_WORKERS or os.cpu_count() or 1
+        self.cache = cache if cache is not None else DiskCache(os.path.join(self.directory, "urls.db"))
+        self.metrics = get_gateway_metrics()
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        # client + semaphore לכל event loop: thumb_urls_sync יכול לרוץ מכמה threads במקביל, כל אחד עם loop משלו
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+        self.counters = {"downloaded": 0, "rendered": 0, "reused": 0, "cache_hits": 0, "too_large": 0, "errors": 0}
+
+    # ============================================
+    # Client & pool
+    # ============================================
+
+    def _get_client(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None or state[0].is_closed:
+            client = httpx.AsyncClient(
+                headers={"User-Agent": get_settings().SCRAPER_USER_AGENT},
+                follow_redirects=True,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.concurrency)
+            )
+            state = self._loops[loop] = (client, asyncio.Semaphore(self.concurrency))
+        return state
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def aclose(self):
+        """סגירת ה-client של ה-loop הנוכחי (clients של loops אחרים ממשיכים לעבוד)"""
+        state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state is not None and not state[0].is_closed:
+            await state[0].aclose()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # ============================================
+    # Storage
+    # ============================================
+
+    def path_for(self, digest: str, size: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest, f"{size}.jpg")
+
+    def exists(self, digest: str) -> bool:
+        return all(os.path.exists(self.path_for(digest, size)) for size in THUMB_SIZES)
+
+    def url_for(self, digest: str, size: Optional[str] = None) -> str:
+        return f"{self.base_url}/images/{digest}/{size or self.thumb_size}"
+
+    def _store(self, digest: str, thumbnails: Dict[str, bytes]) -> None:
+        os.makedirs(os.path.dirname(self.path_for(digest, "small")), exist_ok=True)
+        for size, data in thumbnails.items():
+            path = self.path_for(digest, size)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)  # קורא במקביל רואה קובץ שלם או כלום
+
+    # ============================================
+    # Thumbnails
+    # ============================================
+
+    async def thumbnail(self, url: str) -> Optional[str]:
+        """ה-hash של התמונה אחרי שה-thumbnails שלה בדיסק, או None אם נכשל (לא נזרקות שגיאות)"""
+        # DiskCache (SQLite) ובדיקות הקבצים - ב-thread, כדי לא לעצור את ה-event loop
+        entry = await asyncio.to_thread(self.cache.get_entry, url, namespace=CACHE_NAMESPACE)
+        if entry and entry[1] > time.time():
+            digest = entry[0]["hash"]
+            if digest is None or await asyncio.to_thread(self.exists, digest):
+                self.counters["cache_hits"] += 1
+                return digest
+
+        data = await self._download(url)
+        if data is None:
+            await self._remember(url, None, FAILURE_TTL)
+            return None
+
+        digest = image_hash(data)
+        if await asyncio.to_thread(self.exists, digest):
+            self.counters["reused"] += 1
+        else:
+            try:
+                thumbnails = await asyncio.get_running_loop().run_in_executor(
+                    self._get_pool(), render_thumbnails, data, self.quality
+                )
+                await asyncio.to_thread(self._store, digest, thumbnails)
+            except Exception as e:
+                # לא תמונה / פורמט לא נתמך / דיסק
+                self.counters["errors"] += 1
+                logger.warning(f"Thumbnailing {url} failed: {e}")
+                await self._remember(url, None, FAILURE_TTL)
+                return None
+            self.counters["rendered"] += 1
+        await self._remember(url, digest, URL_TTL)
+        return digest
+
+    async def _remember(self, url: str, digest: Optional[str], ttl: float) -> None:
+        await asyncio.to_thread(self.cache.set, url, {"hash": digest}, ttl=ttl, namespace=CACHE_NAMESPACE)
+
+    async def _download(self, url: str) -> Optional[bytes]:
+        client, semaphore = self._get_client()
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                async with client.stream("GET", url) as response:
+                    self.metrics.record_response(SERVICE_NAME, response.status_code, time.perf_counter() - started)
+                    if response.status_code != 200 or not response.headers.get("content-type", "").startswith("image/"):
+                        self.counters["errors"] += 1
+                        return None
+                    if int(response.headers.get("content-length") or 0) > self.max_bytes:
+                        self.counters["too_large"] += 1
+                        return None
+                    body = bytearray()
+                    async for chunk in response.aiter_bytes():
+                        body.extend(chunk)
+                        if len(body) > self.max_bytes:
+                            self.counters["too_large"] += 1
+                            return None
+            except httpx.TimeoutException:
+                self.counters["errors"] += 1
+                self.metrics.record_timeout(SERVICE_NAME)
+                return None
+            except httpx.HTTPError as e:
+                self.counters["errors"] += 1
+                self.metrics.record_error(SERVICE_NAME)
+                logger.warning(f"Downloading image {url} failed: {e}")
+                return None
+        self.counters["downloaded"] += 1
+        return bytes(body)
+
+    async def thumb_urls(self, urls: Iterable[Optional[str]]) -> Dict[str, Optional[str]]:
+        """image_url -> thumb_url (None אם אין thumbnail) לכל ה-URLs, במקביל"""
+        urls = list(dict.fromkeys(url for url in urls if url))
+        digests = await asyncio.gather(*(self.thumbnail(url) for url in urls))
+        return {url: self.url_for(digest) if digest else None for url, digest in zip(urls, digests)}
+
+    async def apply_thumbnails(self, rows: List[dict]) -> List[dict]:
+        """ממלא thumb_url בשורות של מאמרים לפי image_url; בלי thumbnail - thumb_url נשאר כמו שהוא"""
+        thumbs = await self.thumb_urls(row.get("image_url") for row in rows)
+        for row in rows:
+            thumb = thumbs.get(row.get("image_url"))
+            if thumb:
+                row["thumb_url"] = thumb
+        return rows
+
+    def thumb_urls_sync(self, urls: Iterable[Optional[str]]) -> Dict[str, Optional[str]]:
+        """asyncio.run - ה-client של ה-loop הזה נסגר לפני שה-loop נגמר (אחרת כל קריאה משאירה pool פתוח)"""
+        async def run_and_close():
+            try:
+                return await self.thumb_urls(urls)
+            finally:
+                await self.aclose()
+
+        return asyncio.run(run_and_close())
+
+    def stats(self) -> Dict[str, object]:
+        return {**self.counters, "cache": self.cache.stats()}
+
+
+# Singleton
+_image_service: Optional[ImageService] = None
+_image_service_lock = threading.Lock()
+
+def get_image_service() -> ImageService:
+    global _image_service
+    if _image_service is None:
+        with _image_service_lock:
+            if _image_service is None:
+                _image_service = ImageService()
+    return _image_service
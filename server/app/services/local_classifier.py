@@ -0,0 +1,328 @@
+import gzip
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from operator import mul
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_WORDS = re.compile(r"\w+", re.UNICODE)
+
+MODEL_VERSION = 1
+
+
+def article_text(title: str, summary: str = "", content: str = "", max_content: int = 400) -> str:
+    """הטקסט שממנו נבנים ה-features: כותרת + תקציר + תחילת התוכן"""
+    return f"{title or ''} {summary or ''} {(content or '')[:max_content]}"
+
+
+def tokens(text: str) -> List[str]:
+    """מילים (אותיות קטנות), בלי מילים של תו אחד ובלי מספרים"""
+    return [w for w in _WORDS.findall(text.casefold()) if len(w) > 1 and not w.isdigit()]
+
+
+class LocalClassifier:
+    """
+    סיווג קטגוריות מקומי על CPU - בלי רשת ובלי ספריות ML
+
+    - features: hashing trick על מילים ו-bigrams (crc32 -> n_features תאים, יציב בין תהליכים),
+      tf סובלינארי * idf, ונרמול L2
+    - מודל: רגרסיה לוגיסטית multinomial (softmax), SGD עם L2; אחרי calibrate (temperature)
+      ההסתברויות שימושיות כ-confidence - ClassificationService מעביר למודל המרוחק רק מה שמתחת ל-threshold
+    - המשקלים נשמרים רק לתאים שהופיעו באימון (dict דליל) - סיווג הוא כמה מאות פעולות
+    - נשמר כ-JSON (gzip); מאמנים מחדש מה-DB עם scripts/train_classifier.py
+    """
+
+    def __init__(self, n_features: int = 2 ** 20, bigrams: bool = True):
+        if n_features & (n_features - 1):
+            raise ValueError("n_features must be a power of two")
+        self.n_features = n_features
+        self.bigrams = bigrams
+        self.classes: List[str] = []
+        self.idf: Dict[int, float] = {}
+        self.weights: Dict[int, List[float]] = {}
+        self.bias: List[float] = []
+        self.temperature = 1.0
+        self.trained_at: Optional[float] = None
+        self.metrics: Dict[str, Any] = {}
+
+    # ============================================
+    # Features
+    # ============================================
+
+    def _hashed(self, text: str) -> Counter:
+        """{תא: מספר מופעים}; bigram = צירוף ה-hashes של שתי המילים (בלי לבנות את המחרוזת)"""
+        mask = self.n_features - 1
+        hashes = [zlib.crc32(word.encode("utf-8")) for word in tokens(text)]
+        grams = [h & mask for h in hashes]
+        if self.bigrams:
+            grams += [((first * 0x9E3779B1) ^ second) & mask for first, second in zip(hashes, hashes[1:])]
+        return Counter(grams)
+
+    def _vector(self, counts: Counter) -> Tuple[List[int], List[float]]:
+        """(תאים, ערכים): tf סובלינארי * idf, מנורמל L2; תאים שלא הופיעו באימון נזרקים"""
+        idf = self.idf
+        indices = [index for index in counts if index in idf]
+        values = [(1.0 + math.log(counts[index])) * idf[index] for index in indices]
+        norm = math.sqrt(sum(map(mul, values, values))) or 1.0
+        return indices, [value / norm for value in values]
+
+    def features(self, text: str) -> Dict[int, float]:
+        return dict(zip(*self._vector(self._hashed(text))))
+
+    def _scores(self, indices: List[int], values: List[float], scale: float = 1.0) -> List[float]:
+        """bias + W·x - המכפלות בתוך zip/map/sum (C) ולא בלולאה של Python"""
+        weights = self.weights
+        pairs = [(weights[index], value) for index, value in zip(indices, values) if index in weights]
+        if not pairs:
+            return list(self.bias)
+        rows, row_values = zip(*pairs)
+        return [bias + scale * sum(map(mul, column, row_values)) for bias, column in zip(self.bias, zip(*rows))]
+
+    # ============================================
+    # Training
+    # ============================================
+
+    def fit(
+        self,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        epochs: int = 5,
+        learning_rate: float = 1.0,
+        l2: float = 1e-6,
+        min_df: int = 2,
+        seed: int = 0
+    ) -> "LocalClassifier":
+        self.classes = sorted(set(labels))
+        class_index = {label: i for i, label in enumerate(self.classes)}
+        n_classes = len(self.classes)
+
+        # idf לתאים שמופיעים לפחות ב-min_df מאמרים
+        hashed = [self._hashed(text) for text in texts]
+        df = Counter(index for counts in hashed for index in counts)
+        n_docs = len(texts)
+        self.idf = {
+            index: math.log((1 + n_docs) / (1 + count)) + 1.0
+            for index, count in df.items() if count >= min_df
+        }
+        vectors = [self._vector(counts) for counts in hashed]
+        del hashed
+        targets = [class_index[label] for label in labels]
+
+        self.weights = {}
+        self.bias = [0.0] * n_classes
+        weights = self.weights
+        zeros = [0.0] * n_classes
+        # L2 בלי לעבור על כל המשקלים בכל צעד: w = scale * stored
+        scale = 1.0
+        order = list(range(n_docs))
+        rng = random.Random(seed)
+        step = 0
+        for _ in range(epochs):
+            rng.shuffle(order)
+            for doc in order:
+                indices, values = vectors[doc]
+                rate = learning_rate / (1.0 + learning_rate * l2 * step)
+                step += 1
+
+                probabilities = _softmax(self._scores(indices, values, scale))
+                probabilities[targets[doc]] -= 1.0  # gradient של cross-entropy לפי ה-scores
+
+                scale *= 1.0 - rate * l2
+                self.bias = [bias - rate * p for bias, p in zip(self.bias, probabilities)]
+                factor = rate / scale
+                for index, value in zip(indices, values):
+                    step_value = factor * value
+                    weights[index] = [w - step_value * p for w, p in zip(weights.get(index, zeros), probabilities)]
+
+                if scale < 1e-6:
+                    for index, row in weights.items():
+                        weights[index] = [w * scale for w in row]
+                    scale = 1.0
+
+        for index, row in weights.items():
+            weights[index] = [w * scale for w in row]
+        self.trained_at = time.time()
+        return self
+
+    # ============================================
+    # Prediction
+    # ============================================
+
+    def predict_proba(self, text: str) -> List[Tuple[str, float]]:
+        """[(קטגוריה, הסתברות)] מהגבוהה לנמוכה"""
+        scores = self._scores(*self._vector(self._hashed(text)))
+        return sorted(zip(self.classes, _softmax(scores, self.temperature)), key=lambda item: -item[1])
+
+    def calibrate(self, texts: Sequence[str], labels: Sequence[str]) -> float:
+        """
+        temperature scaling על מאמרים שלא היו באימון: T שממזער את ה-log loss.
+        SGD על וקטורים מנורמלים נותן הסתברויות שטוחות מדי - בלי זה רוב המאמרים היו עוברים ל-remote
+        """
+        class_index = {label: i for i, label in enumerate(self.classes)}
+        samples = [
+            (self._scores(*self._vector(self._hashed(text))), class_index[label])
+            for text, label in zip(texts, labels) if label in class_index
+        ]
+        if not samples:
+            return self.temperature
+
+        def log_loss(temperature: float) -> float:
+            return -sum(math.log(max(_softmax(scores, temperature)[target], 1e-12)) for scores, target in samples)
+
+        candidates = [0.05 * 1.15 ** i for i in range(40)]  # 0.05 .. ~11
+        self.temperature = min(candidates, key=log_loss)
+        return self.temperature
+
+    def evaluate(self, texts: Sequence[str], labels: Sequence[str], threshold: float) -> Dict[str, Any]:
+        """דיוק כללי, ו-coverage / דיוק של התחזיות עם confidence >= threshold (מה שלא יועבר למודל המרוחק)"""
+        correct = confident = confident_correct = 0
+        started = time.perf_counter()
+        for text, label in zip(texts, labels):
+            category, probability = self.predict_proba(text)[0]
+            correct += category == label
+            if probability >= threshold:
+                confident += 1
+                confident_correct += category == label
+        elapsed = time.perf_counter() - started
+        total = len(texts) or 1
+        return {
+            "samples": len(texts),
+            "accuracy": round(correct / total, 4),
+            "threshold": threshold,
+            "coverage": round(confident / total, 4),
+            "confident_accuracy": round(confident_correct / confident, 4) if confident else 0.0,
+            "microseconds_per_article": round(elapsed / total * 1e6, 1)
+        }
+
+    # ============================================
+    # Persistence
+    # ============================================
+
+    def save(self, path: str, min_weight: float = 1e-3) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # משקלים זניחים לא נשמרים (והתאים שלהם נזרקים גם מה-idf); JSON - מפתחות כמחרוזות
+        weights = {
+            str(index): [round(w, 4) for w in row]
+            for index, row in self.weights.items() if max(map(abs, row)) >= min_weight
+        }
+        data = {
+            "version": MODEL_VERSION,
+            "n_features": self.n_features,
+            "bigrams": self.bigrams,
+            "classes": self.classes,
+            "trained_at": self.trained_at,
+            "metrics": self.metrics,
+            "bias": self.bias,
+            "temperature": self.temperature,
+            "idf": {index: round(self.idf[int(index)], 4) for index in weights},
+            "weights": weights
+        }
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "LocalClassifier":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != MODEL_VERSION:
+            raise ValueError(f"Unsupported model version {data.get('version')} in {path}")
+        model = cls(n_features=data["n_features"], bigrams=data["bigrams"])
+        model.classes = data["classes"]
+        model.trained_at = data.get("trained_at")
+        model.metrics = data.get("metrics", {})
+        model.bias = data["bias"]
+        model.temperature = data.get("temperature", 1.0)
+        model.idf = {int(index): value for index, value in data["idf"].items()}
+        model.weights = {int(index): row for index, row in data["weights"].items()}
+        return model
+
+
+def _softmax(scores: List[float], temperature: float = 1.0) -> List[float]:
+    top = max(scores)
+    exps = [math.exp((score - top) / temperature) for score in scores]
+    total = sum(exps)
+    return [value / total for value in exps]
+
+
+# ============================================
+# Training data
+# ============================================
+
+def training_data(db, categories: Iterable[str], limit: Optional[int] = None) -> Tuple[List[str], List[str]]:
+    """
+    (טקסטים, קטגוריות) מהמאמרים שכבר מסווגים ב-DB - רק קטגוריות מתוך categories
+    (שם או id של טבלת categories - הפאנל של האדמין שומר id), בלי עותקים של אותה ידיעה
+    """
+    from sqlalchemy import text as sql
+    from app.mvc.models.articles.article_entity import Article
+
+    names = {name.casefold(): name for name in categories}
+    try:
+        ids = {str(row.id): row.name for row in db.execute(sql("SELECT id, name FROM categories"))}
+    except Exception:
+        db.rollback()
+        ids = {}
+
+    query = (
+        db.query(Article.title, Article.summary, Article.content, Article.category)
+        .filter(Article.category.isnot(None), Article.duplicate_of.is_(None))
+        .order_by(Article.id.desc())
+    )
+    if limit:
+        query = query.limit(limit)
+
+    texts, labels = [], []
+    for row in query.yield_per(2000):
+        category = names.get(ids.get(str(row.category), row.category).casefold())
+        if category:
+            texts.append(article_text(row.title, row.summary, row.content))
+            labels.append(category)
+    return texts, labels
+
+
+# Singleton - המודל מהדיסק; נטען מחדש אם הקובץ התחלף (אימון חדש) בלי restart
+_local_classifier: Optional[LocalClassifier] = None
+_local_classifier_mtime: Optional[float] = None
+_local_classifier_checked: Optional[float] = None
+_local_classifier_lock = threading.Lock()
+
+RELOAD_CHECK_SECONDS = 30
+
+
+def get_local_classifier() -> Optional[LocalClassifier]:
+    """המודל המקומי, או None אם עוד לא אומן (אין קובץ ב-CLASSIFIER_MODEL_PATH)"""
+    global _local_classifier, _local_classifier_mtime, _local_classifier_checked
+    now = time.monotonic()
+    if _local_classifier_checked is not None and now - _local_classifier_checked < RELOAD_CHECK_SECONDS:
+        return _local_classifier
+    with _local_classifier_lock:
+        if _local_classifier_checked is not None and now - _local_classifier_checked < RELOAD_CHECK_SECONDS:
+            return _local_classifier
+        _local_classifier_checked = now
+        path = get_settings().CLASSIFIER_MODEL_PATH
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            _local_classifier = _local_classifier_mtime = None
+            return None
+        if mtime != _local_classifier_mtime:
+            try:
+                _local_classifier = LocalClassifier.load(path)
+                _local_classifier_mtime = mtime
+                logger.info(f"Loaded local classifier from {path} ({len(_local_classifier.weights)} features)")
+            except Exception as e:
+                logger.error(f"Loading local classifier from {path} failed: {e}")
+        return _local_classifier
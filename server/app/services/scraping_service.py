@@ -0,0 +1,308 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+from urllib import robotparser
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import get_settings
+from app.core.disk_cache import DiskCache
+from app.core.metrics import get_gateway_metrics
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "scraper"
+CACHE_NAMESPACE = "scrape"
+
+
+def extract_text(url: str, html: str) -> Optional[str]:
+    """פירוש HTML לטקסט המאמר עם newspaper - רץ בתהליך נפרד (CPU)"""
+    from newspaper import Article as NewsArticle
+
+    article = NewsArticle(url)
+    article.download(input_html=html)
+    article.parse()
+    return article.text or None
+
+
+class _LoopState:
+    """מה שקשור ל-event loop אחד: ה-client, ה-semaphore הכללי, ו-semaphore + lock לכל דומיין"""
+
+    __slots__ = ("client", "semaphore", "domain_semaphores", "domain_locks")
+
+    def __init__(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore):
+        self.client = client
+        self.semaphore = semaphore
+        self.domain_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.domain_locks: Dict[str, asyncio.Lock] = {}
+
+
+class ScrapingService:
+    """
+    הורדת הטקסט המלא של מאמרים בכמויות
+
+    - httpx.AsyncClient אחד, עד SCRAPER_CONCURRENCY הורדות במקביל
+    - נימוס לכל דומיין: עד SCRAPER_PER_DOMAIN_CONCURRENCY במקביל, מרווח של SCRAPER_CRAWL_DELAY_SECONDS
+      (או Crawl-delay מ-robots.txt אם גדול יותר) בין בקשות, ו-URLs ש-robots.txt אוסר לא נטענים
+    - timeout כולל לכל דף ומגבלת גודל - הורדה שחורגת נעצרת באמצע
+    - cache לפי URL (DiskCache): בתוך ה-TTL לא יוצאים לרשת; אחריו בקשה מותנית עם ETag/Last-Modified,
+      ו-304 מאריך את הערך הקיים בלי להוריד ולפרש שוב
+    - פירוש ה-HTML (newspaper) ב-ProcessPoolExecutor - לא תופס את ה-event loop ולא את ה-GIL
+
+    ה-client וה-semaphores קשורים ל-event loop, ולכן נפרדים לכל loop
+    (scrape_sync / enhance_many_sync מריצים asyncio.run בכל קריאה וסוגרים את ה-client שלה בסופה)
+    """
+
+    def __init__(self, cache: Optional[DiskCache] = None):
+        settings = get_settings()
+        self.concurrency = settings.SCRAPER_CONCURRENCY
+        self.per_domain_concurrency = settings.SCRAPER_PER_DOMAIN_CONCURRENCY
+        self.crawl_delay = settings.SCRAPER_CRAWL_DELAY_SECONDS
+        self.timeout = settings.SCRAPER_TIMEOUT_SECONDS
+        self.max_bytes = settings.SCRAPER_MAX_BYTES
+        self.parse_workers = settings.SCRAPER_PARSE_WORKERS or os.cpu_count() or 1
+        self.cache_ttl = settings.SCRAPER_CACHE_TTL_SECONDS
+        self.cache_revalidate = settings.SCRAPER_CACHE_REVALIDATE_SECONDS
+        self.user_agent = settings.SCRAPER_USER_AGENT
+        self.cache = cache if cache is not None else DiskCache(settings.SCRAPER_CACHE_PATH)
+        self.metrics = get_gateway_metrics()
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        # client, semaphores ו-locks לכל event loop: scrape_sync יכול לרוץ מכמה threads במקביל, כל אחד עם loop משלו
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+        # לא תלויים ב-loop - נשמרים בין הרצות
+        self._next_request_at: Dict[str, float] = {}
+        self._robots: Dict[str, Optional[robotparser.RobotFileParser]] = {}
+
+        self.counters = {
+            "fetched": 0, "cache_hits": 0, "not_modified": 0, "parsed": 0,
+            "too_large": 0, "timeouts": 0, "errors": 0, "disallowed": 0
+        }
+
+    # ============================================
+    # Client, pool & politeness
+    # ============================================
+
+    def _state(self) -> "_LoopState":
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None or state.client.is_closed:
+            client = httpx.AsyncClient(
+                headers={"User-Agent": self.user_agent},
+                follow_redirects=True,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.concurrency)
+            )
+            state = self._loops[loop] = _LoopState(client, asyncio.Semaphore(self.concurrency))
+        return state
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        return self._pool
+
+    def _domain_semaphore(self, state: "_LoopState", domain: str) -> asyncio.Semaphore:
+        semaphore = state.domain_semaphores.get(domain)
+        if semaphore is None:
+            semaphore = state.domain_semaphores[domain] = asyncio.Semaphore(self.per_domain_concurrency)
+        return semaphore
+
+    async def _wait_turn(self, state: "_LoopState", domain: str):
+        """מרווח crawl delay בין בקשות לאותו דומיין"""
+        async with state.domain_locks.setdefault(domain, asyncio.Lock()):
+            robots = self._robots.get(domain)
+            delay = max(self.crawl_delay, (robots.crawl_delay(self.user_agent) or 0) if robots else 0)
+            wait = self._next_request_at.get(domain, 0.0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_request_at[domain] = time.monotonic() + delay
+
+    async def _allowed(self, state: "_LoopState", url: str, domain: str) -> bool:
+        """robots.txt נטען פעם אחת לדומיין; אם אי אפשר לטעון אותו - מותר"""
+        async with state.domain_locks.setdefault(domain, asyncio.Lock()):
+            if domain not in self._robots:
+                parser = None
+                try:
+                    response = await state.client.get(f"{urlsplit(url).scheme}://{domain}/robots.txt", timeout=5)
+                    if response.status_code == 200:
+                        parser = robotparser.RobotFileParser()
+                        parser.parse(response.text.splitlines())
+                except httpx.HTTPError:
+                    pass
+                self._robots[domain] = parser
+        parser = self._robots[domain]
+        return parser is None or parser.can_fetch(self.user_agent, url)
+
+    async def aclose(self):
+        """סגירת ה-client של ה-loop הנוכחי (clients של loops אחרים ממשיכים לעבוד)"""
+        state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state is not None and not state.client.is_closed:
+            await state.client.aclose()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # ============================================
+    # Scraping
+    # ============================================
+
+    async def scrape(self, url: str) -> Optional[str]:
+        """הטקסט המלא של המאמר, או None אם לא הצליח (לא נזרקות שגיאות - URL אחד לא מפיל את scrape_many)"""
+        try:
+            return await self._scrape(url)
+        except Exception as e:
+            # URL לא תקין, encoding לא מוכר, דיסק וכו'
+            self.counters["errors"] += 1
+            logger.warning(f"Scraping {url} failed: {e!r}")
+            return None
+
+    async def _scrape(self, url: str) -> Optional[str]:
+        # DiskCache הוא SQLite סינכרוני - ב-thread, כדי לא לעצור את ה-event loop
+        entry = await asyncio.to_thread(self.cache.get_entry, url, namespace=CACHE_NAMESPACE)
+        cached = entry[0] if entry else None
+        if entry and entry[1] > time.time():
+            self.counters["cache_hits"] += 1
+            self.metrics.record_cache(SERVICE_NAME, "hit")
+            return cached["text"]
+        self.metrics.record_cache(SERVICE_NAME, "stale" if entry else "miss")
+
+        state = self._state()
+        domain = urlsplit(url).netloc.lower()
+        # ההמתנה לתור של הדומיין לא תופסת מקום מה-SCRAPER_CONCURRENCY - דומיינים אחרים ממשיכים
+        async with self._domain_semaphore(state, domain):
+            if not await self._allowed(state, url, domain):
+                self.counters["disallowed"] += 1
+                return None
+            await self._wait_turn(state, domain)
+            async with state.semaphore:
+                try:
+                    result = await asyncio.wait_for(self._download(state.client, url, cached), self.timeout)
+                except asyncio.TimeoutError:
+                    self.counters["timeouts"] += 1
+                    self.metrics.record_timeout(SERVICE_NAME)
+                    return None
+                except httpx.HTTPError as e:
+                    self.counters["errors"] += 1
+                    self.metrics.record_error(SERVICE_NAME)
+                    logger.warning(f"Scraping {url} failed: {e}")
+                    return None
+
+        if result is None:
+            return None
+        if result is cached:
+            self.counters["not_modified"] += 1
+            text = cached["text"]
+        else:
+            html, validators = result
+            try:
+                text = await asyncio.get_running_loop().run_in_executor(self._get_pool(), extract_text, url, html)
+            except Exception as e:
+                self.counters["errors"] += 1
+                logger.warning(f"Parsing {url} failed: {e}")
+                return None
+            self.counters["parsed"] += 1
+            cached = {"text": text, **validators}
+        await asyncio.to_thread(
+            self.cache.set, url, cached, ttl=self.cache_ttl, namespace=CACHE_NAMESPACE, max_stale=self.cache_revalidate
+        )
+        return text
+
+    async def _download(self, client: httpx.AsyncClient, url: str, cached: Optional[Dict[str, Any]]):
+        """(html, validators), cached אם 304, או None אם התשובה לא שמישה"""
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        started = time.perf_counter()
+        async with client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 and cached:
+                self.metrics.record_response(SERVICE_NAME, 304, time.perf_counter() - started)
+                return cached
+            content_type = response.headers.get("content-type", "")
+            if response.status_code != 200 or "html" not in content_type:
+                self.metrics.record_response(SERVICE_NAME, response.status_code, time.perf_counter() - started)
+                self.counters["errors"] += 1
+                return None
+            if int(response.headers.get("content-length") or 0) > self.max_bytes:
+                self.counters["too_large"] += 1
+                return None
+
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) > self.max_bytes:
+                    self.counters["too_large"] += 1
+                    return None
+            self.metrics.record_response(SERVICE_NAME, 200, time.perf_counter() - started)
+            self.counters["fetched"] += 1
+            html = body.decode(response.encoding or "utf-8", errors="replace")
+            return html, {
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified")
+            }
+
+    async def scrape_many(self, urls: Iterable[str]) -> Dict[str, Optional[str]]:
+        urls = list(dict.fromkeys(urls))
+        texts = await asyncio.gather(*(self.scrape(url) for url in urls))
+        return dict(zip(urls, texts))
+
+    async def enhance_many(self, articles: List[dict], min_length: int = 1000) -> List[dict]:
+        """
+        ממלא content בטקסט המלא למאמרים שהתוכן שלהם קצר מ-min_length
+        (טקסט של פחות מ-200 תווים נחשב כישלון ולא מחליף את הקיים)
+        """
+        targets = [
+            article for article in articles
+            if article.get("url") and len(article.get("content") or "") <= min_length
+        ]
+        texts = await self.scrape_many(article["url"] for article in targets)
+        for article in targets:
+            text = texts.get(article["url"])
+            if text and len(text) > 200:
+                article["content"] = text
+        return articles
+
+    def scrape_sync(self, url: str) -> Optional[str]:
+        return self._run_sync(self.scrape(url))
+
+    def enhance_many_sync(self, articles: List[dict], min_length: int = 1000) -> List[dict]:
+        return self._run_sync(self.enhance_many(articles, min_length))
+
+    def _run_sync(self, coro):
+        """asyncio.run - ה-client של ה-loop הזה נסגר לפני שה-loop נגמר (אחרת כל קריאה משאירה pool פתוח)"""
+        async def run_and_close():
+            try:
+                return await coro
+            finally:
+                await self.aclose()
+
+        return asyncio.run(run_and_close())
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "domains": len(self._robots), "cache": self.cache.stats()}
+
+
+# Singleton
+_scraping_service: Optional[ScrapingService] = None
+_scraping_service_lock = threading.Lock()
+
+def get_scraping_service() -> ScrapingService:
+    global _scraping_service
+    if _scraping_service is None:
+        with _scraping_service_lock:
+            if _scraping_service is None:
+                _scraping_service = ScrapingService()
+    return _scraping_service
@@ -1,5 +1,8 @@
+import asyncio
 from typing import Dict, Any, List, Optional
-from app.core.gateway import get_gateway
+from app.core.async_gateway import get_async_gateway
+from app.core.rate_limiter import RateLimitExceeded
+from app.core.circuit_breaker import CircuitOpenError
 from app.core.config import get_settings
 import logging
 
@@ -21,7 +24,8 @@ class HuggingFaceService:
     }
     
     def __init__(self):
-        self.gateway = get_gateway()
+        self.gateway = get_async_gateway()
+        self.gateway.set_rate_limit("huggingface", 50)  # 50 requests per minute
         self.api_key = settings.HUGGINGFACE_API_KEY
         
     def _get_headers(self) -> Dict[str, str]:
@@ -31,26 +35,32 @@ class HuggingFaceService:
             headers["Authorization"] = f"Bearer {self.api_key}"
         return headers
     
-    def _query_model(self, model_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def _query_model(self, model_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         """שאילתה למודל ב-Hugging Face"""
         url = f"{self.BASE_URL}/{model_name}"
         
         try:
-            result = self.gateway.post(
+            result = await self.gateway.post(
                 url=url,
                 service_name="huggingface",
                 headers=self._get_headers(),
                 json=payload,
                 timeout=60,
                 cache_ttl=3600,  # Cache for 1 hour
-                rate_limit=50    # 50 requests per minute
+                stale_if_error=24 * 3600,  # מודל לא זמין - תוצאה קודמת עדיפה על שגיאה
+                idempotent=True,  # inference: אותו input -> אותה תשובה
+                wait_for_rate_limit=True,  # burst קצר ממתין לטוקן במקום להיכשל
+                rate_limit_timeout=5,
+                hedge=True  # מודל "קר" / איטי - עותק אחרי p95 במקום להמתין ל-timeout
             )
             return result
+        except (RateLimitExceeded, CircuitOpenError):
+            raise
         except Exception as e:
             logger.error(f"Error querying Hugging Face model {model_name}: {e}")
             raise Exception(f"Failed to query Hugging Face: {str(e)}")
     
-    def analyze_sentiment(self, text: str) -> Dict[str, Any]:
+    async def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """
         ניתוח סנטימנט של טקסט
         
@@ -61,7 +71,7 @@ class HuggingFaceService:
             }
         """
         try:
-            result = self._query_model(
+            result = await self._query_model(
                 self.MODELS["sentiment"],
                 {"inputs": text}
             )
@@ -81,7 +91,7 @@ class HuggingFaceService:
             logger.error(f"Sentiment analysis failed: {e}")
             return {"label": "ERROR", "score": 0.0, "error": str(e)}
     
-    def summarize_text(self, text: str, max_length: int = 130, min_length: int = 30) -> Dict[str, Any]:
+    async def summarize_text(self, text: str, max_length: int = 130, min_length: int = 30) -> Dict[str, Any]:
         """
         סיכום טקסט
         
@@ -93,7 +103,7 @@ class HuggingFaceService:
             }
         """
         try:
-            result = self._query_model(
+            result = await self._query_model(
                 self.MODELS["summarization"],
                 {
                     "inputs": text,
@@ -119,7 +129,7 @@ class HuggingFaceService:
             logger.error(f"Summarization failed: {e}")
             return {"summary": "", "error": str(e)}
     
-    def translate_text(self, text: str, direction: str = "en_to_he") -> Dict[str, Any]:
+    async def translate_text(self, text: str, direction: str = "en_to_he") -> Dict[str, Any]:
         """
         תרגום טקסט
         
@@ -138,7 +148,7 @@ class HuggingFaceService:
             if model_key not in self.MODELS:
                 return {"translated_text": "", "error": "Invalid direction"}
             
-            result = self._query_model(
+            result = await self._query_model(
                 self.MODELS[model_key],
                 {"inputs": text}
             )
@@ -157,7 +167,7 @@ class HuggingFaceService:
             logger.error(f"Translation failed: {e}")
             return {"translated_text": "", "error": str(e)}
     
-    def classify_text(self, text: str, categories: List[str]) -> Dict[str, Any]:
+    async def classify_text(self, text: str, categories: List[str]) -> Dict[str, Any]:
         """
         סיווג טקסט לקטגוריות
         
@@ -172,7 +182,7 @@ class HuggingFaceService:
             }
         """
         try:
-            result = self._query_model(
+            result = await self._query_model(
                 self.MODELS["zero_shot"],
                 {
                     "inputs": text,
@@ -198,19 +208,24 @@ class HuggingFaceService:
             logger.error(f"Classification failed: {e}")
             return {"category": "ERROR", "confidence": 0.0, "error": str(e)}
     
-    def analyze_article(self, title: str, summary: str) -> Dict[str, Any]:
+    async def analyze_article(self, title: str, summary: str) -> Dict[str, Any]:
         """
         ניתוח מקיף של מאמר
         משלב: sentiment, classification
         """
         text = f"{title}. {summary}"
         
-        return {
-            "sentiment": self.analyze_sentiment(text),
-            "category": self.classify_text(text, [
+        # שתי הקריאות יוצאות במקביל
+        sentiment, category = await asyncio.gather(
+            self.analyze_sentiment(text),
+            self.classify_text(text, [
                 "Technology", "Politics", "Sports", "Entertainment",
                 "Business", "Health", "Science", "World"
             ])
+        )
+        return {
+            "sentiment": sentiment,
+            "category": category
         }
 
 
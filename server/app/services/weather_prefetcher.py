@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.services.weather_service import WeatherService, get_weather_service
+
+logger = logging.getLogger(__name__)
+
+
+class WeatherPrefetcher:
+    """
+    שומר את top_n הערים הפופולריות חמות: מרענן current ו-daily שלהן לפני שפג התוקף
+    (אחרי refresh_at מה-TTL), כך שבקשה מהלקוח כמעט אף פעם לא ממתינה ל-OpenWeatherMap
+
+    - thread אחד ברקע; לכל היותר calls_per_minute קריאות רענון בדקה, במרווחים שווים -
+      כך שה-prefetch לא שורף את המכסה של OpenWeatherMap ולא יוצא ב-burst
+    - כל פעם מרעננים את הרשומה שהכי קרוב לפוג
+    - עיר שנכשלה נדחית ב-retry_seconds (לא חוסמת את האחרות)
+    """
+
+    def __init__(
+        self,
+        service: Optional[WeatherService] = None,
+        top_n: int = 10,
+        calls_per_minute: int = 20,
+        refresh_at: float = 0.8,
+        idle_seconds: float = 30,
+        retry_seconds: float = 120
+    ):
+        self._service = service
+        self.top_n = top_n
+        self.spacing = 60.0 / max(calls_per_minute, 1)
+        self.refresh_at = refresh_at
+        self.idle_seconds = idle_seconds
+        self.retry_seconds = retry_seconds
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._failed_until: Dict[Tuple[str, str], float] = {}
+        self.refreshed = 0
+        self.errors = 0
+
+    @property
+    def service(self) -> WeatherService:
+        # נוצר רק כשצריך - בלי WEATHER_API_KEY ה-thread פשוט לא עושה כלום
+        if self._service is None:
+            self._service = get_weather_service()
+        return self._service
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="weather-prefetch", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                wait = self.run_once()
+            except Exception as e:
+                logger.warning(f"Weather prefetch failed: {e}")
+                wait = self.retry_seconds
+            self._stop.wait(wait)
+
+    def due(self, now: Optional[float] = None) -> List[Tuple[float, str, str]]:
+        """(מתי לרענן, kind, עיר) לכל רשומה של הערים הפופולריות, מהמוקדם למאוחר"""
+        now = time.monotonic() if now is None else now
+        service = self.service
+        entries = []
+        for key in service.popular_cities(self.top_n):
+            for kind in service.KINDS:
+                fetched_at = service.fetched_at(kind, key)
+                # עוד לא נטען (או נזרק מה-cache) - לרענן עכשיו
+                due_at = now if fetched_at is None else fetched_at + service.ttl_for(kind, key) * self.refresh_at
+                due_at = max(due_at, self._failed_until.get((kind, key), 0.0))
+                entries.append((due_at, kind, key))
+        entries.sort()
+        return entries
+
+    def run_once(self) -> float:
+        """רענון רשומה אחת אם הגיע זמנה. מחזיר כמה שניות להמתין עד הסבב הבא"""
+        now = time.monotonic()
+        entries = self.due(now)
+        if not entries:
+            return self.idle_seconds
+        due_at, kind, key = entries[0]
+        if due_at > now:
+            return min(due_at - now, self.idle_seconds)
+
+        try:
+            self.service.refresh(kind, key)
+            self.refreshed += 1
+            self._failed_until.pop((kind, key), None)
+        except Exception as e:
+            self.errors += 1
+            self._failed_until[(kind, key)] = now + self.retry_seconds
+            logger.warning(f"Weather prefetch for {key} ({kind}) failed: {e}")
+        return self.spacing
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "top_n": self.top_n,
+            "refreshed": self.refreshed,
+            "errors": self.errors
+        }
+
+
+# Singleton
+_weather_prefetcher: Optional[WeatherPrefetcher] = None
+
+def get_weather_prefetcher() -> WeatherPrefetcher:
+    global _weather_prefetcher
+    if _weather_prefetcher is None:
+        settings = get_settings()
+        _weather_prefetcher = WeatherPrefetcher(
+            top_n=settings.WEATHER_PREFETCH_TOP_N,
+            calls_per_minute=settings.WEATHER_PREFETCH_CALLS_PER_MINUTE,
+            refresh_at=settings.WEATHER_PREFETCH_REFRESH_AT
+        )
+    return _weather_prefetcher
@@ -0,0 +1,216 @@
+import logging
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.single_flight import SingleFlight
+from app.gateways.weather_api_gateway import WeatherAPIGateway
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_city(city: str) -> str:
+    """ "  Tel   AVIV " -> "tel aviv" - כך שכל הכתיבים של אותה עיר חולקים רשומת cache אחת"""
+    city = unicodedata.normalize("NFKC", city)
+    return _WHITESPACE.sub(" ", city).strip().casefold()
+
+
+class WeatherService:
+    """
+    שירות מזג אוויר ארוך-חיים: WeatherAPIGateway אחד (session משותף עם keep-alive דרך ה-Gateway)
+    ו-cache של התוצאות המעובדות לכל עיר, עם TTL משלה
+
+    - current: קריאת weather אחת לעיר, נשמרת WEATHER_CURRENT_TTL_SECONDS (או ה-TTL של העיר)
+    - daily: קריאת forecast אחת לעיר (5 ימים ב-3 שעות), נשמרת WEATHER_FORECAST_TTL_SECONDS
+    - בקשות מקבילות לאותה עיר שלא ב-cache יוצאות פעם אחת (single-flight)
+    - stale-while-revalidate: ערך שפג לפני פחות מ-WEATHER_MAX_STALE_SECONDS מוחזר מיד
+      ורענון אחד יוצא ברקע - גם ערים מחוץ ל-top N של ה-prefetcher לא ממתינות ל-upstream
+    - stale-if-error: אם הרענון נכשל מוחזר הערך הישן (עד WEATHER_STALE_IF_ERROR_SECONDS),
+      והוא נשאר ב-cache עם זמן הטעינה המקורי שלו - לא נשמר מחדש כטרי
+    - סופר כמה פעמים ביקשו כל עיר (עם דעיכה), כדי שה-prefetcher ישמור את הפופולריות חמות
+    """
+
+    CURRENT = "current"
+    DAILY = "daily"
+    KINDS = (CURRENT, DAILY)
+    MAX_BATCH_CITIES = 20
+
+    def __init__(self, gateway: Optional[WeatherAPIGateway] = None):
+        settings = get_settings()
+        self.gateway = gateway or WeatherAPIGateway()
+        self.default_city = normalize_city(self.gateway.default_city)
+        self.current_ttl = settings.WEATHER_CURRENT_TTL_SECONDS
+        self.forecast_ttl = settings.WEATHER_FORECAST_TTL_SECONDS
+        self.max_stale = settings.WEATHER_MAX_STALE_SECONDS
+        self.stale_if_error = settings.WEATHER_STALE_IF_ERROR_SECONDS
+        self.city_ttls: Dict[str, int] = {
+            normalize_city(city): ttl for city, ttl in settings.WEATHER_CITY_TTLS.items()
+        }
+        self.cache = TTLCache(
+            max_entries=settings.WEATHER_CACHE_MAX_CITIES * 2,
+            default_ttl=self.current_ttl,
+            name="weather"
+        )
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._batch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="weather-batch")
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="weather-refresh")
+        self._refreshing = set()
+
+        # פופולריות: מונה לכל עיר שחוצה בכל popularity_half_life שניות (בקשות ישנות דועכות)
+        self.popularity: Dict[str, float] = {}
+        self.popularity_half_life = settings.WEATHER_POPULARITY_HALF_LIFE_SECONDS
+        self._last_decay = time.monotonic()
+        self._fetched_at: Dict[Tuple[str, str], float] = {}
+
+    def city_key(self, city: Optional[str]) -> str:
+        key = normalize_city(city) if city else ""
+        return key or self.default_city
+
+    def set_city_ttl(self, city: str, ttl_seconds: int):
+        """TTL למזג האוויר הנוכחי של עיר מסוימת (למשל עיר שמשתנה לאט - TTL ארוך יותר)"""
+        with self._lock:
+            self.city_ttls[normalize_city(city)] = ttl_seconds
+
+    def ttl_for(self, kind: str, key: str) -> int:
+        if kind == self.DAILY:
+            return self.forecast_ttl
+        return self.city_ttls.get(key, self.current_ttl)
+
+    def get_current_weather(self, city: Optional[str] = None) -> Dict[str, Any]:
+        return self._cached(self.CURRENT, self.city_key(city))
+
+    def get_daily_forecast(self, city: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._cached(self.DAILY, self.city_key(city))
+
+    def get_many(self, cities: Iterable[str], kinds: Iterable[str] = KINDS) -> Dict[str, Dict[str, Any]]:
+        """
+        כמה ערים בבקשה אחת: {עיר: {"current": ..., "daily_forecast": ...}} או {"error": ...}
+        ערים שלא ב-cache נטענות במקביל; עיר שנכשלה לא מפילה את האחרות
+        """
+        keys = list(dict.fromkeys(self.city_key(city) for city in cities))[:self.MAX_BATCH_CITIES]
+        kinds = [kind for kind in self.KINDS if kind in set(kinds)]
+
+        def load(key: str) -> Dict[str, Any]:
+            try:
+                result = {}
+                for kind in kinds:
+                    result["daily_forecast" if kind == self.DAILY else kind] = self._cached(kind, key)
+                return result
+            except Exception as e:
+                return {"error": str(e)}
+
+        return dict(zip(keys, self._batch_executor.map(load, keys)))
+
+    def _cached(self, kind: str, key: str) -> Any:
+        cached, stale_for = self.cache.lookup(key, namespace=kind)
+        if cached is None or stale_for > self.max_stale:
+            try:
+                cached = self.refresh(kind, key)
+            except Exception as e:
+                if cached is None:
+                    raise
+                logger.warning(f"Serving stale {kind} weather for '{key}' after upstream error: {e}")
+        elif stale_for:
+            self._refresh_in_background(kind, key)
+        self._record_request(key)
+        return cached
+
+    def _refresh_in_background(self, kind: str, key: str):
+        """רענון אחד בלבד ברקע לכל (סוג, עיר); שגיאה משאירה את הערך הישן ב-cache"""
+        with self._lock:
+            if (kind, key) in self._refreshing:
+                return
+            self._refreshing.add((kind, key))
+
+        def run():
+            try:
+                self.refresh(kind, key)
+            except Exception as e:
+                logger.warning(f"Background refresh of {kind} weather for '{key}' failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard((kind, key))
+
+        self._refresh_executor.submit(run)
+
+    def refresh(self, kind: str, key: str) -> Any:
+        """טעינה מה-upstream ושמירה ב-cache (גם אם יש ערך בתוקף - כך ה-prefetcher מרענן)"""
+        fetch: Callable[[str], Any] = (
+            self.gateway.get_daily_forecast if kind == self.DAILY else self.gateway.get_current_weather
+        )
+
+        def load():
+            result = fetch(key)
+            self.cache.set(
+                key, result, ttl=self.ttl_for(kind, key), namespace=kind,
+                max_stale=max(self.max_stale, self.stale_if_error)
+            )
+            with self._lock:
+                self._fetched_at[(kind, key)] = time.monotonic()
+            return result
+
+        return self._flight.do((kind, key), load, namespace="weather")
+
+    def fetched_at(self, kind: str, key: str) -> Optional[float]:
+        """מתי (time.monotonic) נטען הערך שב-cache, None אם לא נטען / נזרק"""
+        if not self.cache.contains(key, namespace=kind):
+            return None
+        return self._fetched_at.get((kind, key))
+
+    # ============================================
+    # Popularity
+    # ============================================
+
+    def _record_request(self, key: str):
+        with self._lock:
+            self._decay(time.monotonic())
+            self.popularity[key] = self.popularity.get(key, 0.0) + 1
+
+    def _decay(self, now: float):
+        if now - self._last_decay < self.popularity_half_life:
+            return
+        self._last_decay = now
+        # חצייה ומחיקת ערים שכמעט לא מבקשים - המילון לא גדל בלי גבול
+        self.popularity = {key: count / 2 for key, count in self.popularity.items() if count >= 1}
+        self._fetched_at = {
+            entry: at for entry, at in self._fetched_at.items() if entry[1] in self.popularity
+        }
+
+    def popular_cities(self, limit: int) -> List[str]:
+        with self._lock:
+            self._decay(time.monotonic())
+            ranked = sorted(self.popularity.items(), key=lambda item: item[1], reverse=True)
+        return [key for key, _ in ranked[:limit]]
+
+    def invalidate(self, city: Optional[str] = None):
+        """מחיקת עיר אחת מה-cache, או של כל הערים"""
+        if city is None:
+            self.cache.clear()
+            return
+        key = self.city_key(city)
+        self.cache.invalidate(key, namespace=self.CURRENT)
+        self.cache.invalidate(key, namespace=self.DAILY)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "popular": self.popular_cities(10)}
+
+
+# Singleton
+_weather_service: Optional[WeatherService] = None
+_weather_service_lock = threading.Lock()
+
+def get_weather_service() -> WeatherService:
+    global _weather_service
+    if _weather_service is None:
+        with _weather_service_lock:
+            if _weather_service is None:
+                _weather_service = WeatherService()
+    return _weather_service
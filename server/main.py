@@ -9,10 +9,16 @@ from app.mvc.controllers import (
     llm_controller, 
     likes_controller,
     admin_controller,
-    gemini_controller
+    gemini_controller,
+    events_controller,
+    metrics_controller,
+    weather_controller,
+    images_controller
 )
 from fastapi.staticfiles import StaticFiles
-from app.gateways.weather_api_gateway import WeatherAPIGateway
+from app.core.async_gateway import get_async_gateway
+from app.services.weather_prefetcher import get_weather_prefetcher
+from app.services import image_service
 
 settings = get_settings()
 
@@ -40,6 +46,33 @@ app.include_router(llm_controller.router, prefix=settings.API_PREFIX)
 app.include_router(likes_controller.router, prefix=settings.API_PREFIX)
 app.include_router(admin_controller.router, prefix=settings.API_PREFIX) 
 app.include_router(gemini_controller.router, prefix=settings.API_PREFIX)
+app.include_router(events_controller.router, prefix=settings.API_PREFIX)
+app.include_router(metrics_controller.router, prefix=settings.API_PREFIX)
+app.include_router(weather_controller.router, prefix=settings.API_PREFIX)
+app.include_router(images_controller.router, prefix=settings.API_PREFIX)
+
+@app.on_event("startup")
+def start_weather_prefetch():
+    """רענון ברקע של הערים הפופולריות"""
+    if settings.WEATHER_PREFETCH_ENABLED:
+        get_weather_prefetcher().start()
+
+@app.on_event("shutdown")
+async def close_http_pool():
+    """סגירת ה-pool של ה-Gateway האסינכרוני"""
+    await get_async_gateway().aclose()
+
+@app.on_event("shutdown")
+def stop_weather_prefetch():
+    get_weather_prefetcher().stop()
+
+@app.on_event("shutdown")
+async def close_image_service():
+    """סגירת ה-client וה-process pool של ה-thumbnails - רק אם השירות נוצר (get_image_service היה יוצר אותו עכשיו)"""
+    service = image_service._image_service
+    if service is not None:
+        await service.aclose()
+        service.shutdown()
 
 @app.get("/")
 def root():
@@ -50,26 +83,6 @@ def root():
         "admin": "/docs#/admin"  
     }
 
-@app.get("/api/v1/weather/current")
-def get_current_weather(city: str = None):
-    """מזג אוייר נוכחי"""
-    try:
-        gateway = WeatherAPIGateway()
-        weather = gateway.get_current_weather(city)
-        return weather
-    except Exception as e:
-        return {"error": str(e)}
-
-@app.get("/api/v1/weather/daily")
-def get_daily_forecast(city: str = None):
-    """תחזית ל-5 ימים"""
-    try:
-        gateway = WeatherAPIGateway()
-        forecast = gateway.get_daily_forecast(city)
-        return {"daily_forecast": forecast}
-    except Exception as e:
-        return {"error": str(e)}
-    
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=False)
\ No newline at end of file
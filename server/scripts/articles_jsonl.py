@@ -0,0 +1,91 @@
+# server/scripts/articles_jsonl.py
+"""
+ייצוא / ייבוא של מאמרים בכמויות כקובצי JSONL (שורה = מאמר), עם gzip אם הסיומת .gz
+זורם ב-chunks לשני הכיוונים - הזיכרון לא גדל עם גודל הקובץ. מחליף את ה-seed של
+add_articles.py / add_full_articles.py לסביבות staging ו-benchmark
+
+הרצה:
+    python scripts/articles_jsonl.py export articles.jsonl.gz
+    python scripts/articles_jsonl.py import articles.jsonl.gz --chunk-size 2000
+    python scripts/articles_jsonl.py import articles.jsonl.gz --resume      # ממשיך מה-offset ב-<file>.progress
+    python scripts/articles_jsonl.py import articles.jsonl.gz --offset 250000 --limit 100000
+
+ייבוא עובר דרך ArticleBulkWriter (dedupe לפי url_hash); ברירת מחדל בלי אירועים ובלי בדיקת עותקים -
+--events / --near-duplicates skip|cluster מפעילים אותם
+"""
+
+import sys
+import os
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Stream articles between the DB and JSONL files")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="DB -> JSONL")
+    export.add_argument("path")
+    export.add_argument("--chunk-size", type=int, default=5000)
+    export.add_argument("--after-id", type=int, default=0, help="רק מאמרים עם id גדול יותר (append לקובץ)")
+    export.add_argument("--limit", type=int, default=None)
+    export.add_argument("--resume", action="store_true", help="להמשיך מה-id ב-<file>.progress")
+
+    load = commands.add_parser("import", help="JSONL -> DB")
+    load.add_argument("path")
+    load.add_argument("--chunk-size", type=int, default=None, help="ברירת מחדל: INGEST_BULK_CHUNK_SIZE (עד 2000)")
+    load.add_argument("--offset", type=int, default=0, help="לדלג על השורות הראשונות")
+    load.add_argument("--limit", type=int, default=None)
+    load.add_argument("--resume", action="store_true", help="להמשיך מה-offset ב-<file>.progress")
+    load.add_argument("--events", action="store_true", help="ArticleCreated לכל מאמר חדש")
+    load.add_argument("--near-duplicates", choices=["off", "skip", "cluster"], default="off")
+    return parser.parse_args()
+
+
+def print_progress(summary: dict):
+    position = f"offset {summary['offset']}" if "offset" in summary else f"id {summary['last_id']}"
+    inserted = f", נוספו {summary['inserted']}" if "inserted" in summary else ""
+    print(f"  ... {summary['rows']} שורות{inserted} ({position}) - {summary['rows_per_second']} שורות/שנייה", flush=True)
+
+
+def main():
+    from app.core.db import SessionLocal
+    from app.ingestion import export_articles, import_articles
+    from app.ingestion.jsonl import clear_progress, read_progress
+
+    args = parse_args()
+    db = SessionLocal()
+    try:
+        if args.command == "export":
+            progress = read_progress(args.path) if args.resume else {}
+            after_id = progress.get("last_id", 0) if args.resume else args.after_id
+            print(f"📤 ייצוא ל-{args.path} (id > {after_id})")
+            summary = export_articles(
+                db, args.path, chunk_size=args.chunk_size, after_id=after_id, limit=args.limit,
+                on_progress=print_progress, resume_size=progress.get("bytes")
+            )
+        else:
+            offset = read_progress(args.path).get("offset", 0) if args.resume else args.offset
+            print(f"📥 ייבוא מ-{args.path} (משורה {offset + 1})")
+            summary = import_articles(
+                db, args.path, chunk_size=args.chunk_size, offset=offset, limit=args.limit,
+                emit_events=args.events, near_duplicate_mode=args.near_duplicates,
+                on_progress=print_progress
+            )
+            print(
+                f"   קיימים: {summary['existing']}, כפולים בקובץ: {summary['duplicates']}, "
+                f"עותקים: {summary['near_duplicates']}, לא תקינים: {summary['invalid']}"
+            )
+            if args.limit is None:
+                clear_progress(args.path)  # הקובץ נקרא עד הסוף
+
+        print(f"✅ {summary['rows']} שורות ב-{summary['seconds']}s - {summary['rows_per_second']} שורות/שנייה")
+    except KeyboardInterrupt:
+        print("\n⏸️  הופסק - להמשך: --resume")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
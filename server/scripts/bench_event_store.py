@@ -0,0 +1,89 @@
+# server/scripts/bench_event_store.py
+"""
+בנצ'מרק ל-FileEventStore - כתיבה מקבילית וסריקה (לא דורש SQL Server)
+
+שימוש:
+    python scripts/bench_event_store.py --events 50000 --threads 8
+"""
+
+import sys
+import os
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.event_sourcing.events import ArticleViewedEvent
+from app.event_sourcing.file_event_store import FileEventStore, FSYNC_MODES
+
+
+def bench_writes(store: FileEventStore, total: int, threads: int) -> float:
+    """כתיבת total אירועים מ-threads כותבים במקביל, מחזיר אירועים לשנייה"""
+    per_thread = total // threads
+
+    def writer(offset: int):
+        for i in range(per_thread):
+            store.save_event(ArticleViewedEvent(article_id=(offset + i) % 1000, user_id=offset))
+
+    workers = [threading.Thread(target=writer, args=(t * per_thread,)) for t in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    store.flush()
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def bench_scan(store: FileEventStore, batch: int = 1000) -> float:
+    """סריקה מלאה בסגנון get_events_since, מחזיר אירועים לשנייה"""
+    start = time.perf_counter()
+    since = 0
+    count = 0
+    while True:
+        events = store.get_events_since(since, limit=batch)
+        if not events:
+            break
+        count += len(events)
+        since = events[-1]["id"]
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FileEventStore benchmark")
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--segment-mb", type=int, default=16)
+    parser.add_argument("--modes", default=",".join(FSYNC_MODES))
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"⏱️  FileEventStore: {args.events} אירועים, {args.threads} threads")
+    print("=" * 70)
+
+    for mode in args.modes.split(","):
+        directory = tempfile.mkdtemp(prefix="events-bench-")
+        try:
+            store = FileEventStore(directory, segment_bytes=args.segment_mb * 1024 * 1024, fsync_mode=mode)
+            write_rate = bench_writes(store, args.events, args.threads)
+            scan_rate = bench_scan(store)
+            segments = len([n for n in os.listdir(directory) if n.endswith(".seg")])
+            store.close()
+
+            start = time.perf_counter()
+            FileEventStore(directory, fsync_mode="none").close()
+            recovery = time.perf_counter() - start
+
+            print(f"\n📝 fsync={mode}")
+            print(f"   כתיבה:   {write_rate:,.0f} אירועים/שנייה")
+            print(f"   סריקה:   {scan_rate:,.0f} אירועים/שנייה")
+            print(f"   segments: {segments}, פתיחה מחדש: {recovery:.2f}s")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# server/scripts/bench_gateways.py
+"""
+בדיקת עומס ל-Gateway האסינכרוני מול הקלטות (replay) - בלי רשת ובלי מפתחות API
+
+הקלטה: להריץ את השרת / הסקריפטים כרגיל עם API_CASSETTE_MODE=record
+        (הקסטות נכתבות ל-API_CASSETTE_DIR, קובץ JSONL לכל שירות)
+הרצה:
+    python scripts/bench_gateways.py --requests 2000 --concurrency 50
+    python scripts/bench_gateways.py --profile replay_profile.json --seed 7
+
+קובץ profile (latency ושגיאות לכל שירות):
+    {"default": {"latency": "recorded"},
+     "huggingface": {"latency": "lognormal", "latency_ms": 800, "sigma": 0.6, "error_rate": 0.02}}
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import json
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay load test for the API gateways")
+    parser.add_argument("--cassettes", default=None, help="תיקיית הקסטות (ברירת מחדל: API_CASSETTE_DIR)")
+    parser.add_argument("--profile", default=None, help="JSON עם latency / error rate לכל שירות")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--cache", action="store_true", help="להשאיר את ה-cache של ה-Gateway פעיל")
+    return parser.parse_args()
+
+
+async def run(args) -> None:
+    from app.core.async_gateway import get_async_gateway
+    from app.core.metrics import get_gateway_metrics
+    from app.replay.harness import get_cassette, get_replayer
+
+    cassette = get_cassette()
+    cassette.load()
+    # קריאות SDK (sdk://gemini/...) לא עוברות ב-Gateway
+    interactions = [i for i in cassette.interactions() if i["request"]["url"].startswith(("http://", "https://"))]
+    if not interactions:
+        print(f"❌ אין הקלטות HTTP ב-{cassette.directory}")
+        return
+
+    gateway = get_async_gateway()
+    for service in {interaction["service"] for interaction in interactions}:
+        gateway.set_rate_limit(service, 10 ** 9)  # מודדים את ה-gateway, לא את המגבלה
+    semaphore = asyncio.Semaphore(args.concurrency)
+    failures = 0
+
+    async def one(index: int):
+        nonlocal failures
+        interaction = interactions[index % len(interactions)]
+        request = interaction["request"]
+        async with semaphore:
+            try:
+                await gateway.request(
+                    request["method"],
+                    request["url"],
+                    interaction["service"],
+                    params=request["params"] or None,
+                    json=request["body"],
+                    cache_ttl=None if args.cache else 0,
+                    idempotent=True,
+                    max_retries=1
+                )
+            except Exception:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - start
+    await gateway.aclose()
+
+    print("=" * 70)
+    print(f"⏱️  {args.requests} בקשות, concurrency={args.concurrency}, {len(interactions)} הקלטות")
+    print("=" * 70)
+    print(f"   {args.requests / elapsed:,.0f} req/s, {failures} נכשלו, {elapsed:.2f}s")
+    print(f"   הזרקות: {get_replayer().injected}")
+    for name, stats in get_gateway_metrics().snapshot().items():
+        latency = stats["latency_ms"]
+        print(
+            f"   {name}: attempts={stats['attempts']} timeouts={stats['timeouts']} "
+            f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms "
+            f"codes={json.dumps(stats['status_codes'])}"
+        )
+
+
+def main():
+    args = parse_args()
+    # ההגדרות נקראות פעם אחת (get_settings) - חייבים לפני ה-import של האפליקציה
+    os.environ["API_CASSETTE_MODE"] = "replay"
+    os.environ["API_REPLAY_SEED"] = str(args.seed)
+    if args.cassettes:
+        os.environ["API_CASSETTE_DIR"] = args.cassettes
+    if args.profile:
+        os.environ["API_REPLAY_PROFILE_PATH"] = args.profile
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
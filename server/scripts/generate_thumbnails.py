@@ -0,0 +1,84 @@
+# server/scripts/generate_thumbnails.py
+"""
+backfill: thumbnails בשרת למאמרים קיימים שה-thumb_url שלהם הוא עדיין התמונה המקורית (או ריק)
+
+הרצה:
+    python scripts/generate_thumbnails.py
+    python scripts/generate_thumbnails.py --chunk-size 200 --limit 5000
+
+אפשר להריץ שוב - מאמר שכבר מצביע על /images מדולג, ו-URL שכבר עובד לא יורד שוב (cache)
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate server-side thumbnails for existing articles")
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=None)
+    return parser.parse_args()
+
+
+async def run(args):
+    from sqlalchemy import or_, update
+    from app.core.db import SessionLocal
+    from app.mvc.models.articles.article_entity import Article
+    from app.services.image_service import get_image_service
+
+    images = get_image_service()
+    db = SessionLocal()
+    started = time.perf_counter()
+    done = updated = 0
+    last_id = 0
+    try:
+        while args.limit is None or done < args.limit:
+            size = args.chunk_size if args.limit is None else min(args.chunk_size, args.limit - done)
+            rows = (
+                db.query(Article.id, Article.image_url)
+                .filter(
+                    Article.id > last_id,
+                    Article.image_url.isnot(None),
+                    or_(Article.thumb_url.is_(None), Article.thumb_url == Article.image_url)
+                )
+                .order_by(Article.id)
+                .limit(size)
+                .all()
+            )
+            if not rows:
+                break
+            thumbs = await images.thumb_urls(row.image_url for row in rows)
+            changes = [
+                {"id": row.id, "thumb_url": thumbs[row.image_url]}
+                for row in rows if thumbs.get(row.image_url)
+            ]
+            if changes:
+                db.execute(update(Article), changes)
+                db.commit()
+            done += len(rows)
+            updated += len(changes)
+            last_id = rows[-1].id
+            print(f"  ... {done} מאמרים, {updated} עודכנו ({done / (time.perf_counter() - started):.1f} מאמרים/שנייה)")
+    finally:
+        db.close()
+        await images.aclose()
+        images.shutdown()
+
+    print(f"\n✅ {updated}/{done} מאמרים קיבלו thumbnail")
+    print(f"📊 {images.stats()}")
+
+
+def main():
+    print("=" * 70)
+    print("🖼️  יצירת thumbnails למאמרים קיימים")
+    print("=" * 70)
+    asyncio.run(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
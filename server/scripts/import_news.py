@@ -13,7 +13,7 @@ from sqlalchemy.orm import Session
 from app.core.db import SessionLocal
 from app.mvc.models.articles.article_entity import Article
 from app.gateways.news_api_gateway import NewsAPIGateway
-from datetime import datetime
+from app.ingestion import ArticleBulkWriter, article_row
 
 
 def clear_old_articles(db: Session):
@@ -46,52 +46,21 @@ def import_articles_from_keyword(
             print(f"⚠️  לא נמצאו מאמרים עבור '{keyword}'")
             return 0
         
-        added_count = 0
-        skipped_count = 0
-        
+        # קטגוריה: הראשונה של Event Registry אם יש, אחרת זו שביקשו
+        rows = []
         for article_data in articles:
-            # בדוק אם המאמר כבר קיים (לפי URL)
-            existing = db.query(Article).filter(
-                Article.url == article_data["url"]
-            ).first()
-            
-            if existing:
-                skipped_count += 1
-                continue
-            
-            # קבע קטגוריה
             category = category_name or keyword.capitalize()
             if article_data.get("categories"):
-                category = article_data["categories"][0] if article_data["categories"] else category
-            
-            # המר תאריך
-            published_at = None
-            if article_data.get("published_at"):
-                try:
-                    published_at = datetime.fromisoformat(article_data["published_at"].replace("Z", "+00:00"))
-                except:
-                    pass
-            
-            # צור מאמר חדש
-            article = Article(
-                title=article_data["title"],
-                summary=article_data.get("description") or article_data["title"][:200],
-                content=article_data.get("content") or article_data.get("description"),
-                url=article_data["url"],
-                source=article_data["source"],
-                category=category,
-                image_url=article_data.get("image_url"),
-                thumb_url=article_data.get("image_url"),  # נשתמש באותה תמונה
-                published_at=published_at
-            )
-            
-            db.add(article)
-            added_count += 1
-            print(f"  ✅ נוסף: {article.title[:60]}...")
+                category = article_data["categories"][0]
+            row = article_row(article_data, category)
+            if row:
+                rows.append(row)
         
-        db.commit()
+        result = ArticleBulkWriter(db).write(rows)
+        added_count = result.inserted
+        skipped_count = result.existing + result.duplicates
         
-        print(f"\n✅ סה\"כ נוספו {added_count} מאמרים חדשים")
+        print(f"\n✅ סה\"כ נוספו {added_count} מאמרים חדשים ({result.rows_per_second} שורות/שנייה)")
         if skipped_count > 0:
             print(f"⏭️  דולגו על {skipped_count} מאמרים קיימים")
         
@@ -0,0 +1,63 @@
+# server/scripts/ingest_daemon.py
+"""
+daemon לייבוא מאמרים לפי לוח זמנים - בלי אדם ובלי תפריטים
+
+הרצה:
+    python scripts/ingest_daemon.py                    # feeds מ-INGEST_FEEDS_PATH, רץ עד Ctrl+C / SIGTERM
+    python scripts/ingest_daemon.py --feeds feeds.json
+    python scripts/ingest_daemon.py --once             # כל ה-feeds פעם אחת ויציאה (cron / Task Scheduler)
+
+קובץ feeds:
+    [{"keyword": "AI", "category": "Technology", "interval_minutes": 10},
+     {"keyword": "football", "category": "Sports", "max_items": 50}]
+
+מצב וסטטיסטיקה: INGEST_STATE_DIR/checkpoint.json, או GET /admin/ingestion
+"""
+
+import sys
+import os
+import argparse
+import json
+import logging
+import signal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scheduled news ingestion daemon")
+    parser.add_argument("--feeds", default=None, help="JSON של feeds (ברירת מחדל: INGEST_FEEDS_PATH)")
+    parser.add_argument("--state-dir", default=None, help="checkpoint + lock (ברירת מחדל: INGEST_STATE_DIR)")
+    parser.add_argument("--once", action="store_true", help="להריץ את כל ה-feeds פעם אחת ולצאת")
+    return parser.parse_args()
+
+
+def main():
+    from app.core.config import get_settings
+    from app.ingestion import IngestionDaemon, InstanceLockError, load_feeds
+
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    settings = get_settings()
+    feeds = load_feeds(args.feeds or settings.INGEST_FEEDS_PATH, settings.INGEST_DEFAULT_INTERVAL_MINUTES * 60)
+    daemon = IngestionDaemon(feeds=feeds, state_dir=args.state_dir)
+
+    try:
+        if args.once:
+            with daemon.lock:
+                daemon.load_checkpoint()
+                stats = daemon.run_once(daemon.feeds)
+            print(json.dumps(stats, ensure_ascii=False))
+            return
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: daemon.stop())
+        daemon.run_forever()
+    except InstanceLockError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
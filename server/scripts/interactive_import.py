@@ -7,88 +7,33 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from typing import List
 from sqlalchemy.orm import Session
 from app.core.db import SessionLocal
-from app.mvc.models.articles.article_entity import Article
-from app.gateways.news_api_gateway import NewsAPIGateway
-from datetime import datetime
-
-
-# 📚 רשימת קטגוריות פופולריות
-POPULAR_CATEGORIES = {
-    "1": {"name": "Technology", "keywords": ["technology", "AI", "software"]},
-    "2": {"name": "Business", "keywords": ["business", "economy", "finance"]},
-    "3": {"name": "Sports", "keywords": ["sports", "football", "basketball"]},
-    "4": {"name": "Health", "keywords": ["health", "medicine", "wellness"]},
-    "5": {"name": "Science", "keywords": ["science", "research", "space"]},
-    "6": {"name": "Entertainment", "keywords": ["entertainment", "movies", "music"]},
-    "7": {"name": "Politics", "keywords": ["politics", "election", "government"]},
-    "8": {"name": "Environment", "keywords": ["climate", "environment", "sustainability"]},
-    "9": {"name": "Education", "keywords": ["education", "university", "learning"]},
-    "10": {"name": "Travel", "keywords": ["travel", "tourism", "vacation"]},
-}
+from app.ingestion import POPULAR_CATEGORIES, IngestJob, IngestionPipeline
 
 
-def import_by_keyword(db: Session, keyword: str, category: str, count: int) -> int:
-    """ייבא מאמרים לפי מילת מפתח"""
-    gateway = NewsAPIGateway()
-    
+def run_import(jobs: List[IngestJob]) -> int:
+    """הרצת ה-pipeline (fetch -> normalize -> dedupe -> persist) והדפסת התפוקה של כל שלב"""
     try:
-        print(f"\n🔍 מחפש מאמרים על '{keyword}'...")
-        articles = gateway.get_articles_by_keyword(keyword, max_items=count)
-        
-        if not articles:
-            print(f"  ⚠️  לא נמצאו מאמרים")
-            return 0
-        
-        added = 0
-        skipped = 0
-        
-        for article_data in articles:
-            # בדוק אם קיים
-            existing = db.query(Article).filter(Article.url == article_data["url"]).first()
-            if existing:
-                skipped += 1
-                continue
-            
-            # המר תאריך
-            published_at = None
-            if article_data.get("published_at"):
-                try:
-                    published_at = datetime.fromisoformat(article_data["published_at"].replace("Z", "+00:00"))
-                except:
-                    pass
-            
-            # צור מאמר
-            article = Article(
-                title=article_data["title"],
-                summary=article_data.get("description") or article_data["title"][:200],
-                content=article_data.get("content") or article_data.get("description"),
-                url=article_data["url"],
-                source=article_data["source"],
-                category=category,
-                image_url=article_data.get("image_url"),
-                thumb_url=article_data.get("image_url"),
-                published_at=published_at
-            )
-            
-            db.add(article)
-            added += 1
-            print(f"  ✅ {article.title[:55]}...")
-        
-        db.commit()
-        
-        if added > 0:
-            print(f"\n  ✨ נוספו {added} מאמרים חדשים לקטגוריה '{category}'")
-        if skipped > 0:
-            print(f"  ⏭️  דולגו על {skipped} מאמרים קיימים")
-        
-        return added
-        
+        report = IngestionPipeline(session_factory=SessionLocal).run_sync(jobs)
     except Exception as e:
         print(f"  ❌ שגיאה: {e}")
-        db.rollback()
         return 0
+    
+    print(f"\n  ⏱️  {report['seconds']}s (מאמרים שכבר יובאו בעבר ודולגו: {report['known']}, עותקים של ידיעה קיימת: {report['near_duplicates']})")
+    for name, stage in report["stages"].items():
+        print(f"     {name:<10} in={stage['in']:<5} out={stage['out']:<5} errors={stage['errors']:<3} {stage['per_second']}/s")
+    
+    if report["added"] > 0:
+        print(f"\n  ✨ נוספו {report['added']} מאמרים חדשים")
+    return report["added"]
+
+
+def import_by_keyword(db: Session, keyword: str, category: str, count: int) -> int:
+    """ייבא מאמרים לפי מילת מפתח (כמה עמודים במקביל אם count גדול מעמוד אחד)"""
+    print(f"\n🔍 מחפש מאמרים על '{keyword}'...")
+    return run_import([IngestJob(keyword, category, count)])
 
 
 def show_menu():
@@ -108,24 +53,15 @@ def show_menu():
 
 
 def import_all_categories(db: Session, count_per_category: int = 10):
-    """ייבא מכל הקטגוריות"""
-    total = 0
-    
+    """ייבא מכל הקטגוריות - כל מילות המפתח במקביל, עד count_per_category לקטגוריה"""
     print(f"\n🚀 מייבא {count_per_category} מאמרים מכל קטגוריה...")
     
-    for cat_data in POPULAR_CATEGORIES.values():
-        print(f"\n{'='*70}")
-        print(f"📂 קטגוריה: {cat_data['name']}")
-        print(f"{'='*70}")
-        
-        # נסה עם כל מילת מפתח עד שמצליחים
-        for keyword in cat_data['keywords']:
-            added = import_by_keyword(db, keyword, cat_data['name'], count_per_category)
-            if added > 0:
-                total += added
-                break  # מצאנו מאמרים, עובר לקטגוריה הבאה
-    
-    return total
+    jobs = [
+        IngestJob(keyword, cat_data["name"], count_per_category)
+        for cat_data in POPULAR_CATEGORIES.values()
+        for keyword in cat_data["keywords"]
+    ]
+    return run_import(jobs)
 
 
 def import_custom_keyword(db: Session, keyword: str, category: str, count: int):
@@ -0,0 +1,49 @@
+# server/scripts/migrate_duplicate_of.py
+"""
+מיגרציה: עמודת duplicate_of בטבלת articles - ה-url_hash של המאמר הקנוני
+כשמאמר הוא עותק של אותה ידיעה מאתר אחר (INGEST_NEAR_DUP_MODE=cluster).
+רשימות וחיפוש מציגים רק מאמרים עם duplicate_of ריק.
+
+הרצה חד פעמית, אחרי migrate_url_hash.py.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+from app.core.db import engine
+
+
+ADD_COLUMN_SQL = """
+    IF COL_LENGTH('articles', 'duplicate_of') IS NULL
+    ALTER TABLE articles ADD duplicate_of VARCHAR(32) NULL
+"""
+
+CREATE_INDEX_SQL = """
+    IF NOT EXISTS (
+        SELECT 1 FROM sys.indexes
+        WHERE name = 'ix_articles_duplicate_of' AND object_id = OBJECT_ID('articles')
+    )
+    CREATE INDEX ix_articles_duplicate_of ON articles (duplicate_of)
+"""
+
+
+def main():
+    print("=" * 70)
+    print("🧬 מיגרציה: duplicate_of בטבלת articles")
+    print("=" * 70)
+
+    with engine.begin() as conn:
+        conn.execute(text(ADD_COLUMN_SQL))
+        print("✅ העמודה duplicate_of קיימת")
+
+    with engine.begin() as conn:
+        conn.execute(text(CREATE_INDEX_SQL))
+        print("✅ ix_articles_duplicate_of קיים")
+
+    print("\n🎉 המיגרציה הסתיימה")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# server/scripts/migrate_event_versions.py
+"""
+מיגרציה: גרסאות עולות לכל aggregate בטבלת events + unique index
+(aggregate_type, aggregate_id, version) שעליו נשענים ה-expected version
+וקריאות "אירועים אחרי גרסה N".
+
+הרצה חד פעמית, לפני פריסת ה-EventStore החדש.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+from app.core.db import engine
+
+
+# מספור מחדש של אירועים קיימים לפי הסדר בו נכתבו
+BACKFILL_SQL = """
+    UPDATE e
+    SET e.version = x.new_version
+    FROM events e
+    JOIN (
+        SELECT
+            id,
+            ROW_NUMBER() OVER (
+                PARTITION BY aggregate_type, aggregate_id
+                ORDER BY created_at ASC, id ASC
+            ) AS new_version
+        FROM events
+    ) x ON e.id = x.id
+    WHERE e.version <> x.new_version
+"""
+
+CREATE_INDEX_SQL = """
+    IF NOT EXISTS (
+        SELECT 1 FROM sys.indexes
+        WHERE name = 'UX_events_aggregate_version' AND object_id = OBJECT_ID('events')
+    )
+    CREATE UNIQUE INDEX UX_events_aggregate_version
+        ON events (aggregate_type, aggregate_id, version)
+        INCLUDE (event_type, created_at)
+"""
+
+CREATE_SNAPSHOT_INDEX_SQL = """
+    IF NOT EXISTS (
+        SELECT 1 FROM sys.indexes
+        WHERE name = 'IX_snapshots_aggregate_version' AND object_id = OBJECT_ID('snapshots')
+    )
+    CREATE INDEX IX_snapshots_aggregate_version
+        ON snapshots (aggregate_type, aggregate_id, version DESC)
+"""
+
+
+def main():
+    print("=" * 70)
+    print("🔢 מיגרציה: גרסאות לכל aggregate בטבלת events")
+    print("=" * 70)
+
+    with engine.begin() as conn:
+        result = conn.execute(text(BACKFILL_SQL))
+        print(f"✅ עודכנו {result.rowcount} אירועים")
+
+        conn.execute(text(CREATE_INDEX_SQL))
+        print("✅ UX_events_aggregate_version קיים")
+
+        conn.execute(text(CREATE_SNAPSHOT_INDEX_SQL))
+        print("✅ IX_snapshots_aggregate_version קיים")
+
+    print("\n🎉 המיגרציה הסתיימה")
+
+
+if __name__ == "__main__":
+    main()
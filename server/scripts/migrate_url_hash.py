@@ -0,0 +1,117 @@
+# server/scripts/migrate_url_hash.py
+"""
+מיגרציה: עמודת url_hash בטבלת articles (hash באורך קבוע של ה-URL הקנוני)
++ unique index עליה (רק שורות עם hash). בדיקות הכפילות של הייבוא עוברות דרך העמודה הזו במקום דרך url.
+
+הרצה חד פעמית, לפני פריסת ArticleBulkWriter עם url_hash. אפשר להריץ שוב -
+ממלא רק שורות שעדיין אין להן hash. מאמר שה-URL הקנוני שלו כבר שייך למאמר קודם
+לא מקבל url_hash ומסומן duplicate_of (העמודה נוספת כאן אם migrate_duplicate_of.py עוד לא רץ).
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+from app.core.db import engine
+from app.core.urls import url_hash
+
+
+ADD_COLUMN_SQL = """
+    IF COL_LENGTH('articles', 'url_hash') IS NULL
+    ALTER TABLE articles ADD url_hash VARCHAR(32) NULL
+"""
+
+ADD_DUPLICATE_OF_SQL = """
+    IF COL_LENGTH('articles', 'duplicate_of') IS NULL
+    ALTER TABLE articles ADD duplicate_of VARCHAR(32) NULL
+"""
+
+# ה-index הישן (לא unique) מוחלף ב-unique מסונן - הגנה על כפילות ב-DB ולא רק ב-Bloom filter של הייבוא
+DROP_PLAIN_INDEX_SQL = """
+    IF EXISTS (
+        SELECT 1 FROM sys.indexes
+        WHERE name = 'ix_articles_url_hash' AND object_id = OBJECT_ID('articles') AND is_unique = 0
+    )
+    DROP INDEX ix_articles_url_hash ON articles
+"""
+
+CREATE_INDEX_SQL = """
+    IF NOT EXISTS (
+        SELECT 1 FROM sys.indexes
+        WHERE name = 'ix_articles_url_hash' AND object_id = OBJECT_ID('articles')
+    )
+    CREATE UNIQUE INDEX ix_articles_url_hash ON articles (url_hash) WHERE url_hash IS NOT NULL
+"""
+
+# URLs שונים שמתנרמלים לאותו URL קנוני - כפילויות ישנות: הראשון נשאר הקנוני,
+# השאר מסומנים duplicate_of ובלי url_hash (אחרת ה-unique index לא נוצר)
+RESOLVE_DUPLICATES_SQL = """
+    UPDATE a SET duplicate_of = a.url_hash, url_hash = NULL
+    FROM articles a
+    WHERE a.url_hash IS NOT NULL
+      AND a.id > (SELECT MIN(b.id) FROM articles b WHERE b.url_hash = a.url_hash)
+"""
+
+# hash שכבר שייך למאמר אחר - השורה מסומנת כעותק במקום לקבל אותו
+BACKFILL_SQL = """
+    UPDATE articles SET url_hash = :url_hash
+    WHERE id = :id AND NOT EXISTS (SELECT 1 FROM articles WHERE url_hash = :url_hash)
+"""
+
+MARK_DUPLICATE_SQL = """
+    UPDATE articles SET duplicate_of = :url_hash
+    WHERE id = :id AND url_hash IS NULL
+"""
+
+CHUNK_SIZE = 2000
+
+
+def backfill(conn) -> int:
+    updated = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(text("""
+            SELECT TOP (:limit) id, url FROM articles
+            WHERE url_hash IS NULL AND id > :last_id
+            ORDER BY id
+        """), {"limit": CHUNK_SIZE, "last_id": last_id}).fetchall()
+        if not rows:
+            return updated
+        params = [{"id": row.id, "url_hash": url_hash(row.url)} for row in rows]
+        conn.execute(text(BACKFILL_SQL), params)
+        conn.execute(text(MARK_DUPLICATE_SQL), params)
+        updated += len(rows)
+        last_id = rows[-1].id
+        print(f"  ... {updated} שורות")
+
+
+def main():
+    print("=" * 70)
+    print("🔗 מיגרציה: url_hash בטבלת articles")
+    print("=" * 70)
+
+    with engine.begin() as conn:
+        conn.execute(text(ADD_COLUMN_SQL))
+        conn.execute(text(ADD_DUPLICATE_OF_SQL))
+        print("✅ העמודה url_hash קיימת")
+
+    # ה-index לפני ה-backfill: ה-NOT EXISTS של כל שורה עובר דרכו ולא סורק את הטבלה
+    with engine.begin() as conn:
+        resolved = conn.execute(text(RESOLVE_DUPLICATES_SQL)).rowcount
+        if resolved:
+            print(f"⚠️  {resolved} מאמרים היו URL קנוני של מאמר קודם - סומנו duplicate_of")
+        conn.execute(text(DROP_PLAIN_INDEX_SQL))
+        conn.execute(text(CREATE_INDEX_SQL))
+        print("✅ ix_articles_url_hash (unique) קיים")
+
+    # כל chunk בטרנזקציה משלו - טבלה גדולה לא נועלת הכל בבת אחת
+    with engine.connect() as conn:
+        updated = backfill(conn.execution_options(isolation_level="AUTOCOMMIT"))
+        print(f"✅ חושב url_hash ל-{updated} מאמרים")
+
+    print("\n🎉 המיגרציה הסתיימה")
+
+
+if __name__ == "__main__":
+    main()
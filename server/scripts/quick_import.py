@@ -7,11 +7,9 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from sqlalchemy.orm import Session
 from app.core.db import SessionLocal
-from app.mvc.models.articles.article_entity import Article
 from app.gateways.news_api_gateway import NewsAPIGateway
-from datetime import datetime
+from app.ingestion import ArticleBulkWriter, article_row
 
 
 def quick_import():
@@ -29,39 +27,8 @@ def quick_import():
             print("❌ לא נמצאו מאמרים")
             return
         
-        added = 0
-        for article_data in articles:
-            # בדוק אם קיים
-            existing = db.query(Article).filter(Article.url == article_data["url"]).first()
-            if existing:
-                continue
-            
-            # המר תאריך
-            published_at = None
-            if article_data.get("published_at"):
-                try:
-                    published_at = datetime.fromisoformat(article_data["published_at"].replace("Z", "+00:00"))
-                except:
-                    pass
-            
-            # הוסף למסד
-            article = Article(
-                title=article_data["title"],
-                summary=article_data.get("description") or article_data["title"][:200],
-                content=article_data.get("content") or article_data.get("description"),
-                url=article_data["url"],
-                source=article_data["source"],
-                category="Technology",
-                image_url=article_data.get("image_url"),
-                thumb_url=article_data.get("image_url"),
-                published_at=published_at
-            )
-            
-            db.add(article)
-            added += 1
-            print(f"✅ {article.title[:50]}...")
-        
-        db.commit()
+        rows = [row for row in (article_row(a, "Technology") for a in articles) if row]
+        added = ArticleBulkWriter(db).write(rows).inserted
         print(f"\n🎉 נוספו {added} מאמרים חדשים!")
         print("💡 עכשיו תוכל לראות אותם בשרת")
         
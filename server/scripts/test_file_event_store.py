@@ -0,0 +1,113 @@
+# server/scripts/test_file_event_store.py
+"""
+בדיקת FileEventStore תחת כתיבה וקריאה במקביל:
+כותבים מוסיפים אירועים בזמן שקוראים שולפים לפי aggregate, לפי סוג ומה-ID -
+כל קריאה חייבת להחזיר אירועים שלמים (בלי JSON חתוך) ובסדר גרסאות רציף
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.event_sourcing.events import AggregateType, BaseEvent, EventType
+from app.event_sourcing.file_event_store import FileEventStore
+
+WRITERS = 4
+READERS = 4
+EVENTS_PER_WRITER = 2000
+AGGREGATES = 8
+
+
+def make_event(aggregate_id: int, n: int) -> BaseEvent:
+    return BaseEvent(
+        event_type=EventType.ARTICLE_VIEWED,
+        aggregate_id=aggregate_id,
+        aggregate_type=AggregateType.ARTICLE,
+        event_data={"n": n, "padding": "x" * (n % 300)}
+    )
+
+
+def test_concurrent_reads_and_writes(fsync_mode: str, events_per_writer: int = EVENTS_PER_WRITER) -> bool:
+    directory = tempfile.mkdtemp(prefix="event-store-test-")
+    store = FileEventStore(directory, segment_bytes=256 * 1024, fsync_mode=fsync_mode)
+    errors = []
+    done = threading.Event()
+
+    def writer(w: int):
+        try:
+            for n in range(events_per_writer):
+                store.save_event(make_event((w * events_per_writer + n) % AGGREGATES + 1, n))
+        except Exception as e:
+            errors.append(f"writer {w}: {e!r}")
+
+    def reader(r: int):
+        try:
+            while not done.is_set():
+                for aggregate_id in range(1, AGGREGATES + 1):
+                    events = store.get_events_by_aggregate(AggregateType.ARTICLE.value, aggregate_id)
+                    versions = [event["version"] for event in events]
+                    if versions != list(range(1, len(versions) + 1)):
+                        errors.append(f"reader {r}: versions out of order for aggregate {aggregate_id}")
+                        return
+                store.get_events_by_type(EventType.ARTICLE_VIEWED.value, limit=50)
+                store.get_events_since(max(0, store.get_latest_event_id() - 50), limit=50)
+        except Exception as e:
+            errors.append(f"reader {r}: {e!r}")
+
+    writers = [threading.Thread(target=writer, args=(i,)) for i in range(WRITERS)]
+    readers = [threading.Thread(target=reader, args=(i,)) for i in range(READERS)]
+    started = time.perf_counter()
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+
+    total = WRITERS * events_per_writer
+    if store.get_latest_event_id() != total:
+        errors.append(f"expected {total} events, got {store.get_latest_event_id()}")
+    if len(store.get_events_since(0, limit=total + 1)) != total:
+        errors.append("get_events_since did not return every event")
+    if store.get_events_by_type(EventType.ARTICLE_VIEWED.value, limit=0):
+        errors.append("get_events_by_type(limit=0) returned events")
+    store.close()
+
+    # פתיחה מחדש - השחזור מהדיסק רואה את אותם אירועים
+    reopened = FileEventStore(directory, segment_bytes=256 * 1024, fsync_mode="none")
+    if reopened.get_latest_event_id() != total:
+        errors.append(f"after reopen: expected {total} events, got {reopened.get_latest_event_id()}")
+    reopened.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+    seconds = time.perf_counter() - started
+    if errors:
+        print(f"❌ fsync_mode={fsync_mode}: {len(errors)} שגיאות")
+        for error in errors[:10]:
+            print(f"   {error}")
+        return False
+    print(f"✅ fsync_mode={fsync_mode}: {total} אירועים, {WRITERS} כותבים ו-{READERS} קוראים ({seconds:.1f}s)")
+    return True
+
+
+def main():
+    print("=" * 70)
+    print("🧪 בדיקת FileEventStore - כתיבה וקריאה במקביל")
+    print("=" * 70)
+    results = [
+        test_concurrent_reads_and_writes("none"),
+        test_concurrent_reads_and_writes("interval"),
+        # group: fsync לכל קבוצת כותבים - פחות אירועים כדי שהבדיקה תסתיים מהר
+        test_concurrent_reads_and_writes("group", events_per_writer=200)
+    ]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
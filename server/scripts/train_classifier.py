@@ -0,0 +1,101 @@
+# server/scripts/train_classifier.py
+"""
+אימון המסווג המקומי (LocalClassifier) על המאמרים שכבר מסווגים ב-DB
+
+הרצה:
+    python scripts/train_classifier.py
+    python scripts/train_classifier.py --limit 50000 --epochs 8 --holdout 0.1
+
+המודל נשמר ל-CLASSIFIER_MODEL_PATH; השרת טוען אותו מחדש תוך 30 שניות, בלי restart.
+הדוח מראה לכל threshold כמה מהמאמרים יסווגו מקומית (coverage) ובאיזה דיוק -
+לפיו בוחרים את CLASSIFIER_LOCAL_MIN_CONFIDENCE
+"""
+
+import sys
+import os
+import argparse
+import random
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the local article category classifier")
+    parser.add_argument("--limit", type=int, default=None, help="רק N המאמרים האחרונים")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--holdout", type=float, default=0.2, help="חלק המאמרים לכיול ולבדיקה (לא לאימון)")
+    parser.add_argument("--min-per-class", type=int, default=20, help="קטגוריה עם פחות מאמרים לא נלמדת")
+    parser.add_argument("--output", default=None, help="ברירת מחדל: CLASSIFIER_MODEL_PATH")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main():
+    from app.core.config import get_settings
+    from app.core.db import SessionLocal
+    from app.services.classification_service import ClassificationService
+    from app.services.local_classifier import LocalClassifier, training_data
+
+    args = parse_args()
+    settings = get_settings()
+    output = args.output or settings.CLASSIFIER_MODEL_PATH
+
+    print("=" * 70)
+    print("🧠 אימון המסווג המקומי")
+    print("=" * 70)
+
+    db = SessionLocal()
+    try:
+        texts, labels = training_data(db, ClassificationService.CATEGORIES, limit=args.limit)
+    finally:
+        db.close()
+
+    counts = Counter(labels)
+    kept = {label for label, count in counts.items() if count >= args.min_per_class}
+    samples = [(text, label) for text, label in zip(texts, labels) if label in kept]
+    print(f"📚 {len(samples)} מאמרים מסווגים ב-{len(kept)} קטגוריות")
+    for label, count in counts.most_common():
+        print(f"   {label:<15} {count:>7}{'' if label in kept else '  (מעט מדי - לא נלמדת)'}")
+    if len(kept) < 2:
+        print("❌ צריך לפחות שתי קטגוריות עם מספיק מאמרים")
+        return
+
+    random.Random(args.seed).shuffle(samples)
+    split = int(len(samples) * (1 - args.holdout)) if args.holdout else len(samples)
+    train, test = samples[:split], samples[split:]
+
+    started = time.perf_counter()
+    model = LocalClassifier().fit(
+        [text for text, _ in train], [label for _, label in train], epochs=args.epochs, seed=args.seed
+    )
+    print(f"\n⏱️  אימון: {time.perf_counter() - started:.1f}s, {len(model.weights)} features")
+
+    if test:
+        test_texts, test_labels = [text for text, _ in test], [label for _, label in test]
+        # חצי מה-holdout לכיול ה-confidence, החצי השני לבדיקה
+        half = len(test) // 2
+        temperature = model.calibrate(test_texts[:half], test_labels[:half])
+        test_texts, test_labels = test_texts[half:], test_labels[half:]
+        print(f"🌡️  temperature: {temperature:.2f}")
+        print(f"\n📊 בדיקה על {len(test_texts)} מאמרים:")
+        for threshold in (0.4, 0.5, 0.6, 0.7, 0.8, 0.9):
+            report = model.evaluate(test_texts, test_labels, threshold)
+            marker = "  ◀ CLASSIFIER_LOCAL_MIN_CONFIDENCE" if threshold == settings.CLASSIFIER_LOCAL_MIN_CONFIDENCE else ""
+            print(
+                f"   threshold {threshold:.1f}: מקומי {report['coverage']:.1%} מהמאמרים, "
+                f"דיוק {report['confident_accuracy']:.1%}{marker}"
+            )
+        model.metrics = model.evaluate(test_texts, test_labels, settings.CLASSIFIER_LOCAL_MIN_CONFIDENCE)
+        print(
+            f"   דיוק כללי: {model.metrics['accuracy']:.1%}, "
+            f"{model.metrics['microseconds_per_article']}µs למאמר"
+        )
+
+    model.save(output)
+    print(f"\n✅ המודל נשמר ל-{output} ({os.path.getsize(output) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()